@@ -1,9 +1,24 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import io
+import hashlib
+import os
+import sys
+
+# Módulos compartilhados com o motorsport_tires_v2_2
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'motorsport_tires'))
+from otimizador_sets import POSICOES, montar_sets
+from persistencia import BancoSQLite, TabelaPersistente
+from planejador_temporada import (LIMITE_COMPRA_ETAPA, LIMITE_COMPRA_PRIMEIRA, PNEUS_PROXIMA_ETAPA,
+                                   planejar_temporada)
+from planilhas import gerar_planilha, ler_planilhas
+from repositorio import (CAMINHO_BANCO, VISAO_CARROS, VISAO_ETAPAS, VISAO_HISTORICO_ETAPAS, VISAO_MEDICOES,
+                         VISAO_PISTAS, VISAO_PNEUS, VISAO_SETS, apagar_dados_app1, importar_banco_legado)
+from series_profundidade import SeriesProfundidade, converter_datas
+from snapshots import assinatura_banco, atualizar_snapshot, ler_snapshot
 
 # Configuração da página
 st.set_page_config(
@@ -12,106 +27,156 @@ st.set_page_config(
     layout="wide"
 )
 
-# Função para carregar dados do Excel
-@st.cache_data
-def load_data(file):
-    df_cadastro = pd.read_excel(file, sheet_name='Cadastro de Pneus')
-    df_medicoes = pd.read_excel(file, sheet_name='Medições')
-    return df_cadastro, df_medicoes
-
-# Função para salvar dados em Excel
-def save_to_excel(df_cadastro, df_medicoes):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_cadastro.to_excel(writer, sheet_name='Cadastro de Pneus', index=False)
-        df_medicoes.to_excel(writer, sheet_name='Medições', index=False)
-    return output.getvalue()
-
-# Função para resetar o sistema
-def reset_sistema():
-    """Reseta todos os dados do sistema"""
-    st.session_state.df_cadastro = pd.DataFrame(columns=[
-        'Nome do Pneu', 'Código de Barras', 'Carro Vinculado', 'Status',
-        'Quilometragem atual', 'Profundidade Inicial (mm)', 'Limite KM', 
-        'Data Cadastro', 'Etapa Cadastro', 'Etapa Atual', 'Status Etapa'
-    ])
-    st.session_state.df_medicoes = pd.DataFrame(columns=[
-        'Código do Pneu', 'Quilometragem Atual', 'Código de Barras', 'Carro',
-        'Data Medição', 'Tipo Evento', 'Voltas', 'Tempo Pista (min)', 'Pista',
-        'Quilometragem', 'KM TOTAL', 'Interno (mm)', 'Centro Interno (mm)',
-        'Centro Externo (mm)', 'Externo (mm)', 'Profundidade Média (mm)',
-        'Condição (twi)', 'Condição (km)', 'AÇÃO', 'Etapa'
-    ])
-
-    st.session_state.df_carros = pd.DataFrame({
-        'Nome': ['Carro A', 'Carro B', 'Carro C'],
-        'Número': ['#11', '#22', '#33'],
-        'Piloto': ['Piloto 1', 'Piloto 2', 'Piloto 3'],
-        'Categoria': ['Stock Car', 'Stock Car', 'Stock Car'],
-        'Status': ['Ativo', 'Ativo', 'Ativo'],
-        'Data Cadastro': [datetime.now().strftime('%d/%m/%Y')] * 3
-    })
-
-    st.session_state.df_calendario['Status'] = 'Não Iniciada'
-    st.session_state.etapa_atual = 1
-
-    st.session_state.historico_etapas = pd.DataFrame(columns=[
-        'Etapa', 'Data Inicio', 'Data Fim', 'Pneus Comprados', 'Pneus Selecionados Proxima',
-        'Pneus Descartados', 'Status'
-    ])
-
-    st.session_state.df_sets = pd.DataFrame(columns=[
-        'ID Set', 'Nome do Set', 'Carro', 'Data Montagem', 'Status', 'Etapa',
-        'Pneu Dianteiro Esquerdo', 'Pneu Dianteiro Direito',
-        'Pneu Traseiro Esquerdo', 'Pneu Traseiro Direito'
-    ])
-
-    if 'df_descartados' in st.session_state:
-        st.session_state.df_descartados = pd.DataFrame(columns=[
-            'Nome do Pneu', 'Carro Vinculado', 'Quilometragem Final',
-            'Data Descarte', 'Motivo'
-        ])
-
-# Inicialização dos dados na sessão
-if 'df_cadastro' not in st.session_state:
-    st.session_state.df_cadastro = pd.DataFrame(columns=[
-        'Nome do Pneu', 'Código de Barras', 'Carro Vinculado', 'Status',
-        'Quilometragem atual', 'Profundidade Inicial (mm)', 'Limite KM', 
-        'Data Cadastro', 'Etapa Cadastro', 'Etapa Atual', 'Status Etapa'
-    ])
-    st.session_state.df_medicoes = pd.DataFrame(columns=[
-        'Código do Pneu', 'Quilometragem Atual', 'Código de Barras', 'Carro',
-        'Data Medição', 'Tipo Evento', 'Voltas', 'Tempo Pista (min)', 'Pista',
-        'Quilometragem', 'KM TOTAL', 'Interno (mm)', 'Centro Interno (mm)',
-        'Centro Externo (mm)', 'Externo (mm)', 'Profundidade Média (mm)',
-        'Condição (twi)', 'Condição (km)', 'AÇÃO', 'Etapa'
-    ])
-
-# Inicializar cadastro de pistas se não existir
-if 'df_pistas' not in st.session_state:
-    st.session_state.df_pistas = pd.DataFrame({
-        'Nome': ['Circuito dos Cristais', 'Autódromo Zilmar Beux', 'Interlagos', 
-                 'Autódromo Ayrton Senna', 'Autódromo de Cuiabá', 'Velocitta',
-                 'Autódromo de Chapecó', 'Autódromo Nelson Piquet', 'Velopark'],
-        'KM por Volta': [3.477, 3.115, 4.309, 3.835, 3.408, 3.493, 3.762, 5.476, 3.013],
-        'Localização': ['Curvelo-MG', 'Cascavel-PR', 'São Paulo-SP', 'Goiânia-GO', 
-                       'Cuiabá-MT', 'Mogi Guaçu-SP', 'Chapecó-SC', 'Brasília-DF', 'Nova Santa Rita-RS']
-    })
-
-# Inicializar cadastro de carros se não existir
-if 'df_carros' not in st.session_state:
-    st.session_state.df_carros = pd.DataFrame({
+# Função para carregar dados do Excel: todas as abas conhecidas numa só leitura.
+# O cache é pela hash do conteúdo (o `_conteudo` fica fora da chave do st.cache_data)
+@st.cache_data(max_entries=8)
+def load_data(hash_arquivo, _conteudo):
+    return ler_planilhas(_conteudo, {aba: esquema for aba, (_, esquema) in ABAS_EXCEL.items()})
+
+# Função para salvar dados em Excel: guardada pela versão dos dados no banco,
+# as abas só são montadas e serializadas quando essa versão ainda não foi exportada
+@st.cache_data(max_entries=2)
+def save_to_excel(versao_dados, _montar_abas):
+    return gerar_planilha(_montar_abas())
+
+# Colunas dos pneus de um set, na ordem DE, DD, TE, TD
+COLUNAS_POSICOES = ['Pneu Dianteiro Esquerdo', 'Pneu Dianteiro Direito',
+                    'Pneu Traseiro Esquerdo', 'Pneu Traseiro Direito']
+
+# Função para sugerir a montagem de sets de todos os carros
+def sugerir_sets(df_cadastro, df_medicoes, df_sets, etapa, km_stint, sets_por_carro=1):
+    """Distribui os pneus disponíveis da etapa nos sets de cada carro (atribuição ótima).
+
+    A vida usada de cada pneu é o maior valor entre km/limite e a perda de
+    profundidade da última medição até o TWI (1.5 mm). Cada pneu só pode ir
+    para um set do seu carro; o primeiro set de cada carro fica com os mais novos.
+    """
+    montados = set(df_sets.loc[(df_sets['Status'] == 'Ativo') & (df_sets['Etapa'] == etapa),
+                               COLUNAS_POSICOES].stack())
+    pneus = df_cadastro[
+        (df_cadastro['Etapa Atual'] == etapa) &
+        (df_cadastro['Status Etapa'] == 'Disponível') &
+        (~df_cadastro['Nome do Pneu'].isin(montados))
+    ].reset_index(drop=True)
+    if len(pneus) == 0:
+        return pd.DataFrame(columns=['Carro', 'Set'] + list(POSICOES))
+
+    limite = pd.to_numeric(pneus['Limite KM'], errors='coerce').fillna(1000)
+    limite = limite.where(limite > 0, 1000)
+    km = pd.to_numeric(pneus['Quilometragem atual'], errors='coerce').fillna(0)
+    # Última medição pela data real (a ordem das linhas é a de registro/importação)
+    medicoes = df_medicoes.assign(_data=converter_datas(df_medicoes['Data Medição']))
+    medicoes = medicoes.sort_values('_data', kind='stable', na_position='first')
+    ultima_profundidade = pneus['Nome do Pneu'].map(
+        medicoes.groupby('Código do Pneu')['Profundidade Média (mm)'].last())
+    prof_inicial = pd.to_numeric(pneus['Profundidade Inicial (mm)'], errors='coerce').fillna(8.0)
+    perda = ((prof_inicial - ultima_profundidade) / (prof_inicial - 1.5)).clip(0, 1).fillna(0)
+    desgaste = pd.concat([km, perda * limite], axis=1).max(axis=1)
+
+    vagas = pd.DataFrame([(carro, numero, posicao)
+                          for carro in pneus['Carro Vinculado'].unique()
+                          for numero in range(1, sets_por_carro + 1)
+                          for posicao in POSICOES], columns=['Carro', 'Set', 'Posição'])
+    compativel = vagas['Carro'].to_numpy(dtype=object)[:, None] == pneus['Carro Vinculado'].to_numpy(dtype=object)[None, :]
+    escolha = montar_sets(desgaste, limite, [km_stint] * len(vagas), compativel,
+                          prioridade=sets_por_carro + 1 - vagas['Set'])
+    vagas['Pneu'] = pneus['Nome do Pneu'].reindex(escolha).values
+
+    sugestao = vagas.pivot(index=['Carro', 'Set'], columns='Posição', values='Pneu')
+    return sugestao[list(POSICOES)].reset_index()
+
+# Etapas-chave do calendário e voltas por carro no fim de semana (treinos + corridas)
+ETAPAS_CHAVE = ('Corrida do Milhão', 'Endurance 3h', 'Super Final')
+VOLTAS_PADRAO = 100
+VOLTAS_POR_TIPO = {'Endurance 3h': 180}
+
+# Colunas das tabelas da sessão (visões do esquema único, ver repositorio)
+COLUNAS_CADASTRO = VISAO_PNEUS.colunas
+COLUNAS_MEDICOES = VISAO_MEDICOES.colunas
+COLUNAS_HISTORICO_ETAPAS = VISAO_HISTORICO_ETAPAS.colunas
+COLUNAS_SETS = VISAO_SETS.colunas
+
+# Abas do Excel: tabela da sessão e tipo de cada coluna (o padrão é texto)
+ABAS_EXCEL = {
+    'Cadastro de Pneus': ('cadastro', dict.fromkeys(COLUNAS_CADASTRO, 'str') | {
+        'Código de Barras': 'int', 'Quilometragem atual': 'float', 'Profundidade Inicial (mm)': 'float',
+        'Limite KM': 'float', 'Data Cadastro': 'data', 'Etapa Cadastro': 'int', 'Etapa Atual': 'int'}),
+    'Medições': ('medicoes', dict.fromkeys(COLUNAS_MEDICOES, 'str') | {
+        'Quilometragem Atual': 'float', 'Código de Barras': 'int', 'Data Medição': 'data_hora',
+        'Voltas': 'int', 'Tempo Pista (min)': 'float', 'Quilometragem': 'float', 'KM TOTAL': 'float',
+        'Interno (mm)': 'float', 'Centro Interno (mm)': 'float', 'Centro Externo (mm)': 'float',
+        'Externo (mm)': 'float', 'Profundidade Média (mm)': 'float', 'Etapa': 'int'}),
+    'Carros': ('carros', dict.fromkeys(VISAO_CARROS.colunas, 'str') | {
+        'Data Cadastro': 'data'}),
+    'Sets': ('sets', dict.fromkeys(COLUNAS_SETS, 'str') | {'ID Set': 'int', 'Data Montagem': 'data', 'Etapa': 'int'}),
+    'Pistas': ('pistas', dict.fromkeys(VISAO_PISTAS.colunas, 'str') | {'KM por Volta': 'float'}),
+    'Histórico de Etapas': ('historico_etapas', dict.fromkeys(COLUNAS_HISTORICO_ETAPAS, 'str') | {
+        'Etapa': 'int', 'Data Inicio': 'data', 'Data Fim': 'data', 'Pneus Comprados': 'int',
+        'Pneus Descartados': 'int'}),
+    'Calendário': ('calendario', dict.fromkeys(VISAO_ETAPAS.colunas, 'str') | {
+        'Etapa': 'int', 'Data': 'data'}),
+}
+
+# Banco de dados compartilhado com o motorsport_tires_v2_2 (MOTORSPORT_TIRES_DB, ver repositorio)
+DB_PATH = CAMINHO_BANCO
+# Banco próprio das versões anteriores do app1, copiado para o compartilhado na primeira abertura
+DB_LEGADO = 'tire_management.db'
+
+# Snapshot colunar (Arrow) das tabelas da temporada, para as análises; regravado quando o banco muda
+PASTA_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), 'snapshot_temporada')
+TABELAS_SNAPSHOT = ('cadastro', 'medicoes', 'sets', 'historico_etapas')
+# Colunas das medições usadas nas séries de profundidade
+COLUNAS_SERIES = ['Código do Pneu', 'Data Medição', 'KM TOTAL', 'Interno (mm)', 'Centro Interno (mm)',
+                  'Centro Externo (mm)', 'Externo (mm)']
+
+# Conjunto de trabalho em memória: pneus, medições e sets da etapa atual
+FILTRO_CADASTRO = 'etapa_atual = ?'
+FILTRO_MEDICOES = 'pneu_id IN (SELECT id FROM pneus WHERE etapa_atual = ?)'
+FILTRO_SETS = 'etapa = ?'
+
+# Banco único por processo do servidor (compartilhado entre sessões)
+@st.cache_resource
+def abrir_banco():
+    banco = BancoSQLite(DB_PATH)
+    importar_banco_legado(banco, DB_LEGADO)
+    return banco
+
+banco = abrir_banco()
+
+# Busca um pneu da etapa pelo código de barras lido (o cadastro guarda o código como número)
+def buscar_por_codigo(codigo):
+    codigo = str(codigo).strip()
+    if codigo.isdigit():
+        pneu = st.session_state.cadastro.obter(int(codigo), 'Código de Barras')
+        if pneu is not None:
+            return pneu
+    return st.session_state.cadastro.obter(codigo, 'Código de Barras')
+
+# Carros padrão da equipe
+def carros_padrao():
+    data_cadastro = datetime.now().strftime('%d/%m/%Y')
+    return pd.DataFrame({
         'Nome': ['Carro A', 'Carro B', 'Carro C'],
         'Número': ['#11', '#22', '#33'],
         'Piloto': ['Piloto 1', 'Piloto 2', 'Piloto 3'],
         'Categoria': ['Stock Car', 'Stock Car', 'Stock Car'],
         'Status': ['Ativo', 'Ativo', 'Ativo'],
-        'Data Cadastro': [datetime.now().strftime('%d/%m/%Y')] * 3
+        'Data Cadastro': [data_cadastro] * 3
     })
 
-# Inicializar calendário Stock Car Pro Series 2026
-if 'df_calendario' not in st.session_state:
-    st.session_state.df_calendario = pd.DataFrame({
+# Pistas pré-cadastradas
+PISTAS_PADRAO = pd.DataFrame({
+    'Nome': ['Circuito dos Cristais', 'Autódromo Zilmar Beux', 'Interlagos', 
+             'Autódromo Ayrton Senna', 'Autódromo de Cuiabá', 'Velocitta',
+             'Autódromo de Chapecó', 'Autódromo Nelson Piquet', 'Velopark'],
+    'KM por Volta': [3.477, 3.115, 4.309, 3.835, 3.408, 3.493, 3.762, 5.476, 3.013],
+    'Localização': ['Curvelo-MG', 'Cascavel-PR', 'São Paulo-SP', 'Goiânia-GO', 
+                   'Cuiabá-MT', 'Mogi Guaçu-SP', 'Chapecó-SC', 'Brasília-DF', 'Nova Santa Rita-RS']
+})
+
+# Calendário Stock Car Pro Series 2026
+def calendario_padrao():
+    return pd.DataFrame({
         'Etapa': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
         'Data': ['08/03/2026', '29/03/2026', '26/04/2026', '17/05/2026', '13/06/2026',
                  '26/07/2026', '09/08/2026', '06/09/2026', '27/09/2026', '18/10/2026',
@@ -129,16 +194,129 @@ if 'df_calendario' not in st.session_state:
         'Status': ['Não Iniciada'] * 12
     })
 
-# Gerenciar etapa atual
-if 'etapa_atual' not in st.session_state:
+# Abre as tabelas do banco na sessão, carregando só a etapa atual
+def carregar_sessao():
+    st.session_state.versao_banco = banco.versao
+    with banco.transacao():
+        etapa = int(banco.ler_estado('etapa_atual', 1))
+        st.session_state.etapa_atual = etapa
+
+        st.session_state.cadastro = TabelaPersistente(
+            banco, VISAO_PNEUS, chave='Nome do Pneu', indices=('Código de Barras',),
+            filtro=FILTRO_CADASTRO, parametros=(etapa,))
+        st.session_state.medicoes = TabelaPersistente(banco, VISAO_MEDICOES, filtro=FILTRO_MEDICOES, parametros=(etapa,))
+        st.session_state.sets = TabelaPersistente(banco, VISAO_SETS, chave='ID Set', filtro=FILTRO_SETS, parametros=(etapa,))
+        st.session_state.carros = TabelaPersistente(banco, VISAO_CARROS, chave='Nome')
+        st.session_state.pistas = TabelaPersistente(banco, VISAO_PISTAS, chave='Nome')
+        st.session_state.historico_etapas = TabelaPersistente(banco, VISAO_HISTORICO_ETAPAS)
+        st.session_state.calendario = TabelaPersistente(banco, VISAO_ETAPAS, chave='Etapa')
+
+        # Primeira execução: carros, pistas (as do v2_2 já cadastradas não se repetem) e calendário padrão
+        if banco.ler_estado('semeado') is None:
+            st.session_state.carros.adicionar_varios(carros_padrao())
+            pistas = st.session_state.pistas
+            pistas.adicionar_varios(PISTAS_PADRAO[~PISTAS_PADRAO['Nome'].map(pistas.existe)])
+            banco.gravar_estado('semeado', 1)
+        if st.session_state.calendario.total() == 0:
+            st.session_state.calendario.adicionar_varios(calendario_padrao())
+
+# Snapshot das tabelas da temporada inteira (nomes de coluna do app1), regravado quando o banco muda
+def snapshot_temporada():
+    return atualizar_snapshot(PASTA_SNAPSHOT, assinatura_banco(DB_PATH),
+                              lambda: {nome: st.session_state[nome].df_completo() for nome in TABELAS_SNAPSHOT})
+
+# Colunas de uma tabela da temporada inteira, lidas do snapshot (memory-map) em vez do banco
+def colunas_temporada(tabela, colunas):
+    snapshot_temporada()
+    return ler_snapshot(PASTA_SNAPSHOT, tabela, colunas)
+
+# Séries de profundidade de todos os pneus (ordem cronológica real), montadas uma vez por versão do snapshot
+@st.cache_resource(max_entries=2)
+def _series_profundidade(versao_snapshot):
+    return SeriesProfundidade.de_medicoes(ler_snapshot(PASTA_SNAPSHOT, 'medicoes', COLUNAS_SERIES))
+
+def series_profundidade():
+    manifesto = snapshot_temporada()
+    return _series_profundidade(manifesto['versao'])
+
+# Troca o conjunto de trabalho em memória para outra etapa
+def carregar_etapa(etapa):
+    for tabela in (st.session_state.cadastro, st.session_state.medicoes, st.session_state.sets):
+        tabela.recarregar(parametros=(etapa,))
+
+# Outra sessão ou o motorsport_tires_v2_2 gravou no banco: relê a etapa atual e o conjunto de trabalho
+def sincronizar_sessao():
+    if not banco.escritas_desde(st.session_state.versao_banco):
+        return
+    versao = banco.versao
+    st.session_state.etapa_atual = int(banco.ler_estado('etapa_atual', 1))
+    carregar_etapa(st.session_state.etapa_atual)
+    for nome in ('carros', 'pistas', 'historico_etapas', 'calendario'):
+        st.session_state[nome].recarregar()
+    st.session_state.versao_banco = versao
+
+# Função para resetar o sistema
+def reset_sistema():
+    """Reseta todos os dados do sistema"""
+    with banco.transacao():
+        # Só os dados do app1: pneus, sets e outings criados no motorsport_tires_v2_2 ficam
+        apagar_dados_app1(banco)
+
+        st.session_state.carros.substituir(carros_padrao())
+
+        banco.gravar_estado('etapa_atual', 1)
+
+        calendario = st.session_state.calendario
+        calendario.atualizar_onde(np.ones(len(calendario), dtype=bool), {'Status': 'Não Iniciada'})
     st.session_state.etapa_atual = 1
+    carregar_etapa(1)
+    st.session_state.historico_etapas.recarregar()
 
-# Histórico de etapas
-if 'historico_etapas' not in st.session_state:
-    st.session_state.historico_etapas = pd.DataFrame(columns=[
-        'Etapa', 'Data Inicio', 'Data Fim', 'Pneus Comprados', 'Pneus Selecionados Proxima',
-        'Pneus Descartados', 'Status'
-    ])
+    if 'df_descartados' in st.session_state:
+        st.session_state.df_descartados = pd.DataFrame(columns=[
+            'Nome do Pneu', 'Carro Vinculado', 'Quilometragem Final',
+            'Data Descarte', 'Motivo'
+        ])
+
+# Importa as abas lidas do Excel; abas ausentes no arquivo mantêm os dados atuais
+def importar_planilhas(planilhas):
+    etapa = st.session_state.etapa_atual
+    calendario = planilhas.get('Calendário')
+    if calendario is not None and len(calendario) > 0:
+        # Etapa atual: a primeira ainda não concluída no calendário importado
+        pendentes = calendario.loc[calendario['Status'] != 'Concluída', 'Etapa']
+        etapa = int(pendentes.min() if len(pendentes) > 0 else calendario['Etapa'].max())
+
+    df_cadastro = planilhas.get('Cadastro de Pneus')
+    if df_cadastro is not None:
+        # Planilhas sem controle de etapa: os pneus entram na etapa atual, disponíveis
+        df_cadastro = df_cadastro.fillna({'Etapa Cadastro': etapa, 'Etapa Atual': etapa, 'Status Etapa': 'Disponível'})
+        df_cadastro = df_cadastro.astype({'Etapa Cadastro': 'int64', 'Etapa Atual': 'int64'})
+        planilhas = {**planilhas, 'Cadastro de Pneus': df_cadastro}
+
+    if calendario is not None and len(calendario) == 0:
+        planilhas = {aba: df for aba, df in planilhas.items() if aba != 'Calendário'}
+
+    with banco.transacao():
+        for aba, (chave, _) in ABAS_EXCEL.items():
+            if aba in planilhas:
+                st.session_state[chave].substituir(planilhas[aba])
+        banco.gravar_estado('etapa_atual', etapa)
+
+    st.session_state.etapa_atual = etapa
+    carregar_etapa(etapa)
+
+# Inicialização dos dados na sessão: tabelas do banco, com a etapa atual em memória
+if 'cadastro' not in st.session_state:
+    carregar_sessao()
+else:
+    sincronizar_sessao()
+
+# Etapas anteriores à atual ficam concluídas no calendário
+calendario = st.session_state.calendario
+anteriores = (calendario.df['Etapa'] < st.session_state.etapa_atual) & (calendario.df['Status'] != 'Concluída')
+if anteriores.any():
+    calendario.atualizar_onde(anteriores.to_numpy(), {'Status': 'Concluída'})
 
 # Título principal
 st.title("🏁 Tire Management - Stock Car Pro Series 2026")
@@ -146,8 +324,8 @@ st.title("🏁 Tire Management - Stock Car Pro Series 2026")
 # Mostrar etapa atual no topo
 col_header1, col_header2, col_header3 = st.columns([2, 2, 1])
 with col_header1:
-    etapa_info = st.session_state.df_calendario[
-        st.session_state.df_calendario['Etapa'] == st.session_state.etapa_atual
+    etapa_info = st.session_state.calendario.df[
+        st.session_state.calendario.df['Etapa'] == st.session_state.etapa_atual
     ].iloc[0]
     st.markdown(f"### 📍 Etapa Atual: **{st.session_state.etapa_atual}** - {etapa_info['Local']}")
 with col_header2:
@@ -167,8 +345,11 @@ menu = st.sidebar.selectbox(
 
 # Upload de arquivo inicial
 uploaded_file = st.sidebar.file_uploader("Carregar arquivo Excel existente", type=['xlsx'])
+if uploaded_file and st.session_state.get('arquivo_importado') != uploaded_file.file_id:
+    conteudo = uploaded_file.getvalue()
+    importar_planilhas(load_data(hashlib.sha256(conteudo).hexdigest(), conteudo))
+    st.session_state.arquivo_importado = uploaded_file.file_id
 if uploaded_file:
-    st.session_state.df_cadastro, st.session_state.df_medicoes = load_data(uploaded_file)
     st.sidebar.success("Dados carregados com sucesso!")
 
 # Footer da sidebar
@@ -182,8 +363,8 @@ st.sidebar.caption("Desenvolvido para Stock Car Pro Series")
 if menu == "📊 Dashboard":
     st.header("Dashboard - Visão Geral da Etapa")
 
-    pneus_etapa = st.session_state.df_cadastro[
-        st.session_state.df_cadastro['Etapa Atual'] == st.session_state.etapa_atual
+    pneus_etapa = st.session_state.cadastro.df[
+        st.session_state.cadastro.df['Etapa Atual'] == st.session_state.etapa_atual
     ]
 
     if len(pneus_etapa) > 0:
@@ -235,12 +416,13 @@ if menu == "📊 Dashboard":
 elif menu == "🏁 Gerenciar Etapas":
     st.header("Gerenciar Etapas - Stock Car Pro Series 2026")
 
-    tab1, tab2, tab3 = st.tabs(["📅 Calendário", "🎯 Avançar Etapa", "📜 Histórico de Etapas"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📅 Calendário", "🎯 Avançar Etapa", "📜 Histórico de Etapas",
+                                      "🗓️ Planejamento da Temporada"])
 
     with tab1:
         st.subheader("Calendário Completo 2026")
 
-        df_display = st.session_state.df_calendario.copy()
+        df_display = st.session_state.calendario.df.copy()
 
         def highlight_current(row):
             if row['Etapa'] == st.session_state.etapa_atual:
@@ -260,8 +442,8 @@ elif menu == "🏁 Gerenciar Etapas":
     with tab2:
         st.subheader(f"Finalizar Etapa {st.session_state.etapa_atual} e Avançar")
 
-        etapa_atual_info = st.session_state.df_calendario[
-            st.session_state.df_calendario['Etapa'] == st.session_state.etapa_atual
+        etapa_atual_info = st.session_state.calendario.df[
+            st.session_state.calendario.df['Etapa'] == st.session_state.etapa_atual
         ].iloc[0]
 
         st.markdown(f"### Etapa {st.session_state.etapa_atual}: {etapa_atual_info['Local']} - {etapa_atual_info['Data']}")
@@ -271,8 +453,8 @@ elif menu == "🏁 Gerenciar Etapas":
             st.info("Não há próxima etapa para avançar.")
         else:
             proxima_etapa = st.session_state.etapa_atual + 1
-            proxima_info = st.session_state.df_calendario[
-                st.session_state.df_calendario['Etapa'] == proxima_etapa
+            proxima_info = st.session_state.calendario.df[
+                st.session_state.calendario.df['Etapa'] == proxima_etapa
             ].iloc[0]
 
             st.markdown("---")
@@ -280,23 +462,23 @@ elif menu == "🏁 Gerenciar Etapas":
             st.markdown(f"**Data:** {proxima_info['Data']} | **Tipo:** {proxima_info['Tipo']}")
 
             st.markdown("---")
-            st.markdown("### Selecionar 4 Pneus para a Próxima Etapa")
-            st.info("⚠️ Regulamento: Você deve selecionar exatamente 4 pneus para levar à próxima etapa.")
+            st.markdown(f"### Selecionar {PNEUS_PROXIMA_ETAPA} Pneus para a Próxima Etapa")
+            st.info(f"⚠️ Regulamento: Você deve selecionar exatamente {PNEUS_PROXIMA_ETAPA} pneus para levar à próxima etapa.")
 
-            pneus_disponiveis = st.session_state.df_cadastro[
-                (st.session_state.df_cadastro['Etapa Atual'] == st.session_state.etapa_atual) &
-                (st.session_state.df_cadastro['Status Etapa'].isin(['Disponível', 'Em uso']))
+            pneus_disponiveis = st.session_state.cadastro.df[
+                (st.session_state.cadastro.df['Etapa Atual'] == st.session_state.etapa_atual) &
+                (st.session_state.cadastro.df['Status Etapa'].isin(['Disponível', 'Em uso']))
             ]
 
-            if len(pneus_disponiveis) >= 4:
+            if len(pneus_disponiveis) >= PNEUS_PROXIMA_ETAPA:
                 pneus_selecionados = st.multiselect(
-                    "Selecione 4 pneus para a próxima etapa:",
+                    f"Selecione {PNEUS_PROXIMA_ETAPA} pneus para a próxima etapa:",
                     options=pneus_disponiveis['Nome do Pneu'].tolist(),
-                    help="Escolha exatamente 4 pneus"
+                    help=f"Escolha exatamente {PNEUS_PROXIMA_ETAPA} pneus"
                 )
 
                 if len(pneus_selecionados) > 0:
-                    st.markdown(f"**Pneus selecionados: {len(pneus_selecionados)}/4**")
+                    st.markdown(f"**Pneus selecionados: {len(pneus_selecionados)}/{PNEUS_PROXIMA_ETAPA}**")
 
                     df_selecionados = pneus_disponiveis[
                         pneus_disponiveis['Nome do Pneu'].isin(pneus_selecionados)
@@ -306,11 +488,11 @@ elif menu == "🏁 Gerenciar Etapas":
 
                 st.markdown("---")
 
-                if len(pneus_selecionados) == 4:
+                if len(pneus_selecionados) == PNEUS_PROXIMA_ETAPA:
                     col1, col2 = st.columns([3, 1])
 
                     with col1:
-                        st.success("✅ 4 pneus selecionados! Você pode avançar para a próxima etapa.")
+                        st.success(f"✅ {PNEUS_PROXIMA_ETAPA} pneus selecionados! Você pode avançar para a próxima etapa.")
 
                     with col2:
                         if st.button("🏁 AVANÇAR PARA PRÓXIMA ETAPA", type="primary", use_container_width=True):
@@ -318,57 +500,54 @@ elif menu == "🏁 Gerenciar Etapas":
                                 ~pneus_disponiveis['Nome do Pneu'].isin(pneus_selecionados)
                             ]
 
-                            novo_historico = pd.DataFrame([{
-                                'Etapa': st.session_state.etapa_atual,
-                                'Data Inicio': etapa_atual_info['Data'],
-                                'Data Fim': datetime.now().strftime('%d/%m/%Y'),
-                                'Pneus Comprados': len(st.session_state.df_cadastro[
-                                    st.session_state.df_cadastro['Etapa Cadastro'] == st.session_state.etapa_atual
-                                ]),
-                                'Pneus Selecionados Proxima': ', '.join(pneus_selecionados),
-                                'Pneus Descartados': len(pneus_nao_selecionados),
-                                'Status': 'Concluída'
-                            }])
-
-                            st.session_state.historico_etapas = pd.concat(
-                                [st.session_state.historico_etapas, novo_historico],
-                                ignore_index=True
-                            )
-
-                            st.session_state.df_cadastro.loc[
-                                st.session_state.df_cadastro['Nome do Pneu'].isin(pneus_selecionados),
-                                ['Etapa Atual', 'Status Etapa', 'Status']
-                            ] = [proxima_etapa, 'Disponível', 'Usado']
-
-                            st.session_state.df_cadastro.loc[
-                                (~st.session_state.df_cadastro['Nome do Pneu'].isin(pneus_selecionados)) &
-                                (st.session_state.df_cadastro['Etapa Atual'] == st.session_state.etapa_atual),
-                                'Status Etapa'
-                            ] = 'Descartado'
-
-                            st.session_state.df_calendario.loc[
-                                st.session_state.df_calendario['Etapa'] == st.session_state.etapa_atual,
-                                'Status'
-                            ] = 'Concluída'
+                            # Tudo ou nada: histórico, pneus e etapa atual numa só transação
+                            with banco.transacao():
+                                st.session_state.historico_etapas.adicionar({
+                                    'Etapa': st.session_state.etapa_atual,
+                                    'Data Inicio': etapa_atual_info['Data'],
+                                    'Data Fim': datetime.now().strftime('%d/%m/%Y'),
+                                    'Pneus Comprados': len(st.session_state.cadastro.df[
+                                        st.session_state.cadastro.df['Etapa Cadastro'] == st.session_state.etapa_atual
+                                    ]),
+                                    'Pneus Selecionados Proxima': ', '.join(pneus_selecionados),
+                                    'Pneus Descartados': len(pneus_nao_selecionados),
+                                    'Status': 'Concluída'
+                                })
+
+                                df_cadastro = st.session_state.cadastro.df
+                                st.session_state.cadastro.atualizar_onde(
+                                    (~df_cadastro['Nome do Pneu'].isin(pneus_selecionados)) &
+                                    (df_cadastro['Etapa Atual'] == st.session_state.etapa_atual),
+                                    {'Status Etapa': 'Descartado'}
+                                )
+
+                                st.session_state.cadastro.atualizar_varios(
+                                    pneus_selecionados,
+                                    {'Etapa Atual': proxima_etapa, 'Status Etapa': 'Disponível', 'Status': 'Usado'}
+                                )
+
+                                st.session_state.calendario.atualizar(st.session_state.etapa_atual, {'Status': 'Concluída'})
+                                banco.gravar_estado('etapa_atual', proxima_etapa)
 
                             st.session_state.etapa_atual = proxima_etapa
+                            carregar_etapa(proxima_etapa)
 
                             st.success(f"✅ Avançado para Etapa {proxima_etapa}!")
                             st.balloons()
                             st.rerun()
                 else:
-                    st.warning(f"⚠️ Selecione exatamente 4 pneus. Você selecionou {len(pneus_selecionados)}.")
+                    st.warning(f"⚠️ Selecione exatamente {PNEUS_PROXIMA_ETAPA} pneus. Você selecionou {len(pneus_selecionados)}.")
             else:
-                st.error(f"⚠️ Pneus insuficientes! Você tem {len(pneus_disponiveis)} pneu(s) disponível(is). Necessário: 4 pneus.")
+                st.error(f"⚠️ Pneus insuficientes! Você tem {len(pneus_disponiveis)} pneu(s) disponível(is). Necessário: {PNEUS_PROXIMA_ETAPA} pneus.")
 
     with tab3:
         st.subheader("Histórico de Etapas Concluídas")
 
         if len(st.session_state.historico_etapas) > 0:
-            st.dataframe(st.session_state.historico_etapas, use_container_width=True)
+            st.dataframe(st.session_state.historico_etapas.df, use_container_width=True)
 
             st.markdown("### Detalhes por Etapa")
-            for idx, etapa_hist in st.session_state.historico_etapas.iterrows():
+            for idx, etapa_hist in st.session_state.historico_etapas.df.iterrows():
                 with st.expander(f"Etapa {etapa_hist['Etapa']} - {etapa_hist['Data Inicio']}"):
                     col1, col2, col3 = st.columns(3)
                     with col1:
@@ -383,32 +562,117 @@ elif menu == "🏁 Gerenciar Etapas":
         else:
             st.info("Nenhuma etapa concluída ainda.")
 
+    with tab4:
+        st.subheader(f"Planejamento de Pneus: Etapa {st.session_state.etapa_atual} até a 12")
+        st.caption(f"Regulamento: até {LIMITE_COMPRA_PRIMEIRA} pneus na primeira etapa, "
+                   f"{LIMITE_COMPRA_ETAPA} nas seguintes e {PNEUS_PROXIMA_ETAPA} levados para a próxima.")
+
+        carros_ativos = st.session_state.carros.df[st.session_state.carros.df['Status'] == 'Ativo']['Nome'].tolist()
+
+        if len(carros_ativos) == 0:
+            st.error("⚠️ Cadastre carros ativos para planejar a temporada!")
+        else:
+            etapas_restantes = st.session_state.calendario.df[
+                st.session_state.calendario.df['Etapa'] >= st.session_state.etapa_atual
+            ][['Etapa', 'Pista', 'Tipo']].reset_index(drop=True)
+            etapas_restantes['Voltas por Carro'] = etapas_restantes['Tipo'].map(VOLTAS_POR_TIPO).fillna(VOLTAS_PADRAO).astype(int)
+            etapas_restantes['Peso'] = np.where(etapas_restantes['Tipo'].isin(ETAPAS_CHAVE), 3.0, 1.0)
+
+            st.markdown("**Voltas previstas e peso de cada etapa** (etapas-chave com peso maior)")
+            entrada = st.data_editor(
+                etapas_restantes,
+                disabled=['Etapa', 'Pista', 'Tipo'],
+                hide_index=True,
+                use_container_width=True,
+                key="plano_entrada"
+            )
+
+            limite_maximo = int(
+                np.where(etapas_restantes['Etapa'] == 1, LIMITE_COMPRA_PRIMEIRA, LIMITE_COMPRA_ETAPA).sum()
+                - (st.session_state.cadastro.df['Etapa Cadastro'] == st.session_state.etapa_atual).sum()
+            )
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                orcamento = st.number_input("Pneus a comprar na temporada", min_value=0,
+                                            max_value=max(limite_maximo, 0), value=max(limite_maximo, 0))
+            with col2:
+                folga = st.number_input("Folga desejada sobre o necessário (%)", min_value=0, value=50, step=10)
+            with col3:
+                limite_km_novo = st.number_input("Limite KM do pneu novo", min_value=1, value=1000, step=50)
+
+            if st.button("🗓️ Planejar Temporada", type="primary", use_container_width=True):
+                st.session_state.plano_temporada = planejar_temporada(
+                    st.session_state.calendario.df, st.session_state.pistas.df,
+                    st.session_state.cadastro.df, st.session_state.etapa_atual, carros_ativos,
+                    entrada['Voltas por Carro'], entrada['Peso'],
+                    limite_km=limite_km_novo, orcamento=orcamento, folga=folga / 100
+                )
+
+            if 'plano_temporada' in st.session_state:
+                plano = st.session_state.plano_temporada
+                if plano['Etapa'].iloc[0] != st.session_state.etapa_atual:
+                    st.info("A etapa mudou desde o último plano. Clique em 'Planejar Temporada' novamente.")
+                else:
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Pneus a Comprar", int(plano['Comprar'].sum()))
+                    with col2:
+                        st.metric("Pneus a Descartar", int(plano['Descartar'].sum()))
+                    with col3:
+                        st.metric("Etapas com Falta", int((plano['Vida Disponível (km)'] < plano['Necessário (km)']).sum()))
+
+                    st.dataframe(plano, use_container_width=True, hide_index=True)
+
+                    fig = go.Figure()
+                    fig.add_trace(go.Bar(x=plano['Etapa'], y=plano['Vida Disponível (km)'], name='Vida Disponível'))
+                    fig.add_trace(go.Scatter(x=plano['Etapa'], y=plano['Necessário (km)'], name='Necessário',
+                                             mode='lines+markers'))
+                    fig.update_layout(title="Vida dos Pneus por Etapa", xaxis_title="Etapa", yaxis_title="km")
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    # Pneus a levar desta etapa: os 4 com mais vida restante
+                    if plano['Levar'].iloc[0] > 0:
+                        pneus_atuais = st.session_state.cadastro.df[
+                            (st.session_state.cadastro.df['Etapa Atual'] == st.session_state.etapa_atual) &
+                            (st.session_state.cadastro.df['Status Etapa'].isin(['Disponível', 'Em uso']))
+                        ].copy()
+                        pneus_atuais['Vida Restante (km)'] = (
+                            pd.to_numeric(pneus_atuais['Limite KM'], errors='coerce') -
+                            pd.to_numeric(pneus_atuais['Quilometragem atual'], errors='coerce')
+                        )
+                        levar = pneus_atuais.nlargest(PNEUS_PROXIMA_ETAPA, 'Vida Restante (km)')
+                        if len(levar) > 0:
+                            st.markdown(f"**Levar para a Etapa {st.session_state.etapa_atual + 1}** (mais conservados hoje):")
+                            st.dataframe(levar[['Nome do Pneu', 'Carro Vinculado', 'Quilometragem atual', 'Vida Restante (km)']],
+                                         use_container_width=True, hide_index=True)
+
 # Vou continuar com o resto do código no próximo bloco...
 
 # COMPRAR PNEUS
 elif menu == "🛒 Comprar Pneus":
     st.header("Comprar Pneus para a Etapa")
 
-    etapa_info = st.session_state.df_calendario[
-        st.session_state.df_calendario['Etapa'] == st.session_state.etapa_atual
+    etapa_info = st.session_state.calendario.df[
+        st.session_state.calendario.df['Etapa'] == st.session_state.etapa_atual
     ].iloc[0]
 
     st.markdown(f"### Etapa {st.session_state.etapa_atual}: {etapa_info['Local']} - {etapa_info['Data']}")
 
     if st.session_state.etapa_atual == 1:
-        limite_compra = 16
-        st.info("🎯 **Primeira Etapa**: Você pode comprar até **16 pneus**")
+        limite_compra = LIMITE_COMPRA_PRIMEIRA
+        st.info(f"🎯 **Primeira Etapa**: Você pode comprar até **{limite_compra} pneus**")
     else:
-        limite_compra = 8
-        st.info("🎯 **Etapas seguintes**: Você pode comprar até **8 pneus novos**")
+        limite_compra = LIMITE_COMPRA_ETAPA
+        st.info(f"🎯 **Etapas seguintes**: Você pode comprar até **{limite_compra} pneus novos**")
 
-    pneus_comprados_etapa = len(st.session_state.df_cadastro[
-        st.session_state.df_cadastro['Etapa Cadastro'] == st.session_state.etapa_atual
+    pneus_comprados_etapa = len(st.session_state.cadastro.df[
+        st.session_state.cadastro.df['Etapa Cadastro'] == st.session_state.etapa_atual
     ])
 
-    pneus_anteriores = len(st.session_state.df_cadastro[
-        (st.session_state.df_cadastro['Etapa Atual'] == st.session_state.etapa_atual) &
-        (st.session_state.df_cadastro['Etapa Cadastro'] != st.session_state.etapa_atual)
+    pneus_anteriores = len(st.session_state.cadastro.df[
+        (st.session_state.cadastro.df['Etapa Atual'] == st.session_state.etapa_atual) &
+        (st.session_state.cadastro.df['Etapa Cadastro'] != st.session_state.etapa_atual)
     ])
 
     col1, col2, col3 = st.columns(3)
@@ -437,13 +701,13 @@ elif menu == "🛒 Comprar Pneus":
         with st.form("comprar_pneus_form"):
             st.markdown(f"### Cadastrar {qtd_pneus} pneu(s)")
 
-            if len(st.session_state.df_carros) == 0:
+            if len(st.session_state.carros) == 0:
                 st.error("⚠️ Cadastre carros antes de comprar pneus!")
                 st.stop()
 
             carro_selecionado = st.selectbox(
                 "Carro Vinculado",
-                options=st.session_state.df_carros[st.session_state.df_carros['Status'] == 'Ativo']['Nome'].tolist()
+                options=st.session_state.carros.df[st.session_state.carros.df['Status'] == 'Ativo']['Nome'].tolist()
             )
 
             col1, col2 = st.columns(2)
@@ -457,14 +721,26 @@ elif menu == "🛒 Comprar Pneus":
 
             submitted = st.form_submit_button(f"✅ Comprar {qtd_pneus} Pneus", use_container_width=True)
 
-            if submitted:
+            nomes_novos = [f"{prefixo}{inicio_numeracao + i:03d}" for i in range(qtd_pneus)]
+            # Nomes e códigos valem para a temporada toda: consulta também as etapas anteriores no banco
+            repetidos = [nome for nome in nomes_novos if st.session_state.cadastro.existe(nome)]
+
+            # Códigos de barras a partir de etapa + numeração, pulando os já usados (outro prefixo, mesma numeração)
+            codigos_novos = []
+            codigo = int(f"{st.session_state.etapa_atual}{inicio_numeracao:05d}")
+            while len(codigos_novos) < qtd_pneus:
+                if not st.session_state.cadastro.existe(codigo, 'Código de Barras'):
+                    codigos_novos.append(codigo)
+                codigo += 1
+
+            if submitted and repetidos:
+                st.error(f"⚠️ Já existem pneus com estes nomes: {', '.join(repetidos)}. "
+                         "Mude o prefixo ou o número inicial.")
+            elif submitted:
                 novos_pneus = []
                 data_cadastro = datetime.now().strftime('%d/%m/%Y')
 
-                for i in range(qtd_pneus):
-                    nome_pneu = f"{prefixo}{inicio_numeracao + i:03d}"
-                    codigo_barras = int(f"{st.session_state.etapa_atual}{inicio_numeracao + i:05d}")
-
+                for nome_pneu, codigo_barras in zip(nomes_novos, codigos_novos):
                     novo_pneu = {
                         'Nome do Pneu': nome_pneu,
                         'Código de Barras': codigo_barras,
@@ -480,11 +756,7 @@ elif menu == "🛒 Comprar Pneus":
                     }
                     novos_pneus.append(novo_pneu)
 
-                df_novos = pd.DataFrame(novos_pneus)
-                st.session_state.df_cadastro = pd.concat(
-                    [st.session_state.df_cadastro, df_novos],
-                    ignore_index=True
-                )
+                st.session_state.cadastro.adicionar_varios(novos_pneus)
 
                 st.success(f"✅ {qtd_pneus} pneu(s) comprado(s) com sucesso!")
                 st.balloons()
@@ -499,21 +771,19 @@ elif menu == "🏎️ Gerenciar Carros":
     with tab1:
         st.subheader("Carros Cadastrados")
 
-        if len(st.session_state.df_carros) > 0:
-            st.dataframe(st.session_state.df_carros, use_container_width=True)
+        if len(st.session_state.carros) > 0:
+            st.dataframe(st.session_state.carros.df, use_container_width=True)
 
             st.markdown("---")
             st.markdown("### Editar ou Remover Carro")
 
             carro_selecionado = st.selectbox(
                 "Selecionar Carro",
-                options=st.session_state.df_carros['Nome'].tolist()
+                options=st.session_state.carros.df['Nome'].tolist()
             )
 
             if carro_selecionado:
-                carro_info = st.session_state.df_carros[
-                    st.session_state.df_carros['Nome'] == carro_selecionado
-                ].iloc[0]
+                carro_info = st.session_state.carros.obter(carro_selecionado)
 
                 col1, col2 = st.columns(2)
 
@@ -539,24 +809,21 @@ elif menu == "🏎️ Gerenciar Carros":
                             remover = st.form_submit_button("🗑️ Remover", type="secondary", use_container_width=True)
 
                         if atualizar:
-                            st.session_state.df_carros.loc[
-                                st.session_state.df_carros['Nome'] == carro_selecionado,
-                                ['Número', 'Piloto', 'Status']
-                            ] = [novo_numero, novo_piloto, novo_status]
+                            st.session_state.carros.atualizar(
+                                carro_selecionado,
+                                {'Número': novo_numero, 'Piloto': novo_piloto, 'Status': novo_status}
+                            )
                             st.success("Carro atualizado!")
                             st.rerun()
 
                         if remover:
-                            pneus_vinculados = len(st.session_state.df_cadastro[
-                                st.session_state.df_cadastro['Carro Vinculado'] == carro_selecionado
-                            ])
+                            df_cadastro = st.session_state.cadastro.df_completo()
+                            pneus_vinculados = len(df_cadastro[df_cadastro['Carro Vinculado'] == carro_selecionado])
 
                             if pneus_vinculados > 0:
                                 st.error(f"⚠️ Não é possível remover! {pneus_vinculados} pneu(s) vinculado(s).")
                             else:
-                                st.session_state.df_carros = st.session_state.df_carros[
-                                    st.session_state.df_carros['Nome'] != carro_selecionado
-                                ]
+                                st.session_state.carros.remover(carro_selecionado)
                                 st.success("Carro removido!")
                                 st.rerun()
         else:
@@ -580,22 +847,17 @@ elif menu == "🏎️ Gerenciar Carros":
 
             if submitted:
                 if nome_carro and numero_carro and piloto_carro:
-                    if nome_carro in st.session_state.df_carros['Nome'].values:
+                    if nome_carro in st.session_state.carros:
                         st.error("⚠️ Já existe um carro com este nome!")
                     else:
-                        novo_carro = pd.DataFrame([{
+                        st.session_state.carros.adicionar({
                             'Nome': nome_carro,
                             'Número': numero_carro,
                             'Piloto': piloto_carro,
                             'Categoria': categoria,
                             'Status': 'Ativo',
                             'Data Cadastro': datetime.now().strftime('%d/%m/%Y')
-                        }])
-
-                        st.session_state.df_carros = pd.concat(
-                            [st.session_state.df_carros, novo_carro],
-                            ignore_index=True
-                        )
+                        })
                         st.success(f"✅ Carro {nome_carro} adicionado!")
                         st.rerun()
                 else:
@@ -605,13 +867,30 @@ elif menu == "🏎️ Gerenciar Carros":
 elif menu == "📏 Registrar Medição":
     st.header("Registrar Medição de Pneus")
 
-    pneus_etapa = st.session_state.df_cadastro[
-        st.session_state.df_cadastro['Etapa Atual'] == st.session_state.etapa_atual
+    pneus_etapa = st.session_state.cadastro.df[
+        st.session_state.cadastro.df['Etapa Atual'] == st.session_state.etapa_atual
     ]
 
     if len(pneus_etapa) == 0:
         st.warning("⚠️ Nenhum pneu disponível nesta etapa!")
     else:
+        nomes_etapa = pneus_etapa['Nome do Pneu'].tolist()
+
+        def selecionar_por_codigo():
+            pneu = buscar_por_codigo(st.session_state.codigo_medicao)
+            if pneu is None:
+                st.session_state.aviso_codigo = f"⚠️ Código {st.session_state.codigo_medicao} não encontrado!"
+            elif pneu['Nome do Pneu'] not in nomes_etapa:
+                st.session_state.aviso_codigo = f"⚠️ Pneu {pneu['Nome do Pneu']} não está na etapa atual!"
+            else:
+                st.session_state.pneu_medicao = pneu['Nome do Pneu']
+                st.session_state.aviso_codigo = None
+
+        st.text_input("📷 Código de Barras", key="codigo_medicao", on_change=selecionar_por_codigo,
+                      placeholder="Leia ou digite o código e tecle Enter")
+        if st.session_state.get('aviso_codigo'):
+            st.warning(st.session_state.aviso_codigo)
+
         with st.form("medicao_form"):
             st.subheader("Dados da Medição")
 
@@ -620,10 +899,11 @@ elif menu == "📏 Registrar Medição":
             with col1:
                 pneu_selecionado = st.selectbox(
                     "Pneu",
-                    options=pneus_etapa['Nome do Pneu'].tolist()
+                    options=nomes_etapa,
+                    key="pneu_medicao"
                 )
 
-                pneu_info = pneus_etapa[pneus_etapa['Nome do Pneu'] == pneu_selecionado].iloc[0]
+                pneu_info = st.session_state.cadastro.obter(pneu_selecionado)
 
                 st.info(f"**Carro:** {pneu_info['Carro Vinculado']}")
                 st.info(f"**KM Atual:** {pneu_info['Quilometragem atual']}")
@@ -633,19 +913,17 @@ elif menu == "📏 Registrar Medição":
                 tempo_pista = st.number_input("Tempo em Pista (min)", min_value=1, value=20)
 
             with col2:
-                etapa_info = st.session_state.df_calendario[
-                    st.session_state.df_calendario['Etapa'] == st.session_state.etapa_atual
+                etapa_info = st.session_state.calendario.df[
+                    st.session_state.calendario.df['Etapa'] == st.session_state.etapa_atual
                 ].iloc[0]
 
                 pista_etapa = etapa_info['Pista']
                 st.info(f"**Pista da Etapa:** {pista_etapa}")
 
-                pista_info = st.session_state.df_pistas[
-                    st.session_state.df_pistas['Nome'] == pista_etapa
-                ]
+                pista_info = st.session_state.pistas.obter(pista_etapa)
 
-                if len(pista_info) > 0:
-                    km_volta = pista_info.iloc[0]['KM por Volta']
+                if pista_info is not None:
+                    km_volta = pista_info['KM por Volta']
                     st.info(f"**KM por Volta:** {km_volta:.3f} km")
                     quilometragem = voltas * km_volta
                     st.metric("Quilometragem Calculada", f"{quilometragem:.2f} km")
@@ -673,48 +951,47 @@ elif menu == "📏 Registrar Medição":
             submitted = st.form_submit_button("✅ Registrar Medição", use_container_width=True)
 
             if submitted:
-                km_total_anterior = pneu_info['Quilometragem atual']
+                # Pneus importados com km ou limite em branco voltam do banco como None
+                km_total_anterior = pd.to_numeric(pneu_info['Quilometragem atual'], errors='coerce')
+                if pd.isna(km_total_anterior):
+                    km_total_anterior = 0.0
                 km_total_novo = km_total_anterior + quilometragem
 
-                limite_km = pneu_info['Limite KM']
+                limite_km = pd.to_numeric(pneu_info['Limite KM'], errors='coerce')
                 condicao_km = "ok" if km_total_novo < limite_km * 0.8 else "alerta" if km_total_novo < limite_km else "crítico"
 
                 condicao_twi = "ok" if prof_media > 2.0 else "alerta" if prof_media > 1.5 else "crítico"
 
                 acao = "continuar" if condicao_km == "ok" and condicao_twi == "ok" else "atenção" if condicao_km == "alerta" or condicao_twi == "alerta" else "descartar"
 
-                nova_medicao = pd.DataFrame([{
-                    'Código do Pneu': pneu_selecionado,
-                    'Quilometragem Atual': km_total_anterior,
-                    'Código de Barras': pneu_info['Código de Barras'],
-                    'Carro': pneu_info['Carro Vinculado'],
-                    'Data Medição': datetime.now().strftime('%d/%m/%Y %H:%M'),
-                    'Tipo Evento': tipo_evento,
-                    'Voltas': voltas,
-                    'Tempo Pista (min)': tempo_pista,
-                    'Pista': pista_etapa,
-                    'Quilometragem': quilometragem,
-                    'KM TOTAL': km_total_novo,
-                    'Interno (mm)': interno,
-                    'Centro Interno (mm)': centro_int,
-                    'Centro Externo (mm)': centro_ext,
-                    'Externo (mm)': externo,
-                    'Profundidade Média (mm)': prof_media,
-                    'Condição (twi)': condicao_twi,
-                    'Condição (km)': condicao_km,
-                    'AÇÃO': acao,
-                    'Etapa': st.session_state.etapa_atual
-                }])
-
-                st.session_state.df_medicoes = pd.concat(
-                    [st.session_state.df_medicoes, nova_medicao],
-                    ignore_index=True
-                )
-
-                st.session_state.df_cadastro.loc[
-                    st.session_state.df_cadastro['Nome do Pneu'] == pneu_selecionado,
-                    ['Quilometragem atual', 'Status', 'Status Etapa']
-                ] = [km_total_novo, 'Usado', 'Em uso']
+                with banco.transacao():
+                    st.session_state.medicoes.adicionar({
+                        'Código do Pneu': pneu_selecionado,
+                        'Quilometragem Atual': km_total_anterior,
+                        'Código de Barras': pneu_info['Código de Barras'],
+                        'Carro': pneu_info['Carro Vinculado'],
+                        'Data Medição': datetime.now().strftime('%d/%m/%Y %H:%M'),
+                        'Tipo Evento': tipo_evento,
+                        'Voltas': voltas,
+                        'Tempo Pista (min)': tempo_pista,
+                        'Pista': pista_etapa,
+                        'Quilometragem': quilometragem,
+                        'KM TOTAL': km_total_novo,
+                        'Interno (mm)': interno,
+                        'Centro Interno (mm)': centro_int,
+                        'Centro Externo (mm)': centro_ext,
+                        'Externo (mm)': externo,
+                        'Profundidade Média (mm)': prof_media,
+                        'Condição (twi)': condicao_twi,
+                        'Condição (km)': condicao_km,
+                        'AÇÃO': acao,
+                        'Etapa': st.session_state.etapa_atual
+                    })
+
+                    st.session_state.cadastro.atualizar(
+                        pneu_selecionado,
+                        {'Quilometragem atual': km_total_novo, 'Status': 'Usado', 'Status Etapa': 'Em uso'}
+                    )
 
                 st.success("✅ Medição registrada com sucesso!")
 
@@ -734,19 +1011,22 @@ elif menu == "📋 Visualizar Dados":
     with tab1:
         st.subheader("Cadastro de Pneus")
 
+        # Temporada inteira (pneus de etapas anteriores vêm do banco)
+        df_cadastro = st.session_state.cadastro.df_completo()
+
         col1, col2 = st.columns(2)
         with col1:
             etapas_filtro = st.multiselect(
                 "Filtrar por Etapa",
-                options=sorted(st.session_state.df_cadastro['Etapa Atual'].unique()) if len(st.session_state.df_cadastro) > 0 else []
+                options=sorted(df_cadastro['Etapa Atual'].unique()) if len(df_cadastro) > 0 else []
             )
         with col2:
             status_filtro = st.multiselect(
                 "Filtrar por Status Etapa",
-                options=st.session_state.df_cadastro['Status Etapa'].unique() if len(st.session_state.df_cadastro) > 0 else []
+                options=df_cadastro['Status Etapa'].unique() if len(df_cadastro) > 0 else []
             )
 
-        df_filtrado = st.session_state.df_cadastro.copy()
+        df_filtrado = df_cadastro.copy()
         if etapas_filtro:
             df_filtrado = df_filtrado[df_filtrado['Etapa Atual'].isin(etapas_filtro)]
         if status_filtro:
@@ -759,8 +1039,9 @@ elif menu == "📋 Visualizar Dados":
 
     with tab2:
         st.subheader("Histórico de Medições")
-        if len(st.session_state.df_medicoes) > 0:
-            st.dataframe(st.session_state.df_medicoes, use_container_width=True)
+        df_medicoes = st.session_state.medicoes.df_completo()
+        if len(df_medicoes) > 0:
+            st.dataframe(df_medicoes, use_container_width=True)
         else:
             st.info("Nenhuma medição registrada ainda.")
 
@@ -770,24 +1051,77 @@ elif menu == "📋 Visualizar Dados":
 elif menu == "🔧 Montagem de Sets":
     st.header("Gerenciar Montagem de Sets de Pneus")
 
-    if 'df_sets' not in st.session_state:
-        st.session_state.df_sets = pd.DataFrame(columns=[
-            'ID Set', 'Nome do Set', 'Carro', 'Data Montagem', 'Status', 'Etapa',
-            'Pneu Dianteiro Esquerdo', 'Pneu Dianteiro Direito',
-            'Pneu Traseiro Esquerdo', 'Pneu Traseiro Direito'
-        ])
-
     tab1, tab2, tab3 = st.tabs(["🔧 Montar Novo Set", "📋 Sets Ativos", "📜 Histórico de Sets"])
 
     with tab1:
         st.subheader("Montar Novo Set de Pneus")
 
-        pneus_etapa = st.session_state.df_cadastro[
-            (st.session_state.df_cadastro['Etapa Atual'] == st.session_state.etapa_atual) &
-            (st.session_state.df_cadastro['Status Etapa'] == 'Disponível')
+        pneus_etapa = st.session_state.cadastro.df[
+            (st.session_state.cadastro.df['Etapa Atual'] == st.session_state.etapa_atual) &
+            (st.session_state.cadastro.df['Status Etapa'] == 'Disponível')
         ]
 
         if len(pneus_etapa) >= 4:
+            with st.expander("🧠 Sugestão Automática (todos os carros)"):
+                etapa_info = st.session_state.calendario.df[
+                    st.session_state.calendario.df['Etapa'] == st.session_state.etapa_atual
+                ].iloc[0]
+                pista_info = st.session_state.pistas.obter(etapa_info['Pista'])
+                km_volta = pista_info['KM por Volta'] if pista_info is not None else 4.0
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    sets_por_carro = st.number_input("Sets por carro", min_value=1, max_value=4, value=1)
+                with col2:
+                    voltas_stint = st.number_input("Voltas do stint", min_value=1, value=30)
+
+                if st.button("🧠 Sugerir Montagem", use_container_width=True):
+                    st.session_state.sugestao_sets = sugerir_sets(
+                        st.session_state.cadastro.df, st.session_state.medicoes.df, st.session_state.sets.df,
+                        st.session_state.etapa_atual, voltas_stint * km_volta, sets_por_carro
+                    )
+
+                sugestao = st.session_state.get('sugestao_sets')
+                if sugestao is not None and len(sugestao) > 0:
+                    st.dataframe(sugestao, use_container_width=True, hide_index=True)
+                    completos = sugestao.dropna(subset=list(POSICOES))
+
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("📝 Preencher formulário com o 1º set", use_container_width=True,
+                                     disabled=len(completos) == 0):
+                            primeiro = completos.iloc[0]
+                            st.session_state.carro_set = primeiro['Carro']
+                            for posicao in POSICOES:
+                                st.session_state[f"pneu_{posicao.lower()}"] = primeiro[posicao]
+                            st.rerun()
+                    with col2:
+                        if st.button(f"✅ Montar {len(completos)} Set(s) Completo(s)", type="primary",
+                                     use_container_width=True, disabled=len(completos) == 0):
+                            primeiro_id = (st.session_state.sets.maximo('ID Set') or 0) + 1
+                            novos_sets = pd.DataFrame({
+                                'ID Set': range(primeiro_id, primeiro_id + len(completos)),
+                                'Nome do Set': [f"Set Etapa {st.session_state.etapa_atual} - {carro} #{numero}"
+                                                for carro, numero in zip(completos['Carro'], completos['Set'])],
+                                'Carro': completos['Carro'].values,
+                                'Data Montagem': datetime.now().strftime('%d/%m/%Y'),
+                                'Status': 'Ativo',
+                                'Etapa': st.session_state.etapa_atual,
+                                **{coluna: completos[posicao].values for coluna, posicao in zip(COLUNAS_POSICOES, POSICOES)}
+                            })
+
+                            with banco.transacao():
+                                st.session_state.sets.adicionar_varios(novos_sets)
+                                st.session_state.cadastro.atualizar_varios(
+                                    completos[list(POSICOES)].stack().tolist(), {'Status Etapa': 'Montado'}
+                                )
+                            st.session_state.sugestao_sets = None
+
+                            st.success(f"✅ {len(novos_sets)} set(s) montado(s)!")
+                            st.rerun()
+                elif sugestao is not None:
+                    st.warning("⚠️ Nenhum pneu disponível para montar sets.")
+
             with st.form("montar_set_form"):
                 col1, col2 = st.columns([2, 1])
 
@@ -798,7 +1132,7 @@ elif menu == "🔧 Montagem de Sets":
                     )
 
                     carros_disponiveis = pneus_etapa['Carro Vinculado'].unique()
-                    carro_set = st.selectbox("Carro", options=carros_disponiveis)
+                    carro_set = st.selectbox("Carro", options=carros_disponiveis, key="carro_set")
 
                 with col2:
                     data_montagem = st.date_input("Data de Montagem", value=datetime.now())
@@ -808,16 +1142,12 @@ elif menu == "🔧 Montagem de Sets":
 
                 pneus_carro = pneus_etapa[pneus_etapa['Carro Vinculado'] == carro_set]['Nome do Pneu'].tolist()
 
-                sets_ativos = st.session_state.df_sets[
-                    (st.session_state.df_sets['Status'] == 'Ativo') &
-                    (st.session_state.df_sets['Etapa'] == st.session_state.etapa_atual)
+                sets_ativos = st.session_state.sets.df[
+                    (st.session_state.sets.df['Status'] == 'Ativo') &
+                    (st.session_state.sets.df['Etapa'] == st.session_state.etapa_atual)
                 ]
 
-                pneus_montados = []
-                if len(sets_ativos) > 0:
-                    for col in ['Pneu Dianteiro Esquerdo', 'Pneu Dianteiro Direito',
-                               'Pneu Traseiro Esquerdo', 'Pneu Traseiro Direito']:
-                        pneus_montados.extend(sets_ativos[col].dropna().tolist())
+                pneus_montados = set(sets_ativos[COLUNAS_POSICOES].stack().tolist())
 
                 pneus_disponiveis = [p for p in pneus_carro if p not in pneus_montados]
 
@@ -847,34 +1177,24 @@ elif menu == "🔧 Montagem de Sets":
                     elif len(pneus_validos) != 4:
                         st.error("⚠️ Selecione os 4 pneus para montar o set!")
                     else:
-                        if len(st.session_state.df_sets) > 0:
-                            novo_id = st.session_state.df_sets['ID Set'].max() + 1
-                        else:
-                            novo_id = 1
-
-                        novo_set = pd.DataFrame([{
-                            'ID Set': novo_id,
-                            'Nome do Set': nome_set,
-                            'Carro': carro_set,
-                            'Data Montagem': data_montagem.strftime('%d/%m/%Y'),
-                            'Status': 'Ativo',
-                            'Etapa': st.session_state.etapa_atual,
-                            'Pneu Dianteiro Esquerdo': pneu_de,
-                            'Pneu Dianteiro Direito': pneu_dd,
-                            'Pneu Traseiro Esquerdo': pneu_te,
-                            'Pneu Traseiro Direito': pneu_td
-                        }])
-
-                        st.session_state.df_sets = pd.concat(
-                            [st.session_state.df_sets, novo_set],
-                            ignore_index=True
-                        )
+                        # IDs únicos na temporada: o máximo vem do banco, não só da etapa em memória
+                        novo_id = (st.session_state.sets.maximo('ID Set') or 0) + 1
+
+                        with banco.transacao():
+                            st.session_state.sets.adicionar({
+                                'ID Set': novo_id,
+                                'Nome do Set': nome_set,
+                                'Carro': carro_set,
+                                'Data Montagem': data_montagem.strftime('%d/%m/%Y'),
+                                'Status': 'Ativo',
+                                'Etapa': st.session_state.etapa_atual,
+                                'Pneu Dianteiro Esquerdo': pneu_de,
+                                'Pneu Dianteiro Direito': pneu_dd,
+                                'Pneu Traseiro Esquerdo': pneu_te,
+                                'Pneu Traseiro Direito': pneu_td
+                            })
 
-                        for pneu in pneus_validos:
-                            st.session_state.df_cadastro.loc[
-                                st.session_state.df_cadastro['Nome do Pneu'] == pneu,
-                                'Status Etapa'
-                            ] = 'Montado'
+                            st.session_state.cadastro.atualizar_varios(pneus_validos, {'Status Etapa': 'Montado'})
 
                         st.success(f"✅ Set '{nome_set}' montado com sucesso!")
                         st.balloons()
@@ -885,9 +1205,9 @@ elif menu == "🔧 Montagem de Sets":
     with tab2:
         st.subheader("Sets Atualmente Montados")
 
-        sets_ativos = st.session_state.df_sets[
-            (st.session_state.df_sets['Status'] == 'Ativo') &
-            (st.session_state.df_sets['Etapa'] == st.session_state.etapa_atual)
+        sets_ativos = st.session_state.sets.df[
+            (st.session_state.sets.df['Status'] == 'Ativo') &
+            (st.session_state.sets.df['Etapa'] == st.session_state.etapa_atual)
         ]
 
         if len(sets_ativos) > 0:
@@ -905,18 +1225,12 @@ elif menu == "🔧 Montagem de Sets":
 
                     with col3:
                         if st.button("🔓 Desmontar", key=f"desmontar_{set_row['ID Set']}"):
-                            st.session_state.df_sets.loc[
-                                st.session_state.df_sets['ID Set'] == set_row['ID Set'],
-                                'Status'
-                            ] = 'Desmontado'
-
-                            for col in ['Pneu Dianteiro Esquerdo', 'Pneu Dianteiro Direito',
-                                       'Pneu Traseiro Esquerdo', 'Pneu Traseiro Direito']:
-                                pneu = set_row[col]
-                                st.session_state.df_cadastro.loc[
-                                    st.session_state.df_cadastro['Nome do Pneu'] == pneu,
-                                    'Status Etapa'
-                                ] = 'Disponível'
+                            with banco.transacao():
+                                st.session_state.sets.atualizar(set_row['ID Set'], {'Status': 'Desmontado'})
+
+                                st.session_state.cadastro.atualizar_varios(
+                                    set_row[COLUNAS_POSICOES].tolist(), {'Status Etapa': 'Disponível'}
+                                )
 
                             st.success("Set desmontado!")
                             st.rerun()
@@ -944,9 +1258,8 @@ elif menu == "🔧 Montagem de Sets":
     with tab3:
         st.subheader("Histórico de Sets")
 
-        sets_desmontados = st.session_state.df_sets[
-            st.session_state.df_sets['Status'] == 'Desmontado'
-        ]
+        df_sets = st.session_state.sets.df_completo()
+        sets_desmontados = df_sets[df_sets['Status'] == 'Desmontado']
 
         if len(sets_desmontados) > 0:
             st.dataframe(sets_desmontados, use_container_width=True)
@@ -962,21 +1275,19 @@ elif menu == "🏆 Gerenciar Pistas":
     with tab1:
         st.subheader("Pistas Cadastradas")
 
-        if len(st.session_state.df_pistas) > 0:
-            st.dataframe(st.session_state.df_pistas, use_container_width=True)
+        if len(st.session_state.pistas) > 0:
+            st.dataframe(st.session_state.pistas.df, use_container_width=True)
 
             st.markdown("---")
             st.markdown("### Editar ou Remover Pista")
 
             pista_selecionada = st.selectbox(
                 "Selecionar Pista",
-                options=st.session_state.df_pistas['Nome'].tolist()
+                options=st.session_state.pistas.df['Nome'].tolist()
             )
 
             if pista_selecionada:
-                pista_info = st.session_state.df_pistas[
-                    st.session_state.df_pistas['Nome'] == pista_selecionada
-                ].iloc[0]
+                pista_info = st.session_state.pistas.obter(pista_selecionada)
 
                 col1, col2 = st.columns(2)
 
@@ -1008,17 +1319,15 @@ elif menu == "🏆 Gerenciar Pistas":
                             remover = st.form_submit_button("🗑️ Remover", type="secondary", use_container_width=True)
 
                         if atualizar:
-                            st.session_state.df_pistas.loc[
-                                st.session_state.df_pistas['Nome'] == pista_selecionada,
-                                ['KM por Volta', 'Localização']
-                            ] = [novo_km, nova_localizacao]
+                            st.session_state.pistas.atualizar(
+                                pista_selecionada,
+                                {'KM por Volta': novo_km, 'Localização': nova_localizacao}
+                            )
                             st.success("Pista atualizada!")
                             st.rerun()
 
                         if remover:
-                            st.session_state.df_pistas = st.session_state.df_pistas[
-                                st.session_state.df_pistas['Nome'] != pista_selecionada
-                            ]
+                            st.session_state.pistas.remover(pista_selecionada)
                             st.success("Pista removida!")
                             st.rerun()
         else:
@@ -1042,19 +1351,14 @@ elif menu == "🏆 Gerenciar Pistas":
 
             if submitted:
                 if nome_pista and km_volta > 0 and localizacao:
-                    if nome_pista in st.session_state.df_pistas['Nome'].values:
+                    if nome_pista in st.session_state.pistas:
                         st.error("⚠️ Já existe uma pista com este nome!")
                     else:
-                        nova_pista = pd.DataFrame([{
+                        st.session_state.pistas.adicionar({
                             'Nome': nome_pista,
                             'KM por Volta': km_volta,
                             'Localização': localizacao
-                        }])
-
-                        st.session_state.df_pistas = pd.concat(
-                            [st.session_state.df_pistas, nova_pista],
-                            ignore_index=True
-                        )
+                        })
                         st.success(f"✅ Pista {nome_pista} adicionada!")
                         st.rerun()
                 else:
@@ -1069,16 +1373,17 @@ elif menu == "📜 Histórico":
     with tab1:
         st.subheader("Histórico Completo de Pneus")
 
-        if len(st.session_state.df_cadastro) > 0:
+        # Pneus e medições de todas as etapas, só com as colunas usadas (snapshot colunar)
+        df_cadastro = colunas_temporada('cadastro', ['Nome do Pneu', 'Etapa Cadastro', 'Etapa Atual', 'Status Etapa'])
+
+        if len(df_cadastro) > 0:
             pneu_selecionado = st.selectbox(
                 "Selecionar Pneu",
-                options=st.session_state.df_cadastro['Nome do Pneu'].tolist()
+                options=df_cadastro['Nome do Pneu'].tolist()
             )
 
             if pneu_selecionado:
-                pneu_info = st.session_state.df_cadastro[
-                    st.session_state.df_cadastro['Nome do Pneu'] == pneu_selecionado
-                ].iloc[0]
+                pneu_info = df_cadastro[df_cadastro['Nome do Pneu'] == pneu_selecionado].iloc[0]
 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -1090,34 +1395,52 @@ elif menu == "📜 Histórico":
 
                 st.markdown("---")
 
-                medicoes_pneu = st.session_state.df_medicoes[
-                    st.session_state.df_medicoes['Código do Pneu'] == pneu_selecionado
-                ]
+                df_medicoes = colunas_temporada('medicoes', COLUNAS_MEDICOES)
+                medicoes_pneu = df_medicoes[df_medicoes['Código do Pneu'] == pneu_selecionado]
 
                 if len(medicoes_pneu) > 0:
                     st.markdown("### Histórico de Medições")
                     st.dataframe(medicoes_pneu, use_container_width=True)
 
                     st.markdown("### Evolução da Profundidade")
-                    medicoes_pneu_sorted = medicoes_pneu.sort_values('Data Medição')
+                    # Série do pneu já em ordem cronológica (data/hora real, não o texto da data)
+                    series = series_profundidade()
+                    serie = series.serie(pneu_selecionado)
+                    taxas = series.taxas_desgaste().set_index('Pneu')
 
                     fig = go.Figure()
                     fig.add_trace(go.Scatter(
-                        x=list(range(1, len(medicoes_pneu_sorted) + 1)),
-                        y=medicoes_pneu_sorted['Profundidade Média (mm)'],
+                        x=serie['KM'],
+                        y=serie['Média'],
                         mode='lines+markers',
                         name='Profundidade Média',
-                        line=dict(width=3)
+                        line=dict(width=3),
+                        customdata=serie['Data'].dt.strftime('%d/%m/%Y %H:%M'),
+                        hovertemplate='%{customdata}<br>%{x:.0f} km: %{y:.2f} mm'
                     ))
+                    for posicao in ['Interno', 'Centro Interno', 'Centro Externo', 'Externo']:
+                        fig.add_trace(go.Scatter(
+                            x=serie['KM'],
+                            y=serie[posicao],
+                            mode='lines',
+                            name=posicao,
+                            line=dict(width=1, dash='dot')
+                        ))
 
                     fig.update_layout(
                         title=f"Evolução - {pneu_selecionado}",
-                        xaxis_title="Número da Medição",
+                        xaxis_title="KM Total",
                         yaxis_title="Profundidade (mm)",
                         height=400
                     )
 
                     st.plotly_chart(fig, use_container_width=True)
+
+                    taxa = taxas['Média'].get(pneu_selecionado, np.nan)
+                    if pd.notna(taxa):
+                        st.metric("Taxa de Desgaste", f"{taxa:.3f} mm/100 km")
+                    else:
+                        st.caption("Taxa de desgaste disponível a partir de duas medições com KM diferente.")
                 else:
                     st.info("Nenhuma medição registrada para este pneu.")
         else:
@@ -1127,19 +1450,21 @@ elif menu == "📜 Histórico":
         st.subheader("Resumo por Etapa")
 
         if len(st.session_state.historico_etapas) > 0:
-            st.dataframe(st.session_state.historico_etapas, use_container_width=True)
+            st.dataframe(st.session_state.historico_etapas.df, use_container_width=True)
         else:
             st.info("Nenhuma etapa concluída ainda.")
 
     with tab3:
         st.subheader("Análises e Estatísticas")
 
-        if len(st.session_state.df_cadastro) > 0:
+        df_cadastro = colunas_temporada('cadastro', ['Etapa Cadastro', 'Status Etapa'])
+
+        if len(df_cadastro) > 0:
             col1, col2 = st.columns(2)
 
             with col1:
                 st.markdown("### Pneus por Etapa de Origem")
-                origem_count = st.session_state.df_cadastro['Etapa Cadastro'].value_counts().sort_index()
+                origem_count = df_cadastro['Etapa Cadastro'].value_counts().sort_index()
                 fig = px.bar(
                     x=origem_count.index,
                     y=origem_count.values,
@@ -1150,13 +1475,28 @@ elif menu == "📜 Histórico":
 
             with col2:
                 st.markdown("### Status dos Pneus")
-                status_count = st.session_state.df_cadastro['Status Etapa'].value_counts()
+                status_count = df_cadastro['Status Etapa'].value_counts()
                 fig = px.pie(
                     values=status_count.values,
                     names=status_count.index,
                     title="Distribuição de Status"
                 )
                 st.plotly_chart(fig, use_container_width=True)
+
+            # Taxa de desgaste de todos os pneus (regressão profundidade x km, calculada de uma vez)
+            taxas = series_profundidade().taxas_desgaste().dropna(subset=['Média'])
+            if len(taxas) > 0:
+                st.markdown("### Taxa de Desgaste por Pneu")
+                taxas = taxas.sort_values('Média', ascending=False)
+                fig = px.bar(
+                    taxas,
+                    x='Pneu',
+                    y='Média',
+                    labels={'Média': 'Desgaste (mm/100 km)'},
+                    title="Desgaste Médio da Banda"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(taxas.round(3), use_container_width=True, hide_index=True)
         else:
             st.info("Sem dados para análise.")
 
@@ -1172,18 +1512,29 @@ elif menu == "📤 Importar/Exportar":
 
     with col2:
         st.subheader("📤 Exportar")
-        if len(st.session_state.df_cadastro) > 0 or len(st.session_state.df_medicoes) > 0:
-            excel_data = save_to_excel(
-                st.session_state.df_cadastro,
-                st.session_state.df_medicoes
-            )
-
-            st.download_button(
-                label="⬇️ Download Excel",
-                data=excel_data,
-                file_name=f"Tire_Management_Etapa_{st.session_state.etapa_atual}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        if st.session_state.cadastro.total() > 0 or st.session_state.medicoes.total() > 0:
+            # Todas as tabelas (temporada inteira) e o calendário, nas abas que o import reconhece
+            def montar_abas():
+                return {
+                    aba: st.session_state[chave].df_completo()
+                    for aba, (chave, _) in ABAS_EXCEL.items()
+                }
+
+            # Muda a cada commit no banco (inclusive troca de etapa e calendário importado)
+            versao_dados = banco.versao
+
+            if st.button("📦 Gerar arquivo Excel", use_container_width=True):
+                st.session_state.versao_exportada = versao_dados
+
+            if st.session_state.get('versao_exportada') == versao_dados:
+                st.download_button(
+                    label="⬇️ Download Excel",
+                    data=save_to_excel(versao_dados, montar_abas),
+                    file_name=f"Tire_Management_Etapa_{st.session_state.etapa_atual}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+            else:
+                st.caption("O arquivo é gerado sob demanda, com todas as tabelas do sistema.")
         else:
             st.warning("Nenhum dado para exportar.")
 
@@ -1200,13 +1551,12 @@ elif menu == "⚙️ Configurações":
 
         with col1:
             st.markdown("### 📊 Estatísticas do Sistema")
-            st.metric("Total de Pneus", len(st.session_state.df_cadastro))
-            st.metric("Total de Medições", len(st.session_state.df_medicoes))
-            st.metric("Total de Carros", len(st.session_state.df_carros))
+            st.metric("Total de Pneus", st.session_state.cadastro.total())
+            st.metric("Total de Medições", st.session_state.medicoes.total())
+            st.metric("Total de Carros", len(st.session_state.carros))
             st.metric("Etapa Atual", st.session_state.etapa_atual)
 
-            if 'df_sets' in st.session_state:
-                st.metric("Sets Criados", len(st.session_state.df_sets))
+            st.metric("Sets Criados", st.session_state.sets.total())
 
         with col2:
             st.markdown("### 🗑️ Limpar Sistema")
@@ -1216,9 +1566,11 @@ elif menu == "⚙️ Configurações":
             st.markdown("- ❌ Deletar todas as medições")
             st.markdown("- ❌ Deletar histórico de etapas")
             st.markdown("- ❌ Deletar sets montados")
+            st.markdown("- ❌ Deletar os outings registrados no motorsport_tires_v2_2 com esses sets")
             st.markdown("- ↩️ Resetar para Etapa 1")
             st.markdown("- ✅ Manter configuração de carros padrão")
             st.markdown("- ✅ Manter pistas cadastradas")
+            st.markdown("- ✅ Manter pneus, sets e outings criados só no motorsport_tires_v2_2")
 
             st.markdown("---")
 
@@ -0,0 +1,343 @@
+"""
+Camada de acesso a dados compartilhada pelo app1.py e pelo motorsport_tires_v2_2.py
+
+Um único motor de armazenamento para os dois apps: pool de conexões SQLite
+(PRAGMAs de desempenho, transações reentrantes com SAVEPOINTs), cache de
+leituras invalidado por tabela no commit e migrações de esquema versionadas
+por PRAGMA user_version. Cada app declara as suas tabelas e migrações e
+acessa o banco só por aqui.
+"""
+
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+
+def identificador(nome):
+    """Nome de tabela/coluna entre aspas (as colunas do app1 têm espaços e acentos)"""
+    return '"' + str(nome).replace('"', '""') + '"'
+
+
+def valor_sql(valor):
+    """Converte valores do pandas/numpy para tipos que o sqlite3 aceita"""
+    if valor is None:
+        return None
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if valor is pd.NaT or valor is pd.NA:
+        return None
+    if isinstance(valor, (pd.Timestamp, datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (bool, int, float, str, bytes)):
+        return valor
+    return str(valor)
+
+
+# PRAGMAs aplicados uma única vez na abertura de cada conexão
+PRAGMAS_CONEXAO = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",      # ~20 MB de cache de páginas
+    "PRAGMA mmap_size = 268435456",    # 256 MB mapeados em memória
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+class CacheLeituras:
+    """Cache em memória de leituras, invalidado por geração de tabela.
+
+    Cada tabela tem um contador de geração incrementado quando uma transação
+    que a altera faz commit. Uma entrada guarda as gerações das tabelas de que
+    depende no momento da leitura e só é servida enquanto elas não mudarem.
+    A época invalida todas as tabelas de uma vez (escrita de outro processo).
+    Leituras feitas dentro de uma transação não passam por aqui
+    (PoolConexoes.obter_em_cache).
+    """
+
+    def __init__(self, max_entradas=256):
+        self.max_entradas = max_entradas
+        self._epoca = 0
+        self._geracoes = {}
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def geracao(self, tabelas):
+        with self._lock:
+            return (self._epoca,) + tuple(self._geracoes.get(tabela, 0) for tabela in tabelas)
+
+    def invalidar(self, tabelas):
+        with self._lock:
+            for tabela in tabelas:
+                self._geracoes[tabela] = self._geracoes.get(tabela, 0) + 1
+
+    def invalidar_tudo(self):
+        with self._lock:
+            self._epoca += 1
+
+    def obter(self, chave, tabelas, carregar):
+        """Retorna o valor em cache para `chave` ou executa `carregar()`"""
+        # Assinatura tirada ANTES da leitura: um commit concorrente a torna obsoleta
+        assinatura = self.geracao(tabelas)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[0] == assinatura:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[1]
+            self.falhas += 1
+
+        valor = carregar()
+        with self._lock:
+            self._entradas[chave] = (assinatura, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return valor
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': (self.acertos / total * 100) if total else 0.0,
+                'entradas': len(self._entradas),
+                'geracoes': dict(self._geracoes),
+            }
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+class PoolConexoes:
+    """Pool de conexões SQLite de longa duração, reentrante por thread.
+
+    Cada thread recebe uma conexão do pool na primeira chamada e a reutiliza
+    em chamadas aninhadas; ao sair do bloco mais externo ela volta ao pool.
+    Assim os managers compartilham a mesma conexão (e a mesma transação)
+    durante uma renderização, sem abrir/fechar o banco a cada operação.
+    """
+
+    def __init__(self, caminho, tamanho_max=8):
+        self.caminho = caminho
+        self.tamanho_max = tamanho_max
+        self._livres = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.conexoes_abertas = 0
+        self._descartado = False
+        # Leituras dos managers, invalidadas no commit das transações de escrita
+        self.cache = CacheLeituras()
+        # Número de commits de escrita vistos pelo pool (chave de cache dos dados)
+        self.versao = 0
+        # PRAGMA data_version de cada conexão: muda quando outra conexão faz commit no arquivo
+        self._versoes_dados = {}
+
+    def _abrir(self):
+        conn = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None, timeout=10)
+        for pragma in PRAGMAS_CONEXAO:
+            conn.execute(pragma)
+        versao_dados = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            self.conexoes_abertas += 1
+            self._versoes_dados[conn] = versao_dados
+        return conn
+
+    def _fechar(self, conn):
+        with self._lock:
+            self._versoes_dados.pop(conn, None)
+        conn.close()
+
+    def _pegar(self):
+        with self._lock:
+            if self._livres:
+                return self._livres.pop()
+        return self._abrir()
+
+    def _devolver(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if not self._descartado and len(self._livres) < self.tamanho_max:
+                self._livres.append(conn)
+                return
+            self.conexoes_abertas -= 1
+        self._fechar(conn)
+
+    @contextmanager
+    def conexao(self):
+        """Empresta a conexão da thread atual (reentrante)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.profundidade += 1
+            try:
+                yield conn
+            finally:
+                self._local.profundidade -= 1
+            return
+
+        conn = self._pegar()
+        self._local.conn = conn
+        self._local.profundidade = 0
+        self._local.savepoints = 0
+        self._local.ao_desfazer = []
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._devolver(conn)
+
+    @contextmanager
+    def transacao(self, tabelas=()):
+        """Abre uma transação; blocos aninhados viram SAVEPOINTs da transação externa.
+
+        `tabelas` são as tabelas alteradas pelo bloco: suas gerações no cache de
+        leituras só avançam depois do commit da transação mais externa.
+        """
+        with self.conexao() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+                self._local.tabelas_alteradas = set(tabelas)
+                self._local.ao_desfazer = []
+                try:
+                    yield conn
+                except BaseException:
+                    conn.rollback()
+                    self._desfazer(0)
+                    raise
+                else:
+                    conn.commit()
+                    self.versao += 1
+                    self.cache.invalidar(self._local.tabelas_alteradas)
+                finally:
+                    self._local.tabelas_alteradas = set()
+                    self._local.ao_desfazer = []
+                return
+
+            self._local.tabelas_alteradas.update(tabelas)
+            self._local.savepoints += 1
+            savepoint = f"sp_{self._local.savepoints}"
+            inicio_desfazer = len(self._local.ao_desfazer)
+            conn.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                self._desfazer(inicio_desfazer)
+                raise
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+            finally:
+                self._local.savepoints -= 1
+
+    def ao_desfazer(self, funcao):
+        """Registra `funcao()` para rodar se o bloco de transação atual sofrer rollback
+        (ex.: recarregar do banco um estado em memória alterado junto com ele)"""
+        if funcao not in self._local.ao_desfazer:
+            self._local.ao_desfazer.append(funcao)
+
+    def _desfazer(self, inicio):
+        funcoes = self._local.ao_desfazer[inicio:]
+        del self._local.ao_desfazer[inicio:]
+        for funcao in funcoes:
+            funcao()
+
+    def em_transacao(self):
+        """Se a thread atual está dentro de um bloco de transação"""
+        conn = getattr(self._local, 'conn', None)
+        return conn is not None and conn.in_transaction
+
+    def obter_em_cache(self, chave, tabelas, carregar):
+        """Como cache.obter, mas dentro de uma transação lê sempre do banco sem guardar:
+        o que ela enxerga ainda não foi confirmado e pode sofrer rollback"""
+        if self.em_transacao():
+            return carregar()
+        self._verificar_escritas_externas()
+        return self.cache.obter(chave, tabelas, carregar)
+
+    def _verificar_escritas_externas(self):
+        """Invalida o cache inteiro se outro processo (ex.: o outro app) gravou no banco desde a última leitura.
+
+        Commits de outra conexão deste mesmo pool também mudam o data_version:
+        nesse caso a invalidação é só redundante.
+        """
+        with self.conexao() as conn:
+            versao_dados = conn.execute("PRAGMA data_version").fetchone()[0]
+            with self._lock:
+                mudou = self._versoes_dados.get(conn) != versao_dados
+                self._versoes_dados[conn] = versao_dados
+        if mudou:
+            self.versao += 1
+            self.cache.invalidar_tudo()
+
+    def ler(self, query, params=()):
+        """Resultado de uma consulta como DataFrame"""
+        with self.conexao() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+
+    def valor(self, query, params=()):
+        """Primeira coluna da primeira linha da consulta (None se não houver linhas)"""
+        with self.conexao() as conn:
+            linha = conn.execute(query, params).fetchone()
+        return None if linha is None else linha[0]
+
+    def ler_em_cache(self, chave, tabelas, query, params=()):
+        """Lê uma consulta como DataFrame, servindo do cache enquanto `tabelas` não mudarem"""
+        # Cópia: quem chama pode modificar o DataFrame sem afetar o cache
+        return self.obter_em_cache(chave, tabelas, lambda: self.ler(query, params)).copy()
+
+    def fechar_todas(self):
+        """Fecha as conexões ociosas do pool"""
+        with self._lock:
+            livres, self._livres = self._livres, []
+            self.conexoes_abertas -= len(livres)
+        for conn in livres:
+            self._fechar(conn)
+
+    def descartar(self):
+        """Fecha as conexões ociosas e as emprestadas quando voltarem (pool que sai de uso)"""
+        with self._lock:
+            self._descartado = True
+        self.fechar_todas()
+
+
+def aplicar_migracoes(pool, migracoes, tabelas=()):
+    """Aplica, em ordem, as migrações (versão, descrição, função(conn)) ainda não registradas no banco.
+
+    Cada migração roda na sua própria transação junto com a atualização de
+    PRAGMA user_version, então uma falha não deixa o esquema pela metade.
+    `tabelas` têm o cache de leituras invalidado. Retorna as versões aplicadas.
+    """
+    aplicadas = []
+    for versao, descricao, migracao in migracoes:
+        with pool.transacao(tabelas) as conn:
+            # Releitura dentro da transação: outro processo pode ter migrado antes
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= versao:
+                continue
+            migracao(conn)
+            conn.execute(f"PRAGMA user_version = {versao}")
+        aplicadas.append(versao)
+
+    if aplicadas:
+        # Atualiza as estatísticas do planejador de consultas
+        with pool.conexao() as conn:
+            conn.execute("ANALYZE")
+    return aplicadas
+
+
+def versao_esquema(pool):
+    """Versão de esquema registrada no banco (PRAGMA user_version)"""
+    return pool.valor("PRAGMA user_version")
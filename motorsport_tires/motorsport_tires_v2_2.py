@@ -1,4 +1,5 @@
 import sqlite3
+from dataclasses import dataclass
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date
@@ -6,6 +7,13 @@ import os
 from typing import Optional, List, Dict, Tuple
 import plotly.express as px
 import plotly.graph_objects as go
+from setup_pistas import PISTAS_BRASILEIRAS
+from otimizador_sets import montar_sets
+from simulador_estrategia import simular_fim_de_semana
+from snapshots import ler_snapshot, snapshot_sqlite
+from repositorio import CAMINHO_BANCO, MIGRACOES, QUERY_RESUMO_USO, TABELAS, VERSAO_ESQUEMA, DesgasteManager
+import dados
+from dados import PoolConexoes
 
 # Configuração da página Streamlit
 st.set_page_config(
@@ -150,542 +158,1495 @@ def safe_int(value, default=0):
     except (ValueError, TypeError):
         return default
 
-# Função para criar conexão com o banco (CORRIGIDA)
-def get_database_connection():
-    """Retorna uma nova conexão com o banco de dados"""
-    return sqlite3.connect('motorsport_tires.db', check_same_thread=False)
+# Caminho do banco de dados (o mesmo do app1.py, ver repositorio)
+DB_PATH = CAMINHO_BANCO
 
-# Função para verificar e corrigir estrutura do banco
-def verificar_e_corrigir_banco():
-    """Verifica e corrige problemas na estrutura do banco"""
-    conn = get_database_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Verificar se coluna observacoes existe na tabela sets
-        cursor.execute("PRAGMA table_info(sets)")
-        colunas_sets = [row[1] for row in cursor.fetchall()]
-        
-        if 'observacoes' not in colunas_sets:
-            cursor.execute("ALTER TABLE sets ADD COLUMN observacoes TEXT")
-            conn.commit()
-        
-        # Verificar se coluna tempo_sessao existe na tabela outings
-        cursor.execute("PRAGMA table_info(outings)")
-        colunas_outings = [row[1] for row in cursor.fetchall()]
-        
-        if 'tempo_sessao' not in colunas_outings:
-            cursor.execute("ALTER TABLE outings ADD COLUMN tempo_sessao INTEGER")
-            conn.commit()
-            
-        return True
-            
-    except Exception as e:
-        return False
-    finally:
-        conn.close()
+# Pool único por processo do servidor (compartilhado entre sessões)
+@st.cache_resource
+def get_pool():
+    return PoolConexoes(DB_PATH)
 
-# Inicialização do banco de dados (CORRIGIDA)
+def conexao():
+    """Atalho para emprestar a conexão da thread atual"""
+    return get_pool().conexao()
+
+def transacao(*tabelas):
+    """Atalho para abrir uma transação (ou savepoint, se aninhada) que altera `tabelas`"""
+    return get_pool().transacao(tabelas)
+
+def ler_em_cache(chave, tabelas, query, params=()):
+    """Lê uma consulta como DataFrame, servindo do cache enquanto `tabelas` não mudarem"""
+    return get_pool().ler_em_cache(chave, tabelas, query, params)
+
+def versao_banco():
+    """Versão de esquema registrada no banco"""
+    return dados.versao_esquema(get_pool())
+
+def aplicar_migracoes():
+    """Aplica as migrações pendentes (ver dados.aplicar_migracoes); retorna as versões aplicadas"""
+    return dados.aplicar_migracoes(get_pool(), MIGRACOES, TABELAS)
+
+# Inicialização do banco de dados
 def init_database():
-    """Cria as tabelas do banco de dados se não existirem"""
-    conn = get_database_connection()
-    cursor = conn.cursor()
-    
-    # Tabela de pneus individuais (SIMPLIFICADA)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS pneus (
-            id TEXT PRIMARY KEY,
-            tipo TEXT NOT NULL,
-            data_cadastro DATE,
-            limite_km INTEGER,
-            km_atual REAL DEFAULT 0,
-            status TEXT DEFAULT 'disponivel',
-            observacoes TEXT
-        )
-    ''')
-    
-    # Tabela de pistas
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS pistas (
-            id TEXT PRIMARY KEY,
-            nome TEXT NOT NULL,
-            comprimento REAL NOT NULL,
-            tipo TEXT DEFAULT 'road',
-            sentido TEXT DEFAULT 'horario',
-            caracteristicas TEXT,
-            desgaste_de TEXT DEFAULT 'medio',
-            desgaste_dd TEXT DEFAULT 'medio', 
-            desgaste_te TEXT DEFAULT 'medio',
-            desgaste_td TEXT DEFAULT 'medio'
-        )
-    ''')
-    
-    # Tabela de sets
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sets (
-            id TEXT PRIMARY KEY,
-            nome TEXT NOT NULL,
-            tipo TEXT NOT NULL,
-            data_montagem DATE,
-            status TEXT DEFAULT 'ativo',
-            pneu_de TEXT,
-            pneu_dd TEXT,
-            pneu_te TEXT,
-            pneu_td TEXT,
-            observacoes TEXT,
-            FOREIGN KEY (pneu_de) REFERENCES pneus (id),
-            FOREIGN KEY (pneu_dd) REFERENCES pneus (id),
-            FOREIGN KEY (pneu_te) REFERENCES pneus (id),
-            FOREIGN KEY (pneu_td) REFERENCES pneus (id)
-        )
-    ''')
-    
-    # Tabela de outings
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS outings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data DATE NOT NULL,
-            pista_id TEXT NOT NULL,
-            set_id TEXT NOT NULL,
-            tipo_sessao TEXT,
-            condicao TEXT,
-            voltas INTEGER,
-            km_calculado REAL,
-            tempo_sessao INTEGER,
-            observacoes TEXT,
-            FOREIGN KEY (pista_id) REFERENCES pistas (id),
-            FOREIGN KEY (set_id) REFERENCES sets (id)
-        )
-    ''')
-    
-    # Tabela de histórico
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS historico_pneus (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            pneu_id TEXT NOT NULL,
-            outing_id INTEGER NOT NULL,
-            posicao TEXT NOT NULL,
-            km_antes REAL DEFAULT 0,
-            km_depois REAL DEFAULT 0,
-            FOREIGN KEY (pneu_id) REFERENCES pneus (id),
-            FOREIGN KEY (outing_id) REFERENCES outings (id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
-    
-    # Verificar e corrigir estrutura após criação
-    verificar_e_corrigir_banco()
-    
-    return True
+    """Cria/atualiza o esquema do banco aplicando as migrações pendentes"""
+    return aplicar_migracoes()
+
+def semear_dados_referencia():
+    """Cadastra as pistas brasileiras padrão quando o banco ainda não tem pistas do v2_2.
+
+    As pistas do app1 (id igual ao nome) não contam; as de mesmo nome não se repetem.
+    """
+    with transacao('pistas') as conn:
+        if conn.execute("SELECT 1 FROM pistas WHERE id != nome LIMIT 1").fetchone():
+            return 0
+        nomes = {row[0] for row in conn.execute("SELECT nome FROM pistas")}
+        pistas = [pista for pista in PISTAS_BRASILEIRAS if pista[1] not in nomes]
+        conn.executemany('''
+            INSERT OR IGNORE INTO pistas (id, nome, comprimento, tipo, sentido, caracteristicas,
+                                          desgaste_de, desgaste_dd, desgaste_te, desgaste_td)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', pistas)
+        return len(pistas)
+
+@dataclass(frozen=True)
+class StatusSistema:
+    """Resultado da inicialização do processo (exibido como saúde do sistema)"""
+    iniciado_em: datetime
+    duracao_ms: float
+    versao_esquema: int
+    migracoes_aplicadas: Tuple[int, ...]
+    pistas_semeadas: int
+    banco: str
+
+# Bootstrap: banco, migrações e dados de referência uma única vez por processo
+@st.cache_resource(show_spinner="Inicializando banco de dados...")
+def bootstrap():
+    inicio = datetime.now()
+    aplicadas = init_database()
+    semeadas = semear_dados_referencia()
+    return StatusSistema(
+        iniciado_em=inicio,
+        duracao_ms=(datetime.now() - inicio).total_seconds() * 1000,
+        versao_esquema=versao_banco(),
+        migracoes_aplicadas=tuple(aplicadas),
+        pistas_semeadas=semeadas,
+        banco=os.path.abspath(DB_PATH),
+    )
 
 # Classes para gerenciamento de dados (CORRIGIDAS)
 class PneuManager:
+    QUERY_DISPONIVEIS = "SELECT * FROM pneus WHERE status = 'disponivel' ORDER BY tipo, id"
+    QUERY_TODOS = "SELECT * FROM pneus ORDER BY id"
+
+    # Faixas de desgaste (% do limite de km)
+    LIMITE_VERDE = 70
+    LIMITE_AMARELO = 90
+
     @staticmethod
     def cadastrar_pneu(id_pneu, tipo, limite_km, observacoes=""):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT INTO pneus (id, tipo, data_cadastro, limite_km, observacoes)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (id_pneu, tipo, datetime.now().date(), limite_km, observacoes))
-            
-            conn.commit()
+            with transacao('pneus') as conn:
+                conn.execute('''
+                    INSERT INTO pneus (id, tipo, data_cadastro, limite_km, observacoes)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (id_pneu, tipo, datetime.now().date(), limite_km, observacoes))
             return True
         except sqlite3.IntegrityError:
             return False
-        finally:
-            conn.close()
-    
+
     @staticmethod
     def listar_pneus_disponiveis(tipo=None):
-        conn = get_database_connection()
         # REMOVIDO FILTRO DINÂMICO - SEMPRE MOSTRA TODOS OS PNEUS DISPONÍVEIS
-        query = "SELECT * FROM pneus WHERE status = 'disponivel' ORDER BY tipo, id"
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        return df
-    
+        return ler_em_cache('pneus_disponiveis', ('pneus',), PneuManager.QUERY_DISPONIVEIS)
+
     @staticmethod
     def listar_todos_pneus():
-        conn = get_database_connection()
-        df = pd.read_sql_query("SELECT * FROM pneus ORDER BY id", conn)
-        conn.close()
-        return df
-    
+        return ler_em_cache('pneus_todos', ('pneus',), PneuManager.QUERY_TODOS)
+
     @staticmethod
     def get_pneu_by_id(pneu_id):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM pneus WHERE id = ?", (pneu_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result
-    
+        with conexao() as conn:
+            return conn.execute("SELECT * FROM pneus WHERE id = ?", (pneu_id,)).fetchone()
+
     @staticmethod
     def atualizar_km_pneu(pneu_id, novo_km):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE pneus SET km_atual = ? WHERE id = ?", (novo_km, pneu_id))
-        conn.commit()
-        conn.close()
-    
+        with transacao('pneus') as conn:
+            # Ajuste manual entra no desgaste com fator 1
+            conn.execute('''
+                UPDATE pneus SET desgaste_atual = COALESCE(desgaste_atual, 0) + (? - COALESCE(km_atual, 0)),
+                                 km_atual = ?
+                WHERE id = ?
+            ''', (novo_km, novo_km, pneu_id))
+
     @staticmethod
     def atualizar_status_pneu(pneu_id, novo_status):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE pneus SET status = ? WHERE id = ?", (novo_status, pneu_id))
-        conn.commit()
-        conn.close()
-    
+        with transacao('pneus') as conn:
+            conn.execute("UPDATE pneus SET status = ? WHERE id = ?", (novo_status, pneu_id))
+
     @staticmethod
     def calcular_status_pneu(pneu_data):
-        """Calcula o status do pneu baseado na quilometragem"""
+        """Calcula o status do pneu pelo desgaste efetivo (km, se não houver)"""
         if not pneu_data:
             return "unknown", 0
-        
+
         # Conversão segura para float
         km_atual = safe_float(pneu_data[4], 0)  # km_atual
         limite_km = safe_float(pneu_data[3], 1000)  # limite_km
-        
+        desgaste = pneu_data[7] if len(pneu_data) > 7 and pneu_data[7] is not None else km_atual  # desgaste_atual
+        desgaste = safe_float(desgaste, km_atual)
+
         if limite_km <= 0:
             limite_km = 1000
-        
-        percentual = (km_atual / limite_km) * 100
-        
-        if percentual <= 70:
+
+        percentual = (desgaste / limite_km) * 100
+
+        if percentual <= PneuManager.LIMITE_VERDE:
             return "green", percentual
-        elif percentual <= 90:
+        elif percentual <= PneuManager.LIMITE_AMARELO:
             return "yellow", percentual
         else:
             return "red", percentual
 
+    @staticmethod
+    def classificar_pneus(pneus_df):
+        """Calcula status e percentual de desgaste de todos os pneus de uma vez"""
+        resultado = pneus_df.copy()
+
+        # Mesmas regras de calcular_status_pneu, aplicadas à coluna inteira
+        km_atual = pd.to_numeric(resultado['km_atual'], errors='coerce').fillna(0)
+        limite_km = pd.to_numeric(resultado['limite_km'], errors='coerce').fillna(1000)
+        limite_km = limite_km.where(limite_km > 0, 1000)
+        if 'desgaste_atual' in resultado:
+            desgaste = pd.to_numeric(resultado['desgaste_atual'], errors='coerce').fillna(km_atual)
+        else:
+            desgaste = km_atual
+
+        resultado['km_atual'] = km_atual
+        resultado['limite_km'] = limite_km
+        resultado['desgaste_atual'] = desgaste
+        resultado['percentual'] = desgaste / limite_km * 100
+        resultado['status_desgaste'] = pd.cut(
+            resultado['percentual'],
+            bins=[float('-inf'), PneuManager.LIMITE_VERDE, PneuManager.LIMITE_AMARELO, float('inf')],
+            labels=['green', 'yellow', 'red'],
+        ).astype(str)
+        return resultado
+
+    @staticmethod
+    def listar_status_pneus():
+        """Todos os pneus já classificados; recalculado só quando `pneus` muda"""
+        def carregar():
+            with conexao() as conn:
+                return PneuManager.classificar_pneus(pd.read_sql_query(PneuManager.QUERY_TODOS, conn))
+        return get_pool().obter_em_cache('pneus_status', ('pneus',), carregar).copy()
+
+    @staticmethod
+    def pneus_criticos(pneus_df=None, limite=None):
+        """Pneus em amarelo/vermelho, do mais gasto para o menos gasto"""
+        if pneus_df is None:
+            pneus_df = PneuManager.listar_status_pneus()
+        criticos = pneus_df[pneus_df['status_desgaste'].isin(['yellow', 'red'])]
+        criticos = criticos.sort_values('percentual', ascending=False, kind='stable')
+        return criticos if limite is None else criticos.head(limite)
+
 class PistaManager:
     @staticmethod
-    def cadastrar_pista(id_pista, nome, comprimento, tipo="road", sentido="horario", 
+    def cadastrar_pista(id_pista, nome, comprimento, tipo="road", sentido="horario",
                        caracteristicas="", desgaste_de="medio", desgaste_dd="medio",
                        desgaste_te="medio", desgaste_td="medio"):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO pistas (id, nome, comprimento, tipo, sentido, caracteristicas,
-                                      desgaste_de, desgaste_dd, desgaste_te, desgaste_td)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (id_pista, nome, comprimento, tipo, sentido, caracteristicas,
-                  desgaste_de, desgaste_dd, desgaste_te, desgaste_td))
-            
-            conn.commit()
+            with transacao('pistas', 'historico_pneus', 'pneus') as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO pistas (id, nome, comprimento, tipo, sentido, caracteristicas,
+                                          desgaste_de, desgaste_dd, desgaste_te, desgaste_td)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (id_pista, nome, comprimento, tipo, sentido, caracteristicas,
+                      desgaste_de, desgaste_dd, desgaste_te, desgaste_td))
+
+                # Pista já usada: níveis de desgaste podem ter mudado
+                afetados = DesgasteManager.recalcular_historico(conn, "o.pista_id = ?", (id_pista,))
+                DesgasteManager.sincronizar_pneus(conn, afetados)
             return True
         except Exception:
             return False
-        finally:
-            conn.close()
-    
+
     @staticmethod
     def listar_pistas():
-        conn = get_database_connection()
-        df = pd.read_sql_query("SELECT * FROM pistas ORDER BY nome", conn)
-        conn.close()
-        return df
-    
+        return ler_em_cache('pistas', ('pistas',), "SELECT * FROM pistas ORDER BY nome")
+
     @staticmethod
     def get_pista_by_id(pista_id):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM pistas WHERE id = ?", (pista_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result
+        with conexao() as conn:
+            return conn.execute("SELECT * FROM pistas WHERE id = ?", (pista_id,)).fetchone()
 
 class SetManager:
+    QUERY_ATIVOS = "SELECT * FROM sets WHERE status = 'ativo' ORDER BY id"
+
     @staticmethod
     def criar_set(id_set, nome, tipo, pneu_de=None, pneu_dd=None, pneu_te=None, pneu_td=None, observacoes=""):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
         try:
-            # Verificar se a coluna observacoes existe
-            cursor.execute("PRAGMA table_info(sets)")
-            colunas = [row[1] for row in cursor.fetchall()]
-            
-            if 'observacoes' in colunas:
-                # Inserir com observacoes
+            with transacao('sets', 'pneus') as conn:
+                cursor = conn.cursor()
+
                 cursor.execute('''
                     INSERT INTO sets (id, nome, tipo, data_montagem, pneu_de, pneu_dd, pneu_te, pneu_td, observacoes)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (id_set, nome, tipo, datetime.now().date(), pneu_de, pneu_dd, pneu_te, pneu_td, observacoes))
-            else:
-                # Inserir sem observacoes
-                cursor.execute('''
-                    INSERT INTO sets (id, nome, tipo, data_montagem, pneu_de, pneu_dd, pneu_te, pneu_td)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (id_set, nome, tipo, datetime.now().date(), pneu_de, pneu_dd, pneu_te, pneu_td))
-            
-            # Atualizar status dos pneus para 'em_uso'
-            for pneu_id in [pneu_de, pneu_dd, pneu_te, pneu_td]:
-                if pneu_id:
-                    cursor.execute("UPDATE pneus SET status = 'em_uso' WHERE id = ?", (pneu_id,))
-            
-            conn.commit()
+
+                # Atualizar status dos pneus para 'em_uso'
+                for pneu_id in [pneu_de, pneu_dd, pneu_te, pneu_td]:
+                    if pneu_id:
+                        cursor.execute("UPDATE pneus SET status = 'em_uso' WHERE id = ?", (pneu_id,))
+
             return True
         except sqlite3.IntegrityError:
             return False
-        finally:
-            conn.close()
-    
+
+    @staticmethod
+    def sugerir_sets(pista_id, condicao='seco', voltas=30, quantidade=1, tipo=None):
+        """Melhor distribuição dos pneus disponíveis em `quantidade` sets para um stint na pista.
+
+        Uma vaga por posição de cada set; o desgaste de cada vaga vem do modelo
+        por pista/posição. Os primeiros sets recebem os pneus mais novos.
+        """
+        colunas = ['set', 'posicao', 'pneu_id', 'desgaste_atual', 'desgaste_stint', 'percentual_final']
+        pneus = PneuManager.listar_status_pneus()
+        pneus = pneus[pneus['status'] == 'disponivel']
+        if tipo:
+            pneus = pneus[pneus['tipo'] == tipo]
+        pneus = pneus.reset_index(drop=True)
+        pistas = PistaManager.listar_pistas()
+        pistas = pistas[pistas['id'] == pista_id]
+        if pneus.empty or pistas.empty or quantidade < 1:
+            return pd.DataFrame(columns=colunas)
+
+        por_volta = PrevisaoManager.desgaste_por_volta(pistas, condicao).set_index('posicao')['desgaste_volta']
+        vagas = pd.DataFrame([(numero, posicao) for numero in range(1, quantidade + 1)
+                              for posicao in DesgasteManager.POSICOES], columns=['set', 'posicao'])
+        vagas['desgaste_stint'] = vagas['posicao'].map(por_volta) * voltas
+
+        escolha = montar_sets(pneus['desgaste_atual'], pneus['limite_km'], vagas['desgaste_stint'],
+                              prioridade=quantidade + 1 - vagas['set'])
+        # -1 (sem pneu) vira NaN no reindex
+        vagas['pneu_id'] = pneus['id'].reindex(escolha).values
+        vagas['desgaste_atual'] = pneus['desgaste_atual'].reindex(escolha).values
+        limite = pneus['limite_km'].reindex(escolha).values
+        vagas['percentual_final'] = (vagas['desgaste_atual'] + vagas['desgaste_stint']) / limite * 100
+        return vagas[colunas]
+
+    @staticmethod
+    def montar_sets_sugeridos(sugestao, nome_base, tipo, observacoes=""):
+        """Cria de uma vez os sets completos (4 pneus) de uma sugestão; retorna os IDs criados"""
+        criados = []
+        for numero, vagas in sugestao.groupby('set', sort=True):
+            if vagas['pneu_id'].isna().any():
+                continue
+            pneus = dict(zip(vagas['posicao'], vagas['pneu_id']))
+            id_set = gerar_proximo_id('sets')
+            nome = f"{nome_base} {numero}" if len(sugestao['set'].unique()) > 1 else nome_base
+            if SetManager.criar_set(id_set, nome, tipo, pneus['DE'], pneus['DD'], pneus['TE'], pneus['TD'], observacoes):
+                criados.append(id_set)
+        return criados
+
     @staticmethod
     def listar_sets():
-        conn = get_database_connection()
-        df = pd.read_sql_query("SELECT * FROM sets ORDER BY data_montagem DESC", conn)
-        conn.close()
-        return df
-    
+        return ler_em_cache('sets_todos', ('sets',), "SELECT * FROM sets ORDER BY data_montagem DESC")
+
     @staticmethod
     def listar_sets_ativos():
         """Lista apenas sets ativos"""
-        conn = get_database_connection()
-        df = pd.read_sql_query("SELECT * FROM sets WHERE status = 'ativo' ORDER BY id", conn)
-        conn.close()
-        return df
-    
+        return ler_em_cache('sets_ativos', ('sets',), SetManager.QUERY_ATIVOS)
+
     @staticmethod
     def get_set_by_id(set_id):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM sets WHERE id = ?", (set_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result
-    
+        with conexao() as conn:
+            return conn.execute("SELECT * FROM sets WHERE id = ?", (set_id,)).fetchone()
+
     @staticmethod
     def desmontar_set(set_id):
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        # Buscar pneus do set
-        set_data = SetManager.get_set_by_id(set_id)
-        if set_data:
-            pneus = [set_data[5], set_data[6], set_data[7], set_data[8]]  # pneu_de, dd, te, td
-            
-            # Voltar pneus para disponível
-            for pneu_id in pneus:
-                if pneu_id:
-                    cursor.execute("UPDATE pneus SET status = 'disponivel' WHERE id = ?", (pneu_id,))
-            
-            # Marcar set como desmontado
-            cursor.execute("UPDATE sets SET status = 'desmontado' WHERE id = ?", (set_id,))
-            
-            conn.commit()
-        conn.close()
+        with transacao('sets', 'pneus') as conn:
+            cursor = conn.cursor()
+
+            # Buscar pneus do set (mesma conexão/transação)
+            set_data = SetManager.get_set_by_id(set_id)
+            if set_data:
+                pneus = [set_data[5], set_data[6], set_data[7], set_data[8]]  # pneu_de, dd, te, td
+
+                # Voltar pneus para disponível
+                for pneu_id in pneus:
+                    if pneu_id:
+                        cursor.execute("UPDATE pneus SET status = 'disponivel' WHERE id = ?", (pneu_id,))
+
+                # Marcar set como desmontado
+                cursor.execute("UPDATE sets SET status = 'desmontado' WHERE id = ?", (set_id,))
+
+# Valores aceitos nos outings (o primeiro é o padrão)
+TIPOS_SESSAO = ["treino", "corrida", "classificacao", "warmup", "teste"]
+CONDICOES = ["seco", "molhado", "misto"]
+
+# Campos aceitos na importação em massa de outings
+CAMPOS_IMPORTACAO = ('data', 'pista_id', 'set_id', 'tipo_sessao', 'condicao', 'voltas', 'observacoes')
+
+@dataclass
+class ResultadoImportacao:
+    """Resumo de uma importação em massa de outings"""
+    importados: int
+    lotes: int
+    total_linhas: int
+    erros: pd.DataFrame
+
+@dataclass
+class PaginaOutings:
+    """Uma página do histórico de outings e os agregados do filtro inteiro"""
+    outings: pd.DataFrame
+    pagina: int
+    por_pagina: int
+    total: int
+    total_voltas: int
+    total_km: float
+    km_medio: float
+
+    @property
+    def total_paginas(self):
+        return max(1, -(-self.total // self.por_pagina))
 
 class OutingManager:
+    # Filtros aceitos em consultar_outings: nome -> condição SQL parametrizada
+    FILTROS_CONSULTA = {
+        'pista_id': "o.pista_id = ?",
+        'set_id': "o.set_id = ?",
+        'tipo_sessao': "o.tipo_sessao = ?",
+        'condicao': "o.condicao = ?",
+        'data_inicio': "o.data >= ?",
+        'data_fim': "o.data <= ?",
+    }
+    # Ordenações aceitas em consultar_outings (nunca interpolar texto do usuário)
+    ORDENACOES_CONSULTA = {
+        'recentes': "o.data DESC, o.id DESC",
+        'antigos': "o.data ASC, o.id ASC",
+        'mais_km': "o.km_calculado DESC, o.id DESC",
+        'mais_voltas': "o.voltas DESC, o.id DESC",
+    }
+
+    QUERY_LISTAR = '''
+        SELECT o.*, p.nome as pista_nome, s.nome as set_nome
+        FROM outings o
+        JOIN pistas p ON o.pista_id = p.id
+        JOIN sets s ON o.set_id = s.id
+        ORDER BY o.data DESC, o.id DESC
+    '''
+    QUERY_HISTORICO_PNEU = '''
+        SELECT h.*, o.data, p.nome as pista_nome, o.voltas, o.tipo_sessao, o.condicao
+        FROM historico_pneus h
+        JOIN outings o ON h.outing_id = o.id
+        JOIN pistas p ON o.pista_id = p.id
+        WHERE h.pneu_id = ?
+        ORDER BY o.data DESC, o.id DESC
+    '''
+    QUERY_HISTORICO_COMPLETO = '''
+        SELECT h.pneu_id, h.km_antes, h.km_depois, o.data
+        FROM historico_pneus h
+        JOIN outings o ON h.outing_id = o.id
+        ORDER BY o.data ASC, o.id ASC
+    '''
+
+    # Pista, composição do set, km atual dos pneus e última data de uso em uma só consulta
+    QUERY_CONTEXTO_OUTING = '''
+        SELECT p.comprimento,
+               s.pneu_de, s.pneu_dd, s.pneu_te, s.pneu_td,
+               -- km dos pneus cadastrados (km em branco conta como 0); NULL = pneu não cadastrado
+               CASE WHEN de.id IS NOT NULL THEN COALESCE(de.km_atual, 0) END,
+               CASE WHEN dd.id IS NOT NULL THEN COALESCE(dd.km_atual, 0) END,
+               CASE WHEN te.id IS NOT NULL THEN COALESCE(te.km_atual, 0) END,
+               CASE WHEN td.id IS NOT NULL THEN COALESCE(td.km_atual, 0) END,
+               (SELECT MAX(o.data)
+                FROM historico_pneus h
+                JOIN outings o ON h.outing_id = o.id
+                WHERE h.pneu_id IN (s.pneu_de, s.pneu_dd, s.pneu_te, s.pneu_td)) AS ultima_data,
+               p.sentido, p.desgaste_de, p.desgaste_dd, p.desgaste_te, p.desgaste_td
+        FROM sets s
+        JOIN pistas p ON p.id = ?
+        LEFT JOIN pneus de ON de.id = s.pneu_de
+        LEFT JOIN pneus dd ON dd.id = s.pneu_dd
+        LEFT JOIN pneus te ON te.id = s.pneu_te
+        LEFT JOIN pneus td ON td.id = s.pneu_td
+        WHERE s.id = ?
+    '''
+
     @staticmethod
     def registrar_outing(data, pista_id, set_id, tipo_sessao, condicao, voltas, observacoes=""):
-        """VERSÃO CORRIGIDA COM ATUALIZAÇÃO GARANTIDA DOS PNEUS"""
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
+        """Registra o outing e atualiza os pneus do set em uma única transação curta"""
         try:
-            # 1. Buscar comprimento da pista
-            pista = PistaManager.get_pista_by_id(pista_id)
-            if not pista:
-                return False
-            
-            comprimento = safe_float(pista[2], 4.0)
-            km_calculado = voltas * comprimento
-            
-            # 2. Buscar dados do set ANTES de inserir o outing
-            set_data = SetManager.get_set_by_id(set_id)
-            if not set_data:
-                return False
-            
-            # 3. Verificar se coluna tempo_sessao existe
-            cursor.execute("PRAGMA table_info(outings)")
-            colunas = [row[1] for row in cursor.fetchall()]
-            
-            if 'tempo_sessao' in colunas:
-                # Inserir com tempo_sessao (NULL)
-                cursor.execute('''
+            with transacao('outings', 'historico_pneus', 'pneus', 'resumo_uso_pneus') as conn:
+                # 1. Pista + set + km atual dos pneus (uma consulta)
+                contexto = conn.execute(OutingManager.QUERY_CONTEXTO_OUTING, (pista_id, set_id)).fetchone()
+                if not contexto:
+                    return False
+
+                comprimento = safe_float(contexto[0], 4.0)
+                km_calculado = voltas * comprimento
+                ultima_data = contexto[9]
+
+                # Apenas pneus montados e cadastrados
+                pneus_set = [
+                    (posicao, pneu_id, safe_float(km_atual, 0))
+                    for posicao, pneu_id, km_atual in zip(['DE', 'DD', 'TE', 'TD'], contexto[1:5], contexto[5:9])
+                    if pneu_id and pneu_id.strip() and km_atual is not None
+                ]
+                pneu_ids = [pneu_id for _, pneu_id, _ in pneus_set]
+
+                # Desgaste efetivo de cada posição nesta pista/condição
+                desgastes = DesgasteManager.calcular(pd.DataFrame({
+                    'posicao': [posicao for posicao, _, _ in pneus_set],
+                    'km_calculado': km_calculado,
+                    'condicao': condicao,
+                    'sentido': contexto[10],
+                    **dict(zip(DesgasteManager.COLUNAS_PISTA, contexto[11:15])),
+                }, index=range(len(pneus_set)))).tolist()
+
+                # Outing retroativo: guardar a base das cadeias antes de inserir
+                retroativo = ultima_data is not None and str(ultima_data) > str(data)
+                bases = OutingManager._bases_das_cadeias(conn, pneu_ids) if retroativo else None
+
+                # 2. Inserir o outing
+                cursor = conn.execute('''
                     INSERT INTO outings (data, pista_id, set_id, tipo_sessao, condicao, voltas, km_calculado, tempo_sessao, observacoes)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (data, pista_id, set_id, tipo_sessao, condicao, voltas, km_calculado, None, observacoes))
-            else:
-                # Inserir sem tempo_sessao
-                cursor.execute('''
-                    INSERT INTO outings (data, pista_id, set_id, tipo_sessao, condicao, voltas, km_calculado, observacoes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (data, pista_id, set_id, tipo_sessao, condicao, voltas, km_calculado, observacoes))
-            
-            outing_id = cursor.lastrowid
-            
-            # 4. CORRIGIDO - Atualizar cada pneu do set
-            pneus_info = [
-                {'posicao': 'DE', 'pneu_id': set_data[5]},  # pneu_de
-                {'posicao': 'DD', 'pneu_id': set_data[6]},  # pneu_dd  
-                {'posicao': 'TE', 'pneu_id': set_data[7]},  # pneu_te
-                {'posicao': 'TD', 'pneu_id': set_data[8]}   # pneu_td
-            ]
-            
-            pneus_atualizados = 0
-            
-            for pneu_info in pneus_info:
-                pneu_id = pneu_info['pneu_id']
-                posicao = pneu_info['posicao']
-                
-                if pneu_id and pneu_id.strip():  # Verificar se o pneu_id não é vazio
-                    # Buscar dados atuais do pneu
-                    cursor.execute("SELECT * FROM pneus WHERE id = ?", (pneu_id,))
-                    pneu_data = cursor.fetchone()
-                    
-                    if pneu_data:
-                        km_antes = safe_float(pneu_data[4], 0)  # km_atual
-                        km_depois = km_antes + km_calculado
-                        
-                        # Inserir histórico
-                        cursor.execute('''
-                            INSERT INTO historico_pneus (pneu_id, outing_id, posicao, km_antes, km_depois)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (pneu_id, outing_id, posicao, km_antes, km_depois))
-                        
-                        # CORRIGIDO - Atualizar km atual do pneu
-                        cursor.execute("UPDATE pneus SET km_atual = ? WHERE id = ?", (km_depois, pneu_id))
-                        pneus_atualizados += 1
-            
-            # 5. Commit explícito de todas as operações
-            conn.commit()
-            
+
+                outing_id = cursor.lastrowid
+
+                if pneus_set:
+                    # 3. Histórico das quatro posições em lote
+                    conn.executemany('''
+                        INSERT INTO historico_pneus (pneu_id, outing_id, posicao, km_antes, km_depois, desgaste)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', [(pneu_id, outing_id, posicao, km_antes, km_antes + km_calculado, desgaste)
+                          for (posicao, pneu_id, km_antes), desgaste in zip(pneus_set, desgastes)])
+
+                    # 4. Incremento de km e desgaste dos pneus em um único comando preparado
+                    conn.executemany('''
+                        UPDATE pneus SET km_atual = COALESCE(km_atual, 0) + ?,
+                                         desgaste_atual = COALESCE(desgaste_atual, 0) + ?
+                        WHERE id = ?
+                    ''', [(km_calculado, desgaste, pneu_id) for pneu_id, desgaste in zip(pneu_ids, desgastes)])
+
+                    # 5. Raro: outing anterior ao último uso, reencadear os posteriores
+                    if retroativo:
+                        OutingManager._recalcular_cadeias(conn, pneu_ids, data, outing_id, bases)
+
+                    # 6. Resumo de uso dos pneus
+                    ResumoUsoManager.aplicar_outings(conn, [outing_id], +1)
+
             return True
-            
+
         except Exception as e:
-            conn.rollback()
             return False
-        finally:
-            conn.close()
-    
+
+    @staticmethod
+    def ler_arquivo_importacao(arquivo, nome_arquivo=""):
+        """Lê um export CSV/XLSX do sistema de cronometragem como DataFrame de texto"""
+        nome_arquivo = str(nome_arquivo or getattr(arquivo, 'name', '')).lower()
+
+        if nome_arquivo.endswith(('.xlsx', '.xlsm')):
+            # Modo read-only do openpyxl: linhas lidas em streaming, sem montar o workbook
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(arquivo, read_only=True, data_only=True)
+            try:
+                linhas = workbook.worksheets[0].iter_rows(values_only=True)
+                cabecalho = next(linhas, None)
+                if cabecalho is None:
+                    return pd.DataFrame()
+                colunas = [str(c).strip() if c is not None else f"coluna_{i}" for i, c in enumerate(cabecalho)]
+                registros = [linha for linha in linhas if any(valor is not None for valor in linha)]
+            finally:
+                workbook.close()
+            return pd.DataFrame(registros, columns=colunas)
+
+        # CSV lido em blocos para não duplicar o arquivo inteiro em memória
+        blocos = pd.read_csv(arquivo, dtype=str, sep=None, engine='python', chunksize=5000)
+        df = pd.concat(list(blocos), ignore_index=True)
+        df.columns = [str(c).strip() for c in df.columns]
+        return df
+
+    @staticmethod
+    def _validar_importacao(df, mapeamento=None):
+        """Valida todas as linhas de uma vez; retorna (linhas válidas, erros, composição dos sets)"""
+        mapeamento = mapeamento or {}
+        registros = pd.DataFrame(index=df.index)
+        for campo in CAMPOS_IMPORTACAO:
+            coluna = mapeamento.get(campo, campo)
+            registros[campo] = df[coluna] if coluna in df.columns else None
+        # Linha como aparece na planilha (cabeçalho = linha 1)
+        registros['linha'] = df.index + 2
+
+        erros = []
+
+        def registrar_erros(mascara, campo, mensagem):
+            for linha in registros.loc[mascara, 'linha']:
+                erros.append({'linha': int(linha), 'campo': campo, 'erro': mensagem})
+
+        def texto(serie):
+            return serie.fillna('').astype(str).str.strip()
+
+        # Data: ISO (AAAA-MM-DD) ou brasileira (DD/MM/AAAA)
+        datas_texto = texto(registros['data'])
+        datas = pd.to_datetime(datas_texto, format='%Y-%m-%d', errors='coerce')
+        datas = datas.fillna(pd.to_datetime(datas_texto, format='%d/%m/%Y', errors='coerce'))
+        datas = datas.fillna(pd.to_datetime(datas_texto.str[:10], format='%Y-%m-%d', errors='coerce'))
+        registrar_erros(datas.isna(), 'data', 'Data inválida')
+        registros['data'] = datas.dt.strftime('%Y-%m-%d')
+
+        # Voltas: inteiro positivo
+        voltas = pd.to_numeric(texto(registros['voltas']).str.replace(',', '.'), errors='coerce')
+        voltas_invalidas = voltas.isna() | (voltas <= 0) | (voltas != voltas.round())
+        registrar_erros(voltas_invalidas, 'voltas', 'Voltas deve ser um inteiro positivo')
+        registros['voltas'] = voltas.fillna(0).astype(int)
+
+        # Pista e set aceitam ID ou nome
+        with conexao() as conn:
+            pistas = conn.execute("SELECT id, nome, comprimento FROM pistas").fetchall()
+            sets = conn.execute("SELECT id, nome, pneu_de, pneu_dd, pneu_te, pneu_td FROM sets").fetchall()
+
+        pista_por_chave = {}
+        for pista_id, nome, _ in pistas:
+            pista_por_chave[str(nome).strip().lower()] = pista_id
+            pista_por_chave[str(pista_id).strip().lower()] = pista_id
+        set_por_chave = {}
+        for set_row in sets:
+            set_por_chave[str(set_row[1]).strip().lower()] = set_row[0]
+            set_por_chave[str(set_row[0]).strip().lower()] = set_row[0]
+
+        registros['pista_id'] = texto(registros['pista_id']).str.lower().map(pista_por_chave)
+        registrar_erros(registros['pista_id'].isna(), 'pista_id', 'Pista não cadastrada')
+        registros['set_id'] = texto(registros['set_id']).str.lower().map(set_por_chave)
+        registrar_erros(registros['set_id'].isna(), 'set_id', 'Set não cadastrado')
+
+        # Tipo de sessão e condição com valores padrão
+        tipos = texto(registros['tipo_sessao']).str.lower().replace('', TIPOS_SESSAO[0])
+        registrar_erros(~tipos.isin(TIPOS_SESSAO), 'tipo_sessao', f"Tipo deve ser um de: {', '.join(TIPOS_SESSAO)}")
+        registros['tipo_sessao'] = tipos
+        condicoes = texto(registros['condicao']).str.lower().replace('', CONDICOES[0])
+        registrar_erros(~condicoes.isin(CONDICOES), 'condicao', f"Condição deve ser uma de: {', '.join(CONDICOES)}")
+        registros['condicao'] = condicoes
+        registros['observacoes'] = texto(registros['observacoes'])
+
+        comprimentos = {pista_id: safe_float(comprimento, 4.0) for pista_id, _, comprimento in pistas}
+        registros['km_calculado'] = registros['voltas'] * registros['pista_id'].map(comprimentos).fillna(0)
+
+        erros_df = pd.DataFrame(erros, columns=['linha', 'campo', 'erro']).sort_values(['linha', 'campo'])
+        validas = registros[~registros['linha'].isin(erros_df['linha'])]
+        # Ordem cronológica preserva a cadeia de km (empate: ordem do arquivo)
+        validas = validas.sort_values(['data', 'linha'], kind='stable')
+        composicao = {set_row[0]: list(zip(['DE', 'DD', 'TE', 'TD'], set_row[2:6])) for set_row in sets}
+        return validas, erros_df.reset_index(drop=True), composicao
+
+    @staticmethod
+    def _gravar_lote_importacao(conn, lote, composicao):
+        """Grava um lote de outings válidos e o histórico dos pneus na transação atual"""
+        pneu_ids = sorted({
+            pneu_id
+            for set_id in lote['set_id'].unique()
+            for _, pneu_id in composicao.get(set_id, [])
+            if pneu_id and pneu_id.strip()
+        })
+        marcadores = ','.join('?' * len(pneu_ids))
+
+        km_corrente = {}
+        bases = None
+        if pneu_ids:
+            km_corrente = {
+                pneu_id: safe_float(km, 0)
+                for pneu_id, km in conn.execute(f"SELECT id, km_atual FROM pneus WHERE id IN ({marcadores})", pneu_ids)
+            }
+            # Outings anteriores ao último uso registrado exigem reencadear depois
+            ultima_data = conn.execute(f'''
+                SELECT MAX(o.data) FROM historico_pneus h
+                JOIN outings o ON h.outing_id = o.id
+                WHERE h.pneu_id IN ({marcadores})
+            ''', pneu_ids).fetchone()[0]
+            if ultima_data is not None and str(ultima_data) > lote['data'].min():
+                bases = OutingManager._bases_das_cadeias(conn, pneu_ids)
+
+        # IDs explícitos: a transação é exclusiva (BEGIN IMMEDIATE)
+        proximo_id = conn.execute("""
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'outings'), 0),
+                       COALESCE((SELECT MAX(id) FROM outings), 0))
+        """).fetchone()[0] + 1
+
+        outings = []
+        historico = []
+        for outing_id, row in enumerate(lote.itertuples(index=False), start=proximo_id):
+            outings.append((outing_id, row.data, row.pista_id, row.set_id, row.tipo_sessao,
+                            row.condicao, int(row.voltas), float(row.km_calculado), row.observacoes))
+            for posicao, pneu_id in composicao.get(row.set_id, []):
+                if pneu_id in km_corrente:
+                    km_antes = km_corrente[pneu_id]
+                    km_corrente[pneu_id] = km_antes + float(row.km_calculado)
+                    historico.append((pneu_id, outing_id, posicao, km_antes, km_corrente[pneu_id]))
+
+        conn.executemany('''
+            INSERT INTO outings (id, data, pista_id, set_id, tipo_sessao, condicao, voltas, km_calculado, observacoes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', outings)
+        conn.executemany('''
+            INSERT INTO historico_pneus (pneu_id, outing_id, posicao, km_antes, km_depois)
+            VALUES (?, ?, ?, ?, ?)
+        ''', historico)
+        conn.executemany("UPDATE pneus SET km_atual = ? WHERE id = ?",
+                         [(km, pneu_id) for pneu_id, km in km_corrente.items()])
+
+        if bases is not None:
+            OutingManager._recalcular_cadeias(conn, pneu_ids, lote['data'].min(), 0, bases)
+
+        if outings:
+            ResumoUsoManager.aplicar_outings(conn, [outings[0][0], outings[-1][0]], +1, intervalo=True)
+            DesgasteManager.recalcular_historico(conn, "o.id BETWEEN ? AND ?", (outings[0][0], outings[-1][0]))
+            DesgasteManager.sincronizar_pneus(conn, pneu_ids)
+
+        return len(outings)
+
+    @staticmethod
+    def importar_outings(df, mapeamento=None, tamanho_lote=500):
+        """Importa outings em massa: valida tudo antes e grava em transações por lote"""
+        validas, erros, composicao = OutingManager._validar_importacao(df, mapeamento)
+
+        importados = 0
+        lotes = 0
+        for inicio in range(0, len(validas), tamanho_lote):
+            lote = validas.iloc[inicio:inicio + tamanho_lote]
+            try:
+                with transacao('outings', 'historico_pneus', 'pneus', 'resumo_uso_pneus') as conn:
+                    importados += OutingManager._gravar_lote_importacao(conn, lote, composicao)
+                lotes += 1
+            except Exception as e:
+                # Lote inteiro revertido: reportar cada linha dele
+                falhas = pd.DataFrame({'linha': lote['linha'], 'campo': '', 'erro': f"Falha ao gravar lote: {e}"})
+                erros = pd.concat([erros, falhas], ignore_index=True)
+
+        return ResultadoImportacao(importados=importados, lotes=lotes, total_linhas=len(df), erros=erros)
+
     @staticmethod
     def listar_outings():
-        conn = get_database_connection()
-        query = '''
+        return ler_em_cache('outings', ('outings', 'pistas', 'sets'), OutingManager.QUERY_LISTAR)
+
+    @staticmethod
+    def _montar_filtros(filtros):
+        """Converte os filtros preenchidos em cláusula WHERE e parâmetros"""
+        condicoes, params = [], []
+        for campo, valor in (filtros or {}).items():
+            if campo not in OutingManager.FILTROS_CONSULTA:
+                raise ValueError(f"Filtro desconhecido: {campo}")
+            if valor is None or valor == "":
+                continue
+            condicoes.append(OutingManager.FILTROS_CONSULTA[campo])
+            params.append(str(valor) if isinstance(valor, (date, datetime)) else valor)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return where, tuple(params)
+
+    @staticmethod
+    def sql_consulta_outings(filtros=None, ordenacao='recentes'):
+        """SQL da página e dos agregados para os filtros dados"""
+        if ordenacao not in OutingManager.ORDENACOES_CONSULTA:
+            raise ValueError(f"Ordenação desconhecida: {ordenacao}")
+        where, params = OutingManager._montar_filtros(filtros)
+        query_pagina = f'''
             SELECT o.*, p.nome as pista_nome, s.nome as set_nome
             FROM outings o
             JOIN pistas p ON o.pista_id = p.id
             JOIN sets s ON o.set_id = s.id
-            ORDER BY o.data DESC, o.id DESC
+            {where}
+            ORDER BY {OutingManager.ORDENACOES_CONSULTA[ordenacao]}
+            LIMIT ? OFFSET ?
         '''
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        return df
-    
+        # Agregados só dependem de outings: sem junções
+        query_agregados = f'''
+            SELECT COUNT(*),
+                   COALESCE(SUM(o.voltas), 0),
+                   COALESCE(SUM(o.km_calculado), 0),
+                   COALESCE(AVG(COALESCE(o.km_calculado, 0)), 0)
+            FROM outings o
+            {where}
+        '''
+        return query_pagina, query_agregados, params
+
+    @staticmethod
+    def consultar_outings(filtros=None, ordenacao='recentes', pagina=1, por_pagina=50):
+        """Página filtrada/ordenada de outings com contagem, voltas e km do filtro inteiro.
+
+        `filtros` aceita as chaves de FILTROS_CONSULTA (valores vazios são
+        ignorados); `ordenacao`, uma das chaves de ORDENACOES_CONSULTA.
+        """
+        query_pagina, query_agregados, params = OutingManager.sql_consulta_outings(filtros, ordenacao)
+        por_pagina = max(1, int(por_pagina))
+        pagina = max(1, int(pagina))
+
+        def carregar():
+            with conexao() as conn:
+                total, voltas, km, km_medio = conn.execute(query_agregados, params).fetchone()
+                # Página além do fim (filtro mudou): volta para a última
+                ultima = max(1, -(-total // por_pagina))
+                pagina_real = min(pagina, ultima)
+                outings = pd.read_sql_query(query_pagina, conn,
+                                            params=params + (por_pagina, (pagina_real - 1) * por_pagina))
+            return PaginaOutings(outings=outings, pagina=pagina_real, por_pagina=por_pagina,
+                                 total=total, total_voltas=safe_int(voltas), total_km=safe_float(km),
+                                 km_medio=safe_float(km_medio))
+
+        chave = ('outings_pagina', tuple(sorted((filtros or {}).items())), ordenacao, pagina, por_pagina)
+        resultado = get_pool().obter_em_cache(chave, ('outings', 'pistas', 'sets'), carregar)
+        # Cópia: quem chama pode modificar o DataFrame sem afetar o cache
+        return PaginaOutings(**{**resultado.__dict__, 'outings': resultado.outings.copy()})
+
+    @staticmethod
+    def opcoes_filtro_outings():
+        """Pistas, sets e tipos de sessão que aparecem nos outings registrados"""
+        pistas = ler_em_cache('outings_filtro_pistas', ('outings', 'pistas'), '''
+            SELECT p.id, p.nome FROM pistas p
+            WHERE EXISTS (SELECT 1 FROM outings o WHERE o.pista_id = p.id)
+            ORDER BY p.nome
+        ''')
+        sets = ler_em_cache('outings_filtro_sets', ('outings', 'sets'), '''
+            SELECT s.id, s.nome FROM sets s
+            WHERE EXISTS (SELECT 1 FROM outings o WHERE o.set_id = s.id)
+            ORDER BY s.nome
+        ''')
+        tipos = ler_em_cache('outings_filtro_tipos', ('outings',),
+                             "SELECT DISTINCT tipo_sessao FROM outings WHERE tipo_sessao IS NOT NULL ORDER BY tipo_sessao")
+        return pistas, sets, tipos['tipo_sessao'].tolist()
+
+    @staticmethod
+    def historico_pneu(pneu_id):
+        """Timeline detalhada de um pneu (outings, pista e posição)"""
+        return ler_em_cache(('historico_pneu', pneu_id), ('historico_pneus', 'outings', 'pistas'),
+                            OutingManager.QUERY_HISTORICO_PNEU, (pneu_id,))
+
     @staticmethod
     def get_outing_by_id(outing_id):
         """Busca outing por ID"""
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM outings WHERE id = ?", (outing_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result
-    
+        with conexao() as conn:
+            return conn.execute("SELECT * FROM outings WHERE id = ?", (outing_id,)).fetchone()
+
+    @staticmethod
+    def _pneus_do_set(set_data):
+        """Lista (posicao, pneu_id) dos pneus montados em um set"""
+        if not set_data:
+            return []
+        posicoes = zip(['DE', 'DD', 'TE', 'TD'], set_data[5:9])  # pneu_de, dd, te, td
+        return [(posicao, pneu_id) for posicao, pneu_id in posicoes if pneu_id and pneu_id.strip()]
+
+    @staticmethod
+    def _bases_das_cadeias(conn, pneu_ids):
+        """km_antes da primeira linha de histórico (base da cadeia) de cada pneu"""
+        pneu_ids = sorted({p for p in pneu_ids if p})
+        if not pneu_ids:
+            return {}
+        marcadores = ','.join('?' * len(pneu_ids))
+        linhas = conn.execute(f'''
+            SELECT pneu_id, km_antes FROM (
+                SELECT h.pneu_id, h.km_antes,
+                       ROW_NUMBER() OVER (PARTITION BY h.pneu_id ORDER BY o.data, o.id) AS ordem
+                FROM historico_pneus h
+                JOIN outings o ON h.outing_id = o.id
+                WHERE h.pneu_id IN ({marcadores})
+            ) WHERE ordem = 1
+        ''', pneu_ids).fetchall()
+        return {pneu_id: safe_float(km_antes, 0) for pneu_id, km_antes in linhas}
+
+    @staticmethod
+    def _recalcular_cadeias(conn, pneu_ids, data_inicio, outing_inicio, bases=None):
+        """Reescreve km_antes/km_depois dos pneus informados a partir de um outing.
+
+        Só as linhas de histórico em (data, id) >= (data_inicio, outing_inicio)
+        são tocadas. O ponto de partida de cada pneu é o km_depois do último
+        outing anterior; sem anterior, usa-se `bases[pneu_id]` ou o km_antes
+        já gravado na primeira linha. Ao final, km_atual recebe o último km_depois.
+        Deve ser chamado dentro de uma transação.
+        """
+        pneu_ids = sorted({p for p in pneu_ids if p})
+        if not pneu_ids:
+            return 0
+        bases = dict(bases or {})
+        marcadores = ','.join('?' * len(pneu_ids))
+        inicio = (str(data_inicio), int(outing_inicio))
+
+        # km_depois do último outing anterior ao ponto de partida, por pneu
+        anteriores = conn.execute(f'''
+            SELECT pneu_id, km_depois FROM (
+                SELECT h.pneu_id, h.km_depois,
+                       ROW_NUMBER() OVER (PARTITION BY h.pneu_id ORDER BY o.data DESC, o.id DESC) AS ordem
+                FROM historico_pneus h
+                JOIN outings o ON h.outing_id = o.id
+                WHERE h.pneu_id IN ({marcadores})
+                  AND (o.data < ? OR (o.data = ? AND o.id < ?))
+            ) WHERE ordem = 1
+        ''', (*pneu_ids, inicio[0], inicio[0], inicio[1])).fetchall()
+        km_corrente = {pneu_id: safe_float(km, 0) for pneu_id, km in anteriores}
+
+        # Linhas a partir do ponto de partida, em ordem cronológica
+        seguintes = conn.execute(f'''
+            SELECT h.id, h.pneu_id, h.km_antes, o.km_calculado
+            FROM historico_pneus h
+            JOIN outings o ON h.outing_id = o.id
+            WHERE h.pneu_id IN ({marcadores})
+              AND (o.data > ? OR (o.data = ? AND o.id >= ?))
+            ORDER BY h.pneu_id, o.data, o.id
+        ''', (*pneu_ids, inicio[0], inicio[0], inicio[1])).fetchall()
+
+        atualizacoes = []
+        for historico_id, pneu_id, km_antes_gravado, km_outing in seguintes:
+            if pneu_id not in km_corrente:
+                km_corrente[pneu_id] = safe_float(bases.get(pneu_id, km_antes_gravado), 0)
+            km_antes = km_corrente[pneu_id]
+            km_depois = km_antes + safe_float(km_outing, 0)
+            km_corrente[pneu_id] = km_depois
+            atualizacoes.append((km_antes, km_depois, historico_id))
+
+        conn.executemany("UPDATE historico_pneus SET km_antes = ?, km_depois = ? WHERE id = ?", atualizacoes)
+
+        # Pneus sem nenhum histórico restante voltam à sua base; sem base, o km não veio de
+        # outings (ex.: medições do app1) e fica como está
+        km_final = [
+            (km_corrente.get(pneu_id, safe_float(bases.get(pneu_id), 0)), pneu_id)
+            for pneu_id in pneu_ids
+            if pneu_id in km_corrente or pneu_id in bases
+        ]
+        conn.executemany("UPDATE pneus SET km_atual = ? WHERE id = ?", km_final)
+        return len(atualizacoes)
+
     @staticmethod
     def atualizar_outing(outing_id, data, pista_id, set_id, tipo_sessao, condicao, voltas, observacoes=""):
-        """Atualiza um outing existente - VERSÃO SIMPLIFICADA"""
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
+        """Atualiza um outing existente e reencadeia o km apenas dos pneus afetados"""
         try:
-            # Buscar comprimento da pista para recalcular km
-            pista = PistaManager.get_pista_by_id(pista_id)
-            if not pista:
-                return False
-            
-            comprimento = safe_float(pista[2], 4.0)
-            km_calculado = voltas * comprimento
-            
-            # NOTA: Para simplicidade, apenas atualiza o outing
-            # NÃO recalcula o histórico de pneus (seria muito complexo)
-            cursor.execute('''
-                UPDATE outings 
-                SET data=?, pista_id=?, set_id=?, tipo_sessao=?, condicao=?, voltas=?, km_calculado=?, observacoes=?
-                WHERE id=?
-            ''', (data, pista_id, set_id, tipo_sessao, condicao, voltas, km_calculado, observacoes, outing_id))
-            
-            conn.commit()
+            with transacao('outings', 'historico_pneus', 'pneus', 'resumo_uso_pneus') as conn:
+                outing_antigo = conn.execute("SELECT data, set_id FROM outings WHERE id = ?", (outing_id,)).fetchone()
+                if not outing_antigo:
+                    return False
+
+                # Buscar comprimento da pista para recalcular km
+                pista = PistaManager.get_pista_by_id(pista_id)
+                if not pista:
+                    return False
+
+                comprimento = safe_float(pista[2], 4.0)
+                km_calculado = voltas * comprimento
+
+                # Retira a contribuição antiga do resumo; a nova entra no fim
+                ResumoUsoManager.aplicar_outings(conn, [outing_id], -1)
+
+                # Base da cadeia de cada pneu antes da edição (o outing pode mudar de data e deixar de ser o primeiro)
+                pneus_antigos = [row[0] for row in conn.execute(
+                    "SELECT pneu_id FROM historico_pneus WHERE outing_id = ?", (outing_id,))]
+                bases = OutingManager._bases_das_cadeias(conn, pneus_antigos)
+                pneus_afetados = set(bases)
+
+                conn.execute('''
+                    UPDATE outings
+                    SET data=?, pista_id=?, set_id=?, tipo_sessao=?, condicao=?, voltas=?, km_calculado=?, observacoes=?
+                    WHERE id=?
+                ''', (data, pista_id, set_id, tipo_sessao, condicao, voltas, km_calculado, observacoes, outing_id))
+
+                # Troca de set: o histórico passa para os pneus do novo set
+                if set_id != outing_antigo[1]:
+                    set_data = SetManager.get_set_by_id(set_id)
+                    if not set_data:
+                        raise ValueError(f"Set {set_id} não encontrado")
+
+                    novos_pneus = OutingManager._pneus_do_set(set_data)
+                    # Base dos pneus novos: a da cadeia que já têm, senão o km atual (como em registrar_outing)
+                    novos_ids = [pneu_id for _, pneu_id in novos_pneus if pneu_id not in bases]
+                    if novos_ids:
+                        bases_novas = OutingManager._bases_das_cadeias(conn, novos_ids)
+                        marcadores = ','.join('?' * len(novos_ids))
+                        for pneu_id, km_atual in conn.execute(
+                                f"SELECT id, km_atual FROM pneus WHERE id IN ({marcadores})", novos_ids):
+                            bases[pneu_id] = bases_novas.get(pneu_id, safe_float(km_atual, 0))
+
+                    conn.execute("DELETE FROM historico_pneus WHERE outing_id = ?", (outing_id,))
+                    conn.executemany('''
+                        INSERT INTO historico_pneus (pneu_id, outing_id, posicao, km_antes, km_depois)
+                        VALUES (?, ?, ?, 0, 0)
+                    ''', [(pneu_id, outing_id, posicao) for posicao, pneu_id in novos_pneus])
+                    pneus_afetados.update(pneu_id for _, pneu_id in novos_pneus)
+
+                # Reencadear a partir da data mais antiga entre a antiga e a nova
+                data_inicio = min(str(outing_antigo[0]), str(data))
+                OutingManager._recalcular_cadeias(conn, pneus_afetados, data_inicio, 0, bases)
+
+                ResumoUsoManager.aplicar_outings(conn, [outing_id], +1)
+                DesgasteManager.recalcular_historico(conn, "o.id = ?", (outing_id,))
+                DesgasteManager.sincronizar_pneus(conn, pneus_afetados)
+
             return True
-            
+
         except Exception as e:
-            conn.rollback()
             return False
-        finally:
-            conn.close()
-    
+
     @staticmethod
     def excluir_outing(outing_id):
-        """Exclui um outing e seu histórico - VERSÃO SIMPLIFICADA"""
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
+        """Exclui um outing e seu histórico, revertendo o km dos pneus afetados"""
         try:
-            # NOTA: Para simplicidade, apenas remove o outing e histórico
-            # NÃO reverte a quilometragem dos pneus (seria muito complexo)
-            
-            # Excluir histórico de pneus associado
-            cursor.execute("DELETE FROM historico_pneus WHERE outing_id = ?", (outing_id,))
-            
-            # Excluir o outing
-            cursor.execute("DELETE FROM outings WHERE id = ?", (outing_id,))
-            
-            conn.commit()
+            with transacao('outings', 'historico_pneus', 'pneus', 'resumo_uso_pneus') as conn:
+                outing = conn.execute("SELECT data FROM outings WHERE id = ?", (outing_id,)).fetchone()
+                if not outing:
+                    return False
+
+                historico = conn.execute(
+                    "SELECT pneu_id, km_antes FROM historico_pneus WHERE outing_id = ?", (outing_id,)
+                ).fetchall()
+                bases = {pneu_id: km_antes for pneu_id, km_antes in historico}
+
+                ResumoUsoManager.aplicar_outings(conn, [outing_id], -1)
+
+                # Excluir histórico de pneus associado
+                conn.execute("DELETE FROM historico_pneus WHERE outing_id = ?", (outing_id,))
+
+                # Excluir o outing
+                conn.execute("DELETE FROM outings WHERE id = ?", (outing_id,))
+
+                # Reencadear somente os pneus desse outing, dali em diante
+                OutingManager._recalcular_cadeias(conn, bases.keys(), outing[0], outing_id, bases)
+                DesgasteManager.sincronizar_pneus(conn, bases.keys())
+
             return True
-            
+
         except Exception as e:
-            conn.rollback()
             return False
-        finally:
-            conn.close()
-    
+
     @staticmethod
     def recalcular_km_todos_pneus():
-        """Função para recalcular KM de todos os pneus baseado no histórico"""
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
+        """Reconstrói a cadeia de km e o desgaste de todos os pneus a partir do histórico (manutenção)"""
         try:
-            # Resetar todos os pneus para 0
-            cursor.execute("UPDATE pneus SET km_atual = 0")
-            
-            # Buscar todo o histórico ordenado por data
-            query = '''
-                SELECT h.pneu_id, h.km_antes, h.km_depois, o.data
-                FROM historico_pneus h
-                JOIN outings o ON h.outing_id = o.id
-                ORDER BY o.data ASC, o.id ASC
-            '''
-            historico = cursor.execute(query).fetchall()
-            
-            # Recalcular baseado no histórico
-            pneus_km = {}
-            for hist in historico:
-                pneu_id = hist[0]
-                km_depois = safe_float(hist[2], 0)
-                pneus_km[pneu_id] = km_depois
-            
-            # Atualizar cada pneu com seu KM final
-            for pneu_id, km_final in pneus_km.items():
-                cursor.execute("UPDATE pneus SET km_atual = ? WHERE id = ?", (km_final, pneu_id))
-            
-            conn.commit()
+            with transacao('historico_pneus', 'pneus') as conn:
+                pneu_ids = [row[0] for row in conn.execute("SELECT id FROM pneus").fetchall()]
+                OutingManager._recalcular_cadeias(conn, pneu_ids, '', 0)
+                DesgasteManager.recalcular_historico(conn)
+                DesgasteManager.sincronizar_pneus(conn)
+
             return True
-            
+
         except Exception as e:
-            conn.rollback()
             return False
-        finally:
-            conn.close()
+
+# Previsão de vida útil restante (voltas até amarelo/vermelho) para a frota inteira
+class PrevisaoManager:
+    COLUNAS_PREVISAO = ['pneu_id', 'tipo', 'status', 'posicao_prevista', 'pista_id', 'pista_nome',
+                        'desgaste_atual', 'limite_km', 'fator_individual', 'desgaste_volta',
+                        'voltas_ate_amarelo', 'voltas_ate_vermelho', 'km_ate_vermelho']
+
+    # Posição mais frequente de cada pneu (para quem não está montado)
+    QUERY_POSICAO_MAIS_USADA = '''
+        SELECT pneu_id, valor AS posicao FROM (
+            SELECT pneu_id, valor,
+                   ROW_NUMBER() OVER (PARTITION BY pneu_id ORDER BY usos DESC, valor) AS ordem
+            FROM resumo_uso_pneus
+            WHERE dimensao = 'posicao'
+        ) WHERE ordem = 1
+    '''
+
+    # Medições de profundidade do app1 (tabela medicoes): km do pneu e profundidade média da banda
+    QUERY_MEDICOES = '''
+        SELECT pneu_id,
+               COALESCE(km_total, km_antes) AS desgaste,
+               COALESCE(profundidade_media, (interno + centro_interno + centro_externo + externo) / 4.0) AS profundidade
+        FROM medicoes
+        WHERE pneu_id IS NOT NULL
+    '''
+
+    @staticmethod
+    def desgaste_por_volta(pistas_df, condicao='seco'):
+        """Desgaste efetivo de uma volta em cada pista e posição, mais a média das posições ('MEDIA')"""
+        base = pistas_df.rename(columns={'id': 'pista_id', 'nome': 'pista_nome'}).merge(
+            pd.DataFrame({'posicao': DesgasteManager.POSICOES}), how='cross')
+        base['km_calculado'] = pd.to_numeric(base['comprimento'], errors='coerce').fillna(4.0)
+        base['condicao'] = condicao
+        base['desgaste_volta'] = DesgasteManager.calcular(base)
+
+        base['comprimento'] = base['km_calculado']
+        por_volta = base[['pista_id', 'pista_nome', 'comprimento', 'posicao', 'desgaste_volta']]
+        media = por_volta.groupby(['pista_id', 'pista_nome', 'comprimento'], as_index=False)['desgaste_volta'].mean()
+        media['posicao'] = 'MEDIA'
+        return pd.concat([por_volta, media], ignore_index=True)
+
+    @staticmethod
+    def posicoes_previstas():
+        """Posição esperada de cada pneu: a do set ativo, senão a mais usada no histórico"""
+        sets_ativos = SetManager.listar_sets_ativos()
+        montados = sets_ativos.melt(value_vars=['pneu_de', 'pneu_dd', 'pneu_te', 'pneu_td'],
+                                    var_name='posicao', value_name='pneu_id').dropna(subset=['pneu_id'])
+        montados['posicao'] = montados['posicao'].str[-2:].str.upper()
+
+        mais_usada = ler_em_cache('posicao_mais_usada', ('resumo_uso_pneus',),
+                                  PrevisaoManager.QUERY_POSICAO_MAIS_USADA)
+        posicoes = pd.concat([montados[['pneu_id', 'posicao']], mais_usada], ignore_index=True)
+        return posicoes.drop_duplicates('pneu_id').set_index('pneu_id')['posicao']
+
+    @staticmethod
+    def medicoes_profundidade():
+        """Medições no formato de fator_individual (pneu_id, desgaste, profundidade)"""
+        return ler_em_cache('medicoes_profundidade', ('medicoes',), PrevisaoManager.QUERY_MEDICOES)
+
+    @staticmethod
+    def fator_individual(medicoes):
+        """Taxa de perda de profundidade de cada pneu relativa à mediana da frota.
+
+        `medicoes`: colunas pneu_id, desgaste (acumulado na medição) e
+        profundidade. Regressão linear por pneu, vetorizada com somas por
+        grupo; pneus com menos de duas medições ficam de fora (fator 1).
+        """
+        if medicoes is None or medicoes.empty:
+            return pd.Series(dtype=float)
+        pontos = pd.DataFrame({
+            'pneu_id': medicoes['pneu_id'],
+            'x': pd.to_numeric(medicoes['desgaste'], errors='coerce'),
+            'y': pd.to_numeric(medicoes['profundidade'], errors='coerce'),
+        }).dropna()
+        pontos['xx'] = pontos['x'] ** 2
+        pontos['xy'] = pontos['x'] * pontos['y']
+        somas = pontos.groupby('pneu_id').agg(n=('x', 'size'), x=('x', 'sum'), y=('y', 'sum'),
+                                              xx=('xx', 'sum'), xy=('xy', 'sum'))
+        variancia = somas['xx'] / somas['n'] - (somas['x'] / somas['n']) ** 2
+        covariancia = somas['xy'] / somas['n'] - somas['x'] * somas['y'] / somas['n'] ** 2
+        perda = (-covariancia / variancia)[(somas['n'] >= 2) & (variancia > 0)]
+        perda = perda[perda > 0]
+        if perda.empty:
+            return pd.Series(dtype=float)
+        return (perda / perda.median()).clip(0.5, 2.0)
+
+    @staticmethod
+    def prever_pneus(pista_id=None, condicao='seco'):
+        """Voltas até amarelo/vermelho de todos os pneus em cada pista (ou só em `pista_id`).
+
+        O desgaste por volta de cada pneu é o da pista/posição vezes o seu
+        fator individual, calculado das medições de profundidade do app1.
+        """
+        def calcular():
+            pneus = PneuManager.listar_status_pneus()
+            pistas = PistaManager.listar_pistas()
+            if pista_id is not None:
+                pistas = pistas[pistas['id'] == pista_id]
+            if pneus.empty or pistas.empty:
+                return pd.DataFrame(columns=PrevisaoManager.COLUNAS_PREVISAO)
+
+            pneus = pneus.rename(columns={'id': 'pneu_id'})
+            pneus['posicao_prevista'] = pneus['pneu_id'].map(PrevisaoManager.posicoes_previstas()).fillna('MEDIA')
+            fatores = PrevisaoManager.fator_individual(PrevisaoManager.medicoes_profundidade())
+            pneus['fator_individual'] = pneus['pneu_id'].map(fatores).fillna(1.0)
+
+            # Pneus x pistas: cada pneu cruza com todas as pistas na sua posição
+            previsao = pneus.merge(PrevisaoManager.desgaste_por_volta(pistas, condicao),
+                                   left_on='posicao_prevista', right_on='posicao')
+            previsao['desgaste_volta'] = previsao['desgaste_volta'] * previsao['fator_individual']
+            por_volta = previsao['desgaste_volta'].where(previsao['desgaste_volta'] > 0)
+
+            # Verde até LIMITE_VERDE% do limite; vermelho acima de LIMITE_AMARELO%
+            for coluna, limiar in (('voltas_ate_amarelo', PneuManager.LIMITE_VERDE),
+                                   ('voltas_ate_vermelho', PneuManager.LIMITE_AMARELO)):
+                folga = previsao['limite_km'] * limiar / 100 - previsao['desgaste_atual']
+                previsao[coluna] = (folga / por_volta).clip(lower=0) // 1
+            previsao['km_ate_vermelho'] = previsao['voltas_ate_vermelho'] * previsao['comprimento']
+            return previsao[PrevisaoManager.COLUNAS_PREVISAO].sort_values(
+                ['pista_nome', 'voltas_ate_vermelho', 'pneu_id'], kind='stable').reset_index(drop=True)
+
+        chave = ('previsao_pneus', pista_id, condicao)
+        tabelas = ('pneus', 'pistas', 'sets', 'resumo_uso_pneus', 'medicoes')
+        return get_pool().obter_em_cache(chave, tabelas, calcular).copy()
+
+    @staticmethod
+    def prever_sets(pista_id, condicao='seco'):
+        """Voltas até amarelo/vermelho de cada set ativo na pista: limitado pelo pneu mais gasto"""
+        previsao = PrevisaoManager.prever_pneus(pista_id, condicao)
+        sets_ativos = SetManager.listar_sets_ativos()
+        montados = sets_ativos.melt(id_vars=['id', 'nome'], value_vars=['pneu_de', 'pneu_dd', 'pneu_te', 'pneu_td'],
+                                    value_name='pneu_id').dropna(subset=['pneu_id'])
+        colunas = ['set_id', 'set_nome', 'voltas_ate_amarelo', 'voltas_ate_vermelho', 'pneu_limitante']
+        if montados.empty or previsao.empty:
+            return pd.DataFrame(columns=colunas)
+
+        por_pneu = montados.merge(previsao, on='pneu_id').rename(columns={'id': 'set_id', 'nome': 'set_nome'})
+        por_pneu = por_pneu.sort_values(['set_id', 'voltas_ate_vermelho', 'pneu_id'], kind='stable')
+        resumo = por_pneu.groupby(['set_id', 'set_nome'], as_index=False).agg(
+            voltas_ate_amarelo=('voltas_ate_amarelo', 'min'),
+            voltas_ate_vermelho=('voltas_ate_vermelho', 'min'),
+            pneu_limitante=('pneu_id', 'first'),
+        )
+        return resumo[colunas].sort_values('voltas_ate_vermelho', kind='stable').reset_index(drop=True)
+
+# Simulação Monte Carlo do fim de semana para os sets ativos
+class SimulacaoManager:
+    COLUNAS_SIMULACAO = ['set_id', 'set_nome', 'prob_vermelho', 'prob_vermelho_antes_corrida',
+                         'uso_mediano', 'uso_p90', 'pneu_limitante']
+
+    SESSOES_PADRAO = ('treino', 'classificacao', 'corrida')
+    # Voltas usadas quando não há histórico do tipo de sessão
+    VOLTAS_PADRAO_SESSAO = {'treino': 20, 'classificacao': 8, 'corrida': 30, 'warmup': 5, 'teste': 25}
+    # Histórico mínimo na pista antes de recorrer ao de todas as pistas
+    MIN_AMOSTRAS = 3
+    CV_DESGASTE_PADRAO = 0.10
+
+    QUERY_SESSOES = "SELECT pista_id, tipo_sessao, condicao, voltas FROM outings WHERE voltas > 0"
+
+    @staticmethod
+    def historico_sessoes(pista_id):
+        """Amostras de voltas por tipo de sessão e frequência de cada condição.
+
+        Usa os outings da pista; com menos de MIN_AMOSTRAS, os de todas as
+        pistas; sem nenhum, VOLTAS_PADRAO_SESSAO (±20%) e pista seca.
+        """
+        outings = ler_em_cache('sessoes_outings', ('outings',), SimulacaoManager.QUERY_SESSOES)
+        na_pista = outings[outings['pista_id'] == pista_id]
+
+        voltas = {}
+        for tipo in TIPOS_SESSAO:
+            amostra = na_pista.loc[na_pista['tipo_sessao'] == tipo, 'voltas']
+            if len(amostra) < SimulacaoManager.MIN_AMOSTRAS:
+                amostra = outings.loc[outings['tipo_sessao'] == tipo, 'voltas']
+            if amostra.empty:
+                padrao = SimulacaoManager.VOLTAS_PADRAO_SESSAO.get(tipo, 20)
+                amostra = pd.Series([padrao * f for f in (0.8, 0.9, 1.0, 1.1, 1.2)]).round()
+            voltas[tipo] = amostra.to_numpy(dtype=float)
+
+        condicoes = na_pista if len(na_pista) >= SimulacaoManager.MIN_AMOSTRAS else outings
+        frequencia = condicoes['condicao'].value_counts(normalize=True).reindex(CONDICOES, fill_value=0.0)
+        if frequencia.sum() == 0:
+            frequencia['seco'] = 1.0
+        return voltas, frequencia.to_dict()
+
+    @staticmethod
+    def cv_desgaste_historico():
+        """Variação da taxa de desgaste entre os pneus: desvio do fator individual das medições.
+
+        Com menos de MIN_AMOSTRAS pneus medidos, CV_DESGASTE_PADRAO.
+        """
+        fatores = PrevisaoManager.fator_individual(PrevisaoManager.medicoes_profundidade())
+        if len(fatores) < SimulacaoManager.MIN_AMOSTRAS:
+            return SimulacaoManager.CV_DESGASTE_PADRAO
+        return float(fatores.std())
+
+    @staticmethod
+    def simular_sets(pista_id, sessoes=SESSOES_PADRAO, prob_condicao=None, cv_desgaste=None,
+                     n_cenarios=100_000, semente=None):
+        """Probabilidade de cada set ativo passar do vermelho até o fim da corrida na pista.
+
+        A última sessão de `sessoes` é a corrida. Sem `prob_condicao`, usa a
+        frequência do histórico; sem `cv_desgaste`, cv_desgaste_historico().
+        """
+        pistas = PistaManager.listar_pistas()
+        pistas = pistas[pistas['id'] == pista_id]
+        sets_ativos = SetManager.listar_sets_ativos()
+        montados = sets_ativos.melt(id_vars=['id', 'nome'], value_vars=['pneu_de', 'pneu_dd', 'pneu_te', 'pneu_td'],
+                                    var_name='posicao', value_name='pneu_id').dropna(subset=['pneu_id'])
+        if montados.empty or pistas.empty or not sessoes:
+            return pd.DataFrame(columns=SimulacaoManager.COLUNAS_SIMULACAO)
+
+        montados['posicao'] = montados['posicao'].str[-2:].str.upper()
+        pneus = PneuManager.listar_status_pneus()[['id', 'desgaste_atual', 'limite_km']]
+        montados = montados.merge(pneus, left_on='pneu_id', right_on='id', suffixes=('', '_pneu'))
+        montados = montados.sort_values(['id', 'posicao'], kind='stable').reset_index(drop=True)
+        if montados.empty:
+            return pd.DataFrame(columns=SimulacaoManager.COLUNAS_SIMULACAO)
+
+        # Desgaste por volta de cada pneu em cada condição (colunas na ordem de CONDICOES)
+        fatores = PrevisaoManager.fator_individual(PrevisaoManager.medicoes_profundidade())
+        fator_pneu = montados['pneu_id'].map(fatores).fillna(1.0)
+        desgaste_volta = pd.concat([
+            montados['posicao'].map(
+                PrevisaoManager.desgaste_por_volta(pistas, condicao).set_index('posicao')['desgaste_volta']
+            ).fillna(0.0) * fator_pneu
+            for condicao in CONDICOES
+        ], axis=1)
+
+        voltas, frequencia = SimulacaoManager.historico_sessoes(pista_id)
+        prob = prob_condicao if prob_condicao is not None else frequencia
+        if cv_desgaste is None:
+            cv_desgaste = SimulacaoManager.cv_desgaste_historico()
+
+        grupos, set_ids = pd.factorize(montados['id'])
+        resultado = simular_fim_de_semana(
+            montados['desgaste_atual'].fillna(0).to_numpy(dtype=float),
+            (montados['limite_km'].fillna(0) * PneuManager.LIMITE_AMARELO / 100).to_numpy(dtype=float),
+            desgaste_volta.to_numpy(),
+            grupos,
+            [voltas[tipo] for tipo in sessoes],
+            [prob.get(condicao, 0.0) for condicao in CONDICOES],
+            cv_desgaste=cv_desgaste, n_cenarios=n_cenarios, semente=semente,
+        )
+
+        montados['prob_pneu'] = resultado.prob_vermelho_pneu
+        limitante = montados.sort_values(['id', 'prob_pneu', 'pneu_id'], ascending=[True, False, True],
+                                         kind='stable').drop_duplicates('id').set_index('id')['pneu_id']
+        nomes = sets_ativos.set_index('id')['nome']
+        simulacao = pd.DataFrame({
+            'set_id': set_ids,
+            'set_nome': nomes.reindex(set_ids).values,
+            'prob_vermelho': resultado.prob_vermelho,
+            'prob_vermelho_antes_corrida': resultado.prob_vermelho_antes_corrida,
+            'uso_mediano': resultado.uso_mediano,
+            'uso_p90': resultado.uso_p90,
+            'pneu_limitante': limitante.reindex(set_ids).values,
+        })
+        return simulacao.sort_values(['prob_vermelho', 'uso_p90'], ascending=False, kind='stable').reset_index(drop=True)
+
+@dataclass(frozen=True)
+class ResumoUsoPneu:
+    """Estatísticas de uso de um pneu lidas de resumo_uso_pneus"""
+    usos: int = 0
+    voltas: int = 0
+    km: float = 0.0
+    por_posicao: Tuple[Tuple[str, int], ...] = ()
+    por_pista: Tuple[Tuple[str, int], ...] = ()
+    por_tipo_sessao: Tuple[Tuple[str, int], ...] = ()
+
+    @property
+    def pista_mais_usada(self):
+        return self.por_pista[0][0] if self.por_pista else "N/A"
+
+# Resumo de uso por pneu, mantido incrementalmente pelas escritas de outings
+class ResumoUsoManager:
+    DIMENSOES = ('total', 'posicao', 'pista', 'tipo_sessao')
+
+    # Mesmo resumo, recalculado do zero a partir do histórico
+    QUERY_RESUMO_ESPERADO = QUERY_RESUMO_USO
+    QUERY_RESUMO_PNEU = '''
+        SELECT r.dimensao, r.valor, r.usos, r.voltas, r.km, p.nome
+        FROM resumo_uso_pneus r
+        LEFT JOIN pistas p ON r.dimensao = 'pista' AND p.id = r.valor
+        WHERE r.pneu_id = ?
+        ORDER BY r.dimensao, r.usos DESC, r.valor
+    '''
+
+    @staticmethod
+    def aplicar_outings(conn, outing_ids, sinal, intervalo=False):
+        """Soma (sinal=+1) ou retira (sinal=-1) a contribuição dos outings no resumo.
+
+        Deve rodar na transação da escrita: com +1 depois de gravar o histórico,
+        com -1 antes de alterá-lo/excluí-lo. `intervalo=True` trata
+        `outing_ids` como [primeiro, último].
+        """
+        if intervalo:
+            filtro, params = "o.id BETWEEN ? AND ?", tuple(outing_ids)
+        else:
+            filtro, params = f"o.id IN ({','.join('?' * len(outing_ids))})", tuple(outing_ids)
+        usos = conn.execute(f'''
+            SELECT h.pneu_id, h.posicao, o.pista_id, COALESCE(o.tipo_sessao, ''),
+                   COALESCE(o.voltas, 0), COALESCE(o.km_calculado, 0)
+            FROM outings o JOIN historico_pneus h ON h.outing_id = o.id
+            WHERE {filtro}
+        ''', params).fetchall()
+        if not usos:
+            return
+
+        linhas = []
+        for pneu_id, posicao, pista_id, tipo_sessao, voltas, km in usos:
+            for dimensao, valor in zip(ResumoUsoManager.DIMENSOES, ('', posicao, pista_id, tipo_sessao)):
+                linhas.append((pneu_id, dimensao, valor, sinal, sinal * voltas, sinal * km))
+        conn.executemany('''
+            INSERT INTO resumo_uso_pneus (pneu_id, dimensao, valor, usos, voltas, km)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (pneu_id, dimensao, valor) DO UPDATE SET
+                usos = usos + excluded.usos,
+                voltas = voltas + excluded.voltas,
+                km = km + excluded.km
+        ''', linhas)
+
+        if sinal < 0:
+            pneu_ids = sorted({linha[0] for linha in usos})
+            conn.execute(f"DELETE FROM resumo_uso_pneus WHERE usos <= 0 AND pneu_id IN ({','.join('?' * len(pneu_ids))})",
+                         pneu_ids)
+
+    @staticmethod
+    def resumo_pneu(pneu_id):
+        """Estatísticas de uso do pneu por busca na chave primária (em cache)"""
+        def carregar():
+            with conexao() as conn:
+                linhas = conn.execute(ResumoUsoManager.QUERY_RESUMO_PNEU, (pneu_id,)).fetchall()
+
+            totais = {}
+            grupos = {'posicao': [], 'pista': [], 'tipo_sessao': []}
+            for dimensao, valor, usos, voltas, km, pista_nome in linhas:
+                if dimensao == 'total':
+                    totais = {'usos': usos, 'voltas': voltas, 'km': km}
+                elif dimensao in grupos:
+                    grupos[dimensao].append((pista_nome or valor if dimensao == 'pista' else valor, usos))
+            return ResumoUsoPneu(por_posicao=tuple(grupos['posicao']), por_pista=tuple(grupos['pista']),
+                                 por_tipo_sessao=tuple(grupos['tipo_sessao']), **totais)
+
+        return get_pool().obter_em_cache(('resumo_uso', pneu_id), ('resumo_uso_pneus', 'pistas'), carregar)
+
+    @staticmethod
+    def verificar_consistencia(corrigir=False):
+        """Compara o resumo com o histórico; com `corrigir`, reconstrói a tabela inteira.
+
+        Retorna as linhas divergentes (chave, valores gravados e esperados).
+        """
+        chaves = ['pneu_id', 'dimensao', 'valor']
+        colunas = chaves + ['usos', 'voltas', 'km']
+        with transacao('resumo_uso_pneus') as conn:
+            esperado = pd.DataFrame(conn.execute(ResumoUsoManager.QUERY_RESUMO_ESPERADO).fetchall(), columns=colunas)
+            gravado = pd.read_sql_query(f"SELECT {', '.join(colunas)} FROM resumo_uso_pneus", conn)
+
+            comparacao = gravado.merge(esperado, on=chaves, how='outer', suffixes=('_gravado', '_esperado'))
+            comparacao = comparacao.fillna({f"{c}_{lado}": 0 for c in ('usos', 'voltas', 'km')
+                                            for lado in ('gravado', 'esperado')})
+            divergente = ((comparacao['usos_gravado'] != comparacao['usos_esperado'])
+                          | (comparacao['voltas_gravado'] != comparacao['voltas_esperado'])
+                          | ((comparacao['km_gravado'] - comparacao['km_esperado']).abs() > 1e-6))
+            divergencias = comparacao[divergente].reset_index(drop=True)
+
+            if corrigir and not divergencias.empty:
+                conn.execute("DELETE FROM resumo_uso_pneus")
+                conn.execute(f"INSERT INTO resumo_uso_pneus (pneu_id, dimensao, valor, usos, voltas, km) "
+                             f"{ResumoUsoManager.QUERY_RESUMO_ESPERADO}")
+
+        return divergencias
+
+# Métricas agregadas do dashboard
+@dataclass(frozen=True)
+class MetricasDashboard:
+    """Números de destaque do sistema, calculados em uma única consulta"""
+    total_pneus: int = 0
+    disponiveis: int = 0
+    em_uso: int = 0
+    km_total: float = 0.0
+    total_sets: int = 0
+    sets_ativos: int = 0
+    total_pistas: int = 0
+    total_outings: int = 0
+    km_outings: float = 0.0
+    por_tipo: Tuple[Tuple[str, int, float], ...] = ()  # (tipo, quantidade, km_medio)
+
+class MetricasManager:
+    # Uma única passada agrupada sobre todas as tabelas
+    QUERY_METRICAS = '''
+        SELECT 'pneus' AS origem, tipo AS chave, status AS subchave,
+               COUNT(*) AS quantidade, COALESCE(SUM(km_atual), 0) AS km
+        FROM pneus GROUP BY tipo, status
+        UNION ALL
+        SELECT 'sets', status, NULL, COUNT(*), 0 FROM sets GROUP BY status
+        UNION ALL
+        SELECT 'pistas', NULL, NULL, COUNT(*), 0 FROM pistas
+        UNION ALL
+        SELECT 'outings', NULL, NULL, COUNT(*), COALESCE(SUM(km_calculado), 0) FROM outings
+    '''
+
+    @staticmethod
+    def calcular_metricas():
+        """Executa a consulta agregada e monta o snapshot"""
+        with conexao() as conn:
+            linhas = conn.execute(MetricasManager.QUERY_METRICAS).fetchall()
+
+        totais = {'total_pneus': 0, 'disponiveis': 0, 'em_uso': 0, 'km_total': 0.0,
+                  'total_sets': 0, 'sets_ativos': 0, 'total_pistas': 0,
+                  'total_outings': 0, 'km_outings': 0.0}
+        tipos = {}
+
+        for origem, chave, subchave, quantidade, km in linhas:
+            quantidade = safe_int(quantidade)
+            km = safe_float(km, 0)
+            if origem == 'pneus':
+                totais['total_pneus'] += quantidade
+                totais['km_total'] += km
+                if subchave == 'disponivel':
+                    totais['disponiveis'] += quantidade
+                elif subchave == 'em_uso':
+                    totais['em_uso'] += quantidade
+                qtd_tipo, km_tipo = tipos.get(chave, (0, 0.0))
+                tipos[chave] = (qtd_tipo + quantidade, km_tipo + km)
+            elif origem == 'sets':
+                totais['total_sets'] += quantidade
+                if chave == 'ativo':
+                    totais['sets_ativos'] += quantidade
+            elif origem == 'pistas':
+                totais['total_pistas'] = quantidade
+            elif origem == 'outings':
+                totais['total_outings'] = quantidade
+                totais['km_outings'] = km
+
+        por_tipo = tuple(
+            (str(tipo), qtd, km / qtd if qtd else 0.0)
+            for tipo, (qtd, km) in sorted(tipos.items(), key=lambda item: str(item[0]))
+        )
+        return MetricasDashboard(por_tipo=por_tipo, **totais)
+
+    @staticmethod
+    def obter_metricas():
+        """Retorna o snapshot em cache até a próxima escrita nas tabelas envolvidas"""
+        return get_pool().obter_em_cache('metricas', ('pneus', 'sets', 'pistas', 'outings'),
+                                      MetricasManager.calcular_metricas)
+
+# Diagnóstico do planejador de consultas
+class DiagnosticoManager:
+    @staticmethod
+    def consultas_auditadas():
+        """Consultas dos managers com parâmetros de exemplo para EXPLAIN QUERY PLAN"""
+        return {
+            'PneuManager.listar_pneus_disponiveis': (PneuManager.QUERY_DISPONIVEIS, ()),
+            'PneuManager.listar_todos_pneus': (PneuManager.QUERY_TODOS, ()),
+            'SetManager.listar_sets_ativos': (SetManager.QUERY_ATIVOS, ()),
+            'OutingManager.listar_outings': (OutingManager.QUERY_LISTAR, ()),
+            'OutingManager.consultar_outings (pista)': (
+                OutingManager.sql_consulta_outings({'pista_id': 'INT'})[0], ('INT', 50, 0)),
+            'OutingManager.consultar_outings (agregados por set)': (
+                OutingManager.sql_consulta_outings({'set_id': 'S001'})[1], ('S001',)),
+            'OutingManager.historico_pneu': (OutingManager.QUERY_HISTORICO_PNEU, ('P001',)),
+            'OutingManager.recalcular_km_todos_pneus': (OutingManager.QUERY_HISTORICO_COMPLETO, ()),
+            'MetricasManager.calcular_metricas': (MetricasManager.QUERY_METRICAS, ()),
+            'ResumoUsoManager.resumo_pneu': (ResumoUsoManager.QUERY_RESUMO_PNEU, ('P001',)),
+        }
+
+    @staticmethod
+    def auditar_planos():
+        """Executa EXPLAIN QUERY PLAN em cada consulta e sinaliza varreduras completas"""
+        linhas = []
+        with conexao() as conn:
+            for nome, (query, params) in DiagnosticoManager.consultas_auditadas().items():
+                for _, _, _, detalhe in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall():
+                    # "SCAN tabela" sem índice = leitura da tabela inteira
+                    varredura = detalhe.startswith('SCAN') and 'USING' not in detalhe
+                    ordenacao = 'TEMP B-TREE' in detalhe
+                    linhas.append({
+                        'consulta': nome,
+                        'plano': detalhe,
+                        'varredura_completa': varredura,
+                        'ordenacao_temporaria': ordenacao,
+                    })
+        return pd.DataFrame(linhas, columns=['consulta', 'plano', 'varredura_completa', 'ordenacao_temporaria'])
+
+# Snapshot colunar (Arrow) do banco para análises
+class SnapshotManager:
+    # Ao lado do banco, e não no diretório de onde o app foi iniciado
+    PASTA = os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), 'snapshot_motorsport')
+    TABELAS = ('pneus', 'pistas', 'sets', 'outings', 'historico_pneus', 'resumo_uso_pneus')
+
+    @staticmethod
+    def atualizar():
+        """Regrava o snapshot só se o arquivo do banco mudou desde o último; retorna o manifesto"""
+        return snapshot_sqlite(DB_PATH, SnapshotManager.PASTA, SnapshotManager.TABELAS)
+
+    @staticmethod
+    def carregar(tabela, colunas=None):
+        """Colunas de uma tabela, lidas do snapshot atualizado (memory-map)"""
+        SnapshotManager.atualizar()
+        return ler_snapshot(SnapshotManager.PASTA, tabela, colunas)
+
+    @staticmethod
+    def desgaste_por_pista():
+        """Desgaste da temporada inteira por pista (linhas) e posição (colunas), com as voltas de cada pista"""
+        historico = SnapshotManager.carregar('historico_pneus', ['outing_id', 'posicao', 'desgaste'])
+        outings = SnapshotManager.carregar('outings', ['id', 'pista_id', 'voltas'])
+        pistas = SnapshotManager.carregar('pistas', ['id', 'nome'])
+        if historico.empty:
+            return pd.DataFrame(columns=['pista', *DesgasteManager.POSICOES, 'total', 'voltas'])
+
+        nomes = outings['pista_id'].map(pistas.set_index('id')['nome']).fillna(outings['pista_id'])
+        pista_outing = pd.Series(nomes.values, index=outings['id'])
+        historico['pista'] = historico['outing_id'].map(pista_outing)
+        tabela = historico.pivot_table(index='pista', columns='posicao', values='desgaste', aggfunc='sum', fill_value=0.0)
+        tabela = tabela.reindex(columns=list(DesgasteManager.POSICOES), fill_value=0.0)
+        tabela['total'] = tabela.sum(axis=1)
+        tabela['voltas'] = outings.assign(pista=nomes.values).groupby('pista')['voltas'].sum().reindex(tabela.index)
+        return tabela.sort_values('total', ascending=False).reset_index().rename_axis(columns=None)
 
 # Funções auxiliares (CORRIGIDAS)
 def format_status_html(status, percentual):
@@ -703,47 +1664,49 @@ def format_status_html(status, percentual):
 
 def gerar_proximo_id(tabela):
     """Gera o próximo ID disponível para uma tabela"""
-    conn = get_database_connection()
-    cursor = conn.cursor()
+    with conexao() as conn:
+        cursor = conn.cursor()
     
-    try:
-        if tabela == 'pneus':
-            cursor.execute("SELECT id FROM pneus ORDER BY CAST(SUBSTR(id, 2) AS INTEGER) DESC LIMIT 1")
-            result = cursor.fetchone()
-            if result:
-                try:
-                    ultimo_num = int(result[0][1:])  # Remove 'P' e converte para int
-                    return f"P{ultimo_num + 1:03d}"
-                except (ValueError, IndexError):
-                    pass
-            return "P001"
+        try:
+            if tabela == 'pneus':
+                cursor.execute("SELECT id FROM pneus ORDER BY CAST(SUBSTR(id, 2) AS INTEGER) DESC LIMIT 1")
+                result = cursor.fetchone()
+                if result:
+                    try:
+                        ultimo_num = int(result[0][1:])  # Remove 'P' e converte para int
+                        return f"P{ultimo_num + 1:03d}"
+                    except (ValueError, IndexError):
+                        pass
+                return "P001"
         
-        elif tabela == 'sets':
-            cursor.execute("SELECT id FROM sets ORDER BY CAST(SUBSTR(id, 2) AS INTEGER) DESC LIMIT 1")
-            result = cursor.fetchone()
-            if result:
-                try:
-                    ultimo_num = int(result[0][1:])  # Remove 'S' e converte para int
-                    return f"S{ultimo_num + 1:03d}"
-                except (ValueError, IndexError):
-                    pass
-            return "S001"
+            elif tabela == 'sets':
+                cursor.execute("SELECT id FROM sets ORDER BY CAST(SUBSTR(id, 2) AS INTEGER) DESC LIMIT 1")
+                result = cursor.fetchone()
+                if result:
+                    try:
+                        ultimo_num = int(result[0][1:])  # Remove 'S' e converte para int
+                        return f"S{ultimo_num + 1:03d}"
+                    except (ValueError, IndexError):
+                        pass
+                return "S001"
         
-        elif tabela == 'pistas':
-            cursor.execute("SELECT COUNT(*) FROM pistas")
-            count = cursor.fetchone()[0]
-            return f"T{count + 1:03d}"
+            elif tabela == 'pistas':
+                cursor.execute("SELECT COUNT(*) FROM pistas")
+                count = cursor.fetchone()[0]
+                return f"T{count + 1:03d}"
         
-        return "P001"  # Default fallback
-    except Exception:
-        return "P001"  # Fallback em caso de erro
-    finally:
-        conn.close()
+            return "P001"  # Default fallback
+        except Exception:
+            return "P001"  # Fallback em caso de erro
 
 # Interface Streamlit (ATUALIZADA COM PÁGINA INICIAL)
 def main():
-    # Inicializar banco de dados
-    init_database()
+    # Inicializar banco de dados (executa de fato só na primeira vez do processo)
+    try:
+        status_sistema = bootstrap()
+    except Exception as e:
+        st.error(f"❌ Erro ao inicializar o banco de dados: {str(e)}")
+        st.stop()
     
     # Sidebar com navegação
     st.sidebar.title("🏁 Motorsport Tire Control")
@@ -761,13 +1724,9 @@ def main():
         ]
     )
     
-    # Status da conexão
-    try:
-        conn = get_database_connection()
-        conn.close()
-        st.sidebar.success("🟢 Sistema Online")
-    except Exception:
-        st.sidebar.error("🔴 Erro na Conexão")
+    # Status do sistema (resultado do bootstrap, sem consultar o banco)
+    st.sidebar.success("🟢 Sistema Online")
+    st.sidebar.caption(f"Esquema v{status_sistema.versao_esquema} • iniciado às {status_sistema.iniciado_em:%H:%M:%S}")
     
     # Executar função baseada no menu
     try:
@@ -800,16 +1759,13 @@ def pagina_inicial():
     
     # Métricas principais em cards grandes
     try:
-        with get_database_connection() as conn:
-            total_pneus = pd.read_sql_query("SELECT COUNT(*) as count FROM pneus", conn).iloc[0]['count']
-            disponiveis = pd.read_sql_query("SELECT COUNT(*) as count FROM pneus WHERE status = 'disponivel'", conn).iloc[0]['count']
-            em_uso = pd.read_sql_query("SELECT COUNT(*) as count FROM pneus WHERE status = 'em_uso'", conn).iloc[0]['count']
-            sets_ativos = pd.read_sql_query("SELECT COUNT(*) as count FROM sets WHERE status = 'ativo'", conn).iloc[0]['count']
-            total_outings = pd.read_sql_query("SELECT COUNT(*) as count FROM outings", conn).iloc[0]['count']
-            
-            # KM total rodado
-            km_total = pd.read_sql_query("SELECT SUM(km_atual) as total FROM pneus", conn).iloc[0]['total']
-            km_total = safe_float(km_total, 0)
+        metricas = MetricasManager.obter_metricas()
+        total_pneus = metricas.total_pneus
+        disponiveis = metricas.disponiveis
+        em_uso = metricas.em_uso
+        sets_ativos = metricas.sets_ativos
+        total_outings = metricas.total_outings
+        km_total = metricas.km_total
         
         # Métricas em grid 3x2
         col1, col2, col3 = st.columns(3)
@@ -842,40 +1798,31 @@ def pagina_inicial():
         st.subheader("⚠️ Pneus que Precisam de Atenção")
         
         try:
-            pneus_df = PneuManager.listar_todos_pneus()
+            pneus_df = PneuManager.listar_status_pneus()
             
             if not pneus_df.empty:
-                pneus_criticos = []
-                for _, pneu in pneus_df.iterrows():
-                    pneu_data = [pneu['id'], pneu['tipo'], pneu['data_cadastro'], pneu['limite_km'], pneu['km_atual'], pneu['status']]
-                    status, percentual = PneuManager.calcular_status_pneu(pneu_data)
-                    
-                    if status in ['yellow', 'red']:  # Apenas pneus que precisam atenção
-                        pneus_criticos.append({
-                            'id': pneu['id'],
-                            'tipo': str(pneu['tipo']).upper(),
-                            'percentual': percentual,
-                            'status': status,
-                            'km_atual': safe_float(pneu['km_atual'], 0),
-                            'limite': safe_float(pneu['limite_km'], 1000)
-                        })
+                pneus_criticos = PneuManager.pneus_criticos(pneus_df)
                 
-                if pneus_criticos:
-                    for pneu in pneus_criticos[:5]:  # Mostrar apenas os 5 primeiros
-                        if pneu['status'] == 'red':
+                if not pneus_criticos.empty:
+                    # Mostrar apenas os 5 mais gastos
+                    for pneu in pneus_criticos.head(5).to_dict('records'):
+                        tipo = str(pneu['tipo']).upper()
+                        if pneu['status_desgaste'] == 'red':
                             st.markdown(f"""
                             <div class="pneu-card pneu-card-red">
-                                <strong>🔴 {pneu['id']} ({pneu['tipo']})</strong><br>
-                                <small>{pneu['km_atual']:.0f}/{pneu['limite']:.0f}km - {pneu['percentual']:.0f}% - TROCAR AGORA</small>
+                                <strong>🔴 {pneu['id']} ({tipo})</strong><br>
+                                <small>{pneu['km_atual']:.0f}km • desgaste {pneu['desgaste_atual']:.0f}/{pneu['limite_km']:.0f} - {pneu['percentual']:.0f}% - TROCAR AGORA</small>
                             </div>
                             """, unsafe_allow_html=True)
                         else:
                             st.markdown(f"""
                             <div class="pneu-card pneu-card-yellow">
-                                <strong>🟡 {pneu['id']} ({pneu['tipo']})</strong><br>
-                                <small>{pneu['km_atual']:.0f}/{pneu['limite']:.0f}km - {pneu['percentual']:.0f}% - Monitorar</small>
+                                <strong>🟡 {pneu['id']} ({tipo})</strong><br>
+                                <small>{pneu['km_atual']:.0f}km • desgaste {pneu['desgaste_atual']:.0f}/{pneu['limite_km']:.0f} - {pneu['percentual']:.0f}% - Monitorar</small>
                             </div>
                             """, unsafe_allow_html=True)
+                    if len(pneus_criticos) > 5:
+                        st.caption(f"+ {len(pneus_criticos) - 5} pneu(s) em atenção — veja Histórico & Análises")
                 else:
                     st.success("🎉 Todos os pneus estão em bom estado!")
             else:
@@ -913,6 +1860,105 @@ def pagina_inicial():
         
         st.markdown('</div>', unsafe_allow_html=True)
     
+    # Previsão de vida útil para a próxima pista
+    st.markdown("---")
+    st.subheader("🔮 Vida Útil na Próxima Pista")
+    
+    try:
+        pistas_df = PistaManager.listar_pistas()
+        
+        if not pistas_df.empty:
+            nomes_pistas = dict(zip(pistas_df['id'], pistas_df['nome']))
+            col1, col2 = st.columns(2)
+            with col1:
+                proxima_pista = st.selectbox("🏁 Próxima pista", list(nomes_pistas), format_func=nomes_pistas.get)
+            with col2:
+                condicao_prevista = st.selectbox("🌤️ Condição prevista", CONDICOES)
+            
+            previsao_sets = PrevisaoManager.prever_sets(proxima_pista, condicao_prevista)
+            if not previsao_sets.empty:
+                sets_display = previsao_sets.copy()
+                sets_display.columns = ['Set', 'Nome', 'Voltas até 🟡', 'Voltas até 🔴', 'Pneu Limitante']
+                st.dataframe(sets_display, use_container_width=True, hide_index=True)
+            
+            previsao_pneus = PrevisaoManager.prever_pneus(proxima_pista, condicao_prevista)
+            with st.expander(f"🏎️ Todos os pneus ({len(previsao_pneus)})"):
+                pneus_display = previsao_pneus[['pneu_id', 'tipo', 'status', 'posicao_prevista', 'desgaste_atual',
+                                                'limite_km', 'voltas_ate_amarelo', 'voltas_ate_vermelho']].copy()
+                pneus_display['desgaste_atual'] = pneus_display['desgaste_atual'].round(1)
+                pneus_display.columns = ['Pneu', 'Tipo', 'Status', 'Posição', 'Desgaste', 'Limite',
+                                         'Voltas até 🟡', 'Voltas até 🔴']
+                st.dataframe(pneus_display, use_container_width=True, hide_index=True)
+        else:
+            st.info("ℹ️ Cadastre pistas e pneus para ver a previsão.")
+    except Exception as e:
+        st.error(f"Erro ao calcular previsão: {str(e)}")
+
+    # Simulação Monte Carlo do fim de semana
+    st.markdown("---")
+    st.subheader("🎲 Simulação do Fim de Semana")
+
+    try:
+        pistas_df = PistaManager.listar_pistas()
+
+        if not pistas_df.empty:
+            nomes_pistas = dict(zip(pistas_df['id'], pistas_df['nome']))
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                pista_simulacao = st.selectbox("🏁 Pista do fim de semana", list(nomes_pistas),
+                                               format_func=nomes_pistas.get, key="pista_simulacao")
+            with col2:
+                sessoes_simulacao = st.multiselect("📋 Sessões (a última é a corrida)", TIPOS_SESSAO,
+                                                   default=list(SimulacaoManager.SESSOES_PADRAO))
+            with col3:
+                n_cenarios = st.select_slider("🎲 Cenários", options=[10_000, 50_000, 100_000, 200_000], value=100_000)
+
+            voltas_historico, frequencia = SimulacaoManager.historico_sessoes(pista_simulacao)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                prob_molhado = st.slider("🌧️ Chance de pista molhada (%)", 0, 100, int(round(frequencia['molhado'] * 100)))
+            with col2:
+                prob_misto = st.slider("🌦️ Chance de pista mista (%)", 0, 100 - prob_molhado,
+                                       min(int(round(frequencia['misto'] * 100)), 100 - prob_molhado))
+            with col3:
+                # Variação estimada das medições; o slider só aparece para sobrescrevê-la
+                cv_historico = SimulacaoManager.cv_desgaste_historico()
+                if st.checkbox("📊 Ajustar variação do desgaste", key="ajustar_cv_desgaste",
+                               help=f"Sem ajuste, usa a variação das medições de profundidade ({cv_historico:.0%})"):
+                    cv_desgaste = st.slider("📊 Variação do desgaste (%)", 0, 50,
+                                            min(int(round(cv_historico * 100)), 50)) / 100
+                else:
+                    cv_desgaste = None
+                    st.caption(f"📊 Variação do desgaste das medições: {cv_historico:.0%}")
+
+            st.caption("Voltas sorteadas do histórico de cada sessão: " + " • ".join(
+                f"{tipo}: {voltas_historico[tipo].min():.0f}-{voltas_historico[tipo].max():.0f}"
+                for tipo in sessoes_simulacao))
+
+            if st.button("🎲 Simular Fim de Semana", use_container_width=True):
+                prob_condicao = {'molhado': prob_molhado / 100, 'misto': prob_misto / 100,
+                                 'seco': (100 - prob_molhado - prob_misto) / 100}
+                inicio = datetime.now()
+                simulacao = SimulacaoManager.simular_sets(pista_simulacao, sessoes_simulacao, prob_condicao,
+                                                          cv_desgaste, n_cenarios)
+                duracao = (datetime.now() - inicio).total_seconds()
+
+                if simulacao.empty:
+                    st.info("ℹ️ Monte sets e escolha ao menos uma sessão para simular.")
+                else:
+                    simulacao_display = simulacao.copy()
+                    for coluna in ('prob_vermelho', 'prob_vermelho_antes_corrida', 'uso_mediano', 'uso_p90'):
+                        simulacao_display[coluna] = (simulacao_display[coluna] * 100).round(1)
+                    simulacao_display.columns = ['Set', 'Nome', 'P(🔴 até o fim) %', 'P(🔴 antes da corrida) %',
+                                                 'Uso Mediano %', 'Uso P90 %', 'Pneu Mais Arriscado']
+                    st.dataframe(simulacao_display, use_container_width=True, hide_index=True)
+                    st.caption(f"{n_cenarios:,} cenários em {duracao:.2f}s • uso = % do limite vermelho "
+                               f"({PneuManager.LIMITE_AMARELO}% do limite km) no pneu mais gasto do set")
+        else:
+            st.info("ℹ️ Cadastre pistas e monte sets para simular.")
+    except Exception as e:
+        st.error(f"Erro na simulação: {str(e)}")
+    
     # Seção de Ações Rápidas
        
      
@@ -986,17 +2032,16 @@ def cadastrar_pneu():
     st.subheader("🏎️ Pneus Cadastrados")
     
     try:
-        pneus_df = PneuManager.listar_todos_pneus()
+        pneus_df = PneuManager.listar_status_pneus()
         if not pneus_df.empty:
-            # Preparar dados para exibição com conversão segura
+            # Preparar dados para exibição (já convertidos pelo classificador)
             pneus_display = pneus_df.copy()
-            pneus_display['km_atual'] = pneus_display['km_atual'].apply(lambda x: safe_float(x, 0))
-            pneus_display['limite_km'] = pneus_display['limite_km'].apply(lambda x: safe_float(x, 1000))
-            pneus_display['percentual_uso'] = ((pneus_display['km_atual'] / pneus_display['limite_km']) * 100).round(1)
+            pneus_display['desgaste_atual'] = pneus_display['desgaste_atual'].round(1)
+            pneus_display['percentual_uso'] = pneus_display['percentual'].round(1)
             
             # Selecionar colunas para exibir
-            colunas_display = pneus_display[['id', 'tipo', 'km_atual', 'limite_km', 'percentual_uso', 'status']].copy()
-            colunas_display.columns = ['ID', 'Tipo', 'KM Atual', 'Limite KM', 'Uso (%)', 'Status']
+            colunas_display = pneus_display[['id', 'tipo', 'km_atual', 'desgaste_atual', 'limite_km', 'percentual_uso', 'status']].copy()
+            colunas_display.columns = ['ID', 'Tipo', 'KM Atual', 'Desgaste', 'Limite KM', 'Uso (%)', 'Status']
             
             st.dataframe(colunas_display, use_container_width=True)
             
@@ -1085,6 +2130,63 @@ def cadastrar_pista():
 def montar_set():
     st.title("🔧 Montar Novo Set")
     
+    # Sugestão automática (problema de atribuição pneus x posições)
+    with st.expander("🧠 Sugestão Automática de Sets", expanded=False):
+        try:
+            pistas_df = PistaManager.listar_pistas()
+            nomes_pistas = dict(zip(pistas_df['id'], pistas_df['nome']))
+            
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                pista_sugestao = st.selectbox("🏁 Pista", list(nomes_pistas), format_func=nomes_pistas.get,
+                                              key="sugestao_pista")
+            with col2:
+                condicao_sugestao = st.selectbox("🌤️ Condição", CONDICOES, key="sugestao_condicao")
+            with col3:
+                tipo_sugestao = st.selectbox("🏷️ Tipo", ["normal", "chuva"], key="sugestao_tipo")
+            with col4:
+                voltas_sugestao = st.number_input("🔄 Voltas do stint", min_value=1, value=30, key="sugestao_voltas")
+            with col5:
+                quantidade_sugestao = st.number_input("📦 Sets", min_value=1, max_value=20, value=1,
+                                                      key="sugestao_quantidade")
+            
+            if st.button("🧠 Sugerir Montagem", use_container_width=True):
+                st.session_state.sugestao_sets = SetManager.sugerir_sets(
+                    pista_sugestao, condicao_sugestao, voltas_sugestao, quantidade_sugestao, tipo_sugestao)
+                st.session_state.sugestao_sets_tipo = tipo_sugestao
+            
+            sugestao = st.session_state.get('sugestao_sets')
+            if sugestao is not None:
+                if sugestao['pneu_id'].isna().all():
+                    st.warning(f"⚠️ Nenhum pneu disponível do tipo {st.session_state.sugestao_sets_tipo}")
+                else:
+                    tabela = sugestao.assign(
+                        pneu=sugestao['pneu_id'].fillna('—') + " (" + sugestao['percentual_final'].round(0).fillna(0).astype(int).astype(str) + "%)"
+                    ).pivot(index='set', columns='posicao', values='pneu')[list(DesgasteManager.POSICOES)]
+                    st.caption("Pneu por posição e % do limite ao fim do stint")
+                    st.dataframe(tabela, use_container_width=True)
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("📝 Preencher formulário com o Set 1", use_container_width=True):
+                            primeiro = sugestao[sugestao['set'] == 1]
+                            st.session_state.preencher_set = dict(zip(primeiro['posicao'], primeiro['pneu_id']))
+                            st.rerun()
+                    with col2:
+                        if st.button("✅ Montar Todos os Sets Sugeridos", use_container_width=True, type="primary"):
+                            criados = SetManager.montar_sets_sugeridos(
+                                sugestao, f"Set {nomes_pistas.get(pista_sugestao, '')}".strip(),
+                                st.session_state.sugestao_sets_tipo, "Montado pela sugestão automática")
+                            st.session_state.sugestao_sets = None
+                            if criados:
+                                st.success(f"✅ Sets montados: {', '.join(criados)}")
+                            else:
+                                st.warning("⚠️ Nenhum set completo (4 pneus) na sugestão")
+        except Exception as e:
+            st.error(f"Erro na sugestão automática: {str(e)}")
+    
+    preencher = st.session_state.get('preencher_set') or {}
+    
     with st.form("form_montar_set", clear_on_submit=True):
         col1, col2 = st.columns(2)
         
@@ -1117,6 +2219,12 @@ def montar_set():
                 
                 ids_pneus = [""] + pneus_disponiveis['id'].tolist()
                 
+                # Posição -> índice pré-selecionado (sugestão automática)
+                indices_preenchidos = {
+                    posicao: ids_pneus.index(pneu_id)
+                    for posicao, pneu_id in preencher.items() if pneu_id in ids_pneus
+                }
+                
                 st.success(f"✅ Todos os pneus ({len(pneus_disponiveis)}) estão disponíveis para seleção")
                 
             except Exception as e:
@@ -1127,19 +2235,23 @@ def montar_set():
         col_de, col_dd, col_te, col_td = st.columns(4)
         
         with col_de:
-            pneu_de_idx = st.selectbox("🔵 DE", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x])
+            pneu_de_idx = st.selectbox("🔵 DE", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x],
+                                       index=indices_preenchidos.get('DE', 0))
             pneu_de = ids_pneus[pneu_de_idx] if pneu_de_idx > 0 else None
         
         with col_dd:
-            pneu_dd_idx = st.selectbox("🔴 DD", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x])
+            pneu_dd_idx = st.selectbox("🔴 DD", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x],
+                                       index=indices_preenchidos.get('DD', 0))
             pneu_dd = ids_pneus[pneu_dd_idx] if pneu_dd_idx > 0 else None
         
         with col_te:
-            pneu_te_idx = st.selectbox("🟢 TE", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x])
+            pneu_te_idx = st.selectbox("🟢 TE", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x],
+                                       index=indices_preenchidos.get('TE', 0))
             pneu_te = ids_pneus[pneu_te_idx] if pneu_te_idx > 0 else None
         
         with col_td:
-            pneu_td_idx = st.selectbox("🟡 TD", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x])
+            pneu_td_idx = st.selectbox("🟡 TD", range(len(opcoes_pneus)), format_func=lambda x: opcoes_pneus[x],
+                                       index=indices_preenchidos.get('TD', 0))
             pneu_td = ids_pneus[pneu_td_idx] if pneu_td_idx > 0 else None
         
         # CORRIGIDO
@@ -1160,6 +2272,7 @@ def montar_set():
                         try:
                             sucesso = SetManager.criar_set(id_set, nome_set, tipo_set, pneu_de, pneu_dd, pneu_te, pneu_td, observacoes_set)
                             if sucesso:
+                                st.session_state.preencher_set = None
                                 st.success(f"✅ Set {id_set} montado com sucesso!")
                                 st.balloons()
                                 st.rerun()
@@ -1276,11 +2389,11 @@ def registrar_outing():
         # Configurações da sessão
         col3, col4 = st.columns(2)
         with col3:
-            tipos = ["treino", "corrida", "classificacao", "warmup", "teste"]
+            tipos = TIPOS_SESSAO
             tipo_default_idx = 0 if not outing_data else tipos.index(outing_data[4]) if outing_data[4] in tipos else 0
             tipo_sessao = st.selectbox("📋 Tipo", tipos, index=tipo_default_idx)
             
-            condicoes = ["seco", "molhado", "misto"]
+            condicoes = CONDICOES
             condicao_default_idx = 0 if not outing_data else condicoes.index(outing_data[5]) if outing_data[5] in condicoes else 0
             condicao = st.selectbox("🌤️ Condição", condicoes, index=condicao_default_idx)
         
@@ -1345,6 +2458,36 @@ def registrar_outing():
                 except Exception as e:
                     st.error(f"❌ Erro: {str(e)}")
     
+    # IMPORTAÇÃO EM MASSA (export do sistema de cronometragem)
+    with st.expander("📥 Importar Outings (CSV/Excel da cronometragem)"):
+        arquivo = st.file_uploader("Arquivo de outings", type=['csv', 'xlsx'], key="arquivo_outings")
+        
+        if arquivo is not None:
+            try:
+                arquivo_df = OutingManager.ler_arquivo_importacao(arquivo, arquivo.name)
+                st.caption(f"{len(arquivo_df)} linhas lidas • colunas: {', '.join(arquivo_df.columns)}")
+                
+                # Mapear colunas do arquivo para os campos do outing
+                opcoes_colunas = ["(não usar)"] + list(arquivo_df.columns)
+                mapeamento = {}
+                cols_map = st.columns(4)
+                for i, campo in enumerate(CAMPOS_IMPORTACAO):
+                    padrao = opcoes_colunas.index(campo) if campo in opcoes_colunas else 0
+                    escolhida = cols_map[i % 4].selectbox(campo, opcoes_colunas, index=padrao, key=f"map_{campo}")
+                    if escolhida != "(não usar)":
+                        mapeamento[campo] = escolhida
+                
+                if st.button("📥 Importar Outings", type="primary", use_container_width=True):
+                    with st.spinner("Validando e importando..."):
+                        resultado = OutingManager.importar_outings(arquivo_df, mapeamento)
+                    
+                    st.success(f"✅ {resultado.importados} de {resultado.total_linhas} outings importados em {resultado.lotes} lote(s)")
+                    if not resultado.erros.empty:
+                        st.warning(f"⚠️ {resultado.erros['linha'].nunique()} linha(s) com erro não foram importadas")
+                        st.dataframe(resultado.erros, use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Erro ao ler arquivo: {str(e)}")
+    
     # TABELA DE OUTINGS EXISTENTES
     st.markdown("---")
     st.subheader("📋 Outings Registrados")
@@ -1364,7 +2507,7 @@ def registrar_outing():
             # Seção de ações
             st.markdown("### 🔧 Ações")
             
-            col_actions1, col_actions2, col_actions3 = st.columns(3)
+            col_actions1, col_actions2 = st.columns(2)
             
             with col_actions1:
                 st.markdown("**✏️ Editar Outing**")
@@ -1400,19 +2543,6 @@ def registrar_outing():
                             st.session_state.outing_para_excluir = outing_ids[selected_delete_idx]
                             st.rerun()
             
-            with col_actions3:
-                st.markdown("**🔄 Recalcular KM**")
-                st.info("Corrige KM dos pneus baseado no histórico")
-                
-                if st.button("🔄 Recalcular Todos", use_container_width=True, type="secondary"):
-                    with st.spinner("Recalculando KM de todos os pneus..."):
-                        sucesso = OutingManager.recalcular_km_todos_pneus()
-                        if sucesso:
-                            st.success("✅ KM de todos os pneus recalculado!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Erro ao recalcular KM!")
-            
             # Modal de confirmação de exclusão
             if st.session_state.get('confirmar_exclusao', False):
                 st.markdown("---")
@@ -1463,69 +2593,72 @@ def mostrar_historico():
     
     # Estatísticas gerais no topo
     try:
-        with get_database_connection() as conn:
-            total_pneus = pd.read_sql_query("SELECT COUNT(*) as count FROM pneus", conn).iloc[0]['count']
-            disponiveis = pd.read_sql_query("SELECT COUNT(*) as count FROM pneus WHERE status = 'disponivel'", conn).iloc[0]['count']
-            em_uso = pd.read_sql_query("SELECT COUNT(*) as count FROM pneus WHERE status = 'em_uso'", conn).iloc[0]['count']
-            sets_ativos = pd.read_sql_query("SELECT COUNT(*) as count FROM sets WHERE status = 'ativo'", conn).iloc[0]['count']
-            total_outings = pd.read_sql_query("SELECT COUNT(*) as count FROM outings", conn).iloc[0]['count']
+        metricas = MetricasManager.obter_metricas()
         
         col1, col2, col3, col4, col5 = st.columns(5)
-        col1.metric("🏎️ Pneus", total_pneus)
-        col2.metric("✅ Disponíveis", disponiveis)
-        col3.metric("🔧 Em Uso", em_uso)
-        col4.metric("📦 Sets Ativos", sets_ativos)
-        col5.metric("📝 Outings", total_outings)
+        col1.metric("🏎️ Pneus", metricas.total_pneus)
+        col2.metric("✅ Disponíveis", metricas.disponiveis)
+        col3.metric("🔧 Em Uso", metricas.em_uso)
+        col4.metric("📦 Sets Ativos", metricas.sets_ativos)
+        col5.metric("📝 Outings", metricas.total_outings)
     except Exception as e:
         st.error(f"Erro ao carregar métricas: {str(e)}")
     
     st.markdown("---")
     
-    # Duas abas: Outings e Pneus (COM análise detalhada de volta)
-    tab1, tab2 = st.tabs(["📝 Outings", "🏎️ Pneus"])
+    # Abas: Outings, Pneus (COM análise detalhada de volta) e a temporada inteira (snapshot colunar)
+    tab1, tab2, tab3 = st.tabs(["📝 Outings", "🏎️ Pneus", "📊 Temporada"])
     
     with tab1:
         st.subheader("📝 Histórico de Outings")
         try:
-            outings_df = OutingManager.listar_outings()
+            pistas_opcoes, sets_opcoes, tipos_opcoes = OutingManager.opcoes_filtro_outings()
             
-            if not outings_df.empty:
-                # Filtros
+            if not pistas_opcoes.empty:
+                nomes_pistas = dict(zip(pistas_opcoes['id'], pistas_opcoes['nome']))
+                nomes_sets = dict(zip(sets_opcoes['id'], sets_opcoes['nome']))
+                
+                # Filtros (aplicados no banco)
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    filtro_pista = st.selectbox("🏁 Filtrar por Pista", 
-                                              ["Todas"] + outings_df['pista_nome'].unique().tolist())
+                    filtro_pista = st.selectbox("🏁 Filtrar por Pista", [""] + list(nomes_pistas),
+                                                format_func=lambda x: nomes_pistas.get(x, "Todas"))
                 with col2:
-                    filtro_set = st.selectbox("🔧 Filtrar por Set", 
-                                            ["Todos"] + outings_df['set_nome'].unique().tolist())
+                    filtro_set = st.selectbox("🔧 Filtrar por Set", [""] + list(nomes_sets),
+                                              format_func=lambda x: nomes_sets.get(x, "Todos"))
                 with col3:
-                    filtro_tipo = st.selectbox("📋 Filtrar por Tipo", 
-                                             ["Todos"] + outings_df['tipo_sessao'].unique().tolist())
+                    filtro_tipo = st.selectbox("📋 Filtrar por Tipo", [""] + tipos_opcoes,
+                                               format_func=lambda x: x or "Todos")
                 
-                # Aplicar filtros
-                df_filtrado = outings_df.copy()
-                if filtro_pista != "Todas":
-                    df_filtrado = df_filtrado[df_filtrado['pista_nome'] == filtro_pista]
-                if filtro_set != "Todos":
-                    df_filtrado = df_filtrado[df_filtrado['set_nome'] == filtro_set]
-                if filtro_tipo != "Todos":
-                    df_filtrado = df_filtrado[df_filtrado['tipo_sessao'] == filtro_tipo]
+                ordenacoes = {'recentes': "Mais recentes", 'antigos': "Mais antigos",
+                              'mais_km': "Mais KM", 'mais_voltas': "Mais voltas"}
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    ordenacao = st.selectbox("↕️ Ordenar por", list(ordenacoes), format_func=ordenacoes.get)
+                with col2:
+                    por_pagina = st.selectbox("📄 Outings por página", [25, 50, 100, 250], index=1)
+                with col3:
+                    pagina = st.number_input("Página", min_value=1, value=1, step=1)
+                
+                resultado = OutingManager.consultar_outings(
+                    {'pista_id': filtro_pista, 'set_id': filtro_set, 'tipo_sessao': filtro_tipo},
+                    ordenacao=ordenacao, pagina=pagina, por_pagina=por_pagina)
                 
-                # Formatação das colunas com conversão segura
-                if not df_filtrado.empty:
-                    outings_display = df_filtrado[['data', 'pista_nome', 'set_nome', 'tipo_sessao', 'condicao', 'voltas', 'km_calculado', 'observacoes']].copy()
+                if resultado.total > 0:
+                    outings_display = resultado.outings[['data', 'pista_nome', 'set_nome', 'tipo_sessao', 'condicao', 'voltas', 'km_calculado', 'observacoes']].copy()
                     outings_display.columns = ['Data', 'Pista', 'Set', 'Tipo', 'Condição', 'Voltas', 'KM', 'Observações']
-                    outings_display['KM'] = outings_display['KM'].apply(lambda x: safe_float(x, 0)).round(1)
+                    outings_display['KM'] = pd.to_numeric(outings_display['KM'], errors='coerce').fillna(0).round(1)
                     
                     st.dataframe(outings_display, use_container_width=True)
+                    st.caption(f"Página {resultado.pagina} de {resultado.total_paginas} • {resultado.total} outing(s)")
                     
-                    # Estatísticas dos filtros aplicados
+                    # Estatísticas dos filtros aplicados (calculadas no banco)
                     st.subheader("📊 Estatísticas dos Filtros")
                     col1, col2, col3, col4 = st.columns(4)
-                    col1.metric("Total Outings", len(df_filtrado))
-                    col2.metric("Total Voltas", safe_int(df_filtrado['voltas'].sum()))
-                    col3.metric("Total KM", f"{df_filtrado['km_calculado'].apply(lambda x: safe_float(x, 0)).sum():.1f}")
-                    col4.metric("KM Médio/Outing", f"{df_filtrado['km_calculado'].apply(lambda x: safe_float(x, 0)).mean():.1f}")
+                    col1.metric("Total Outings", resultado.total)
+                    col2.metric("Total Voltas", resultado.total_voltas)
+                    col3.metric("Total KM", f"{resultado.total_km:.1f}")
+                    col4.metric("KM Médio/Outing", f"{resultado.km_medio:.1f}")
                 else:
                     st.info("Nenhum outing encontrado com os filtros aplicados.")
             else:
@@ -1537,14 +2670,23 @@ def mostrar_historico():
         st.subheader("🏎️ Análise Detalhada de Pneus")
         
         try:
-            pneus_df = PneuManager.listar_todos_pneus()
+            pneus_df = PneuManager.listar_status_pneus()
             
             if not pneus_df.empty:
-                # Criar opções mais descritivas com conversão segura
-                opcoes_pneus = []
-                for _, row in pneus_df.iterrows():
-                    km_atual = safe_float(row['km_atual'], 0)
-                    opcoes_pneus.append(f"{row['id']} - {str(row['tipo']).upper()} ({row['status']}) - {km_atual:.0f}km")
+                # Criar opções mais descritivas (vetorizado)
+                icones = pneus_df['status_desgaste'].map({'green': '🟢', 'yellow': '🟡', 'red': '🔴'}).fillna('❓')
+                opcoes_pneus = (icones + " " + pneus_df['id'].astype(str) + " - " + pneus_df['tipo'].astype(str).str.upper()
+                                + " (" + pneus_df['status'].astype(str) + ") - "
+                                + pneus_df['km_atual'].round(0).astype(int).astype(str) + "km - "
+                                + pneus_df['percentual'].round(0).astype(int).astype(str) + "%").tolist()
+                
+                # Exportação do status de toda a frota
+                exportar_df = pneus_df[['id', 'tipo', 'status', 'km_atual', 'desgaste_atual', 'limite_km', 'percentual', 'status_desgaste']].copy()
+                exportar_df['percentual'] = exportar_df['percentual'].round(1)
+                st.download_button("⬇️ Exportar status dos pneus (CSV)",
+                                   exportar_df.to_csv(index=False).encode('utf-8'),
+                                   file_name=f"status_pneus_{date.today():%Y%m%d}.csv",
+                                   mime="text/csv")
                 
                 pneu_selecionado_idx = st.selectbox(
                     "Selecione um pneu para análise detalhada:",
@@ -1556,53 +2698,45 @@ def mostrar_historico():
                 
                 if pneu_selecionado:
                     # Dados do pneu
-                    pneu_data = PneuManager.get_pneu_by_id(pneu_selecionado)
+                    pneu_linha = pneus_df.iloc[pneu_selecionado_idx]
+                    km_atual = pneu_linha['km_atual']
+                    st.markdown(format_status_html(pneu_linha['status_desgaste'], pneu_linha['percentual']),
+                                unsafe_allow_html=True)
                                       
                     # Buscar histórico DETALHADO - DE VOLTA!
                     try:
-                        with get_database_connection() as conn:
-                            query = '''
-                                SELECT h.*, o.data, p.nome as pista_nome, o.voltas, o.tipo_sessao, o.condicao
-                                FROM historico_pneus h
-                                JOIN outings o ON h.outing_id = o.id
-                                JOIN pistas p ON o.pista_id = p.id
-                                WHERE h.pneu_id = ?
-                                ORDER BY o.data DESC, o.id DESC
-                            '''
-                            historico_df = pd.read_sql_query(query, conn, params=(pneu_selecionado,))
+                        historico_df = OutingManager.historico_pneu(pneu_selecionado)
                         
                         if not historico_df.empty:
                             # Tabela de histórico DETALHADO
                             st.subheader(f"📋 Timeline Detalhada do Pneu {pneu_selecionado}")
                             st.info("🎯 **Histórico completo**: onde foi usado, em qual posição, em qual pista")
                             
-                            historico_display = historico_df[['data', 'pista_nome', 'tipo_sessao', 'condicao', 'voltas', 'posicao', 'km_antes', 'km_depois']].copy()
-                            historico_display.columns = ['Data', 'Pista', 'Tipo Sessão', 'Condição', 'Voltas', 'Posição', 'KM Antes', 'KM Depois']
+                            historico_display = historico_df[['data', 'pista_nome', 'tipo_sessao', 'condicao', 'voltas', 'posicao', 'km_antes', 'km_depois', 'desgaste']].copy()
+                            historico_display.columns = ['Data', 'Pista', 'Tipo Sessão', 'Condição', 'Voltas', 'Posição', 'KM Antes', 'KM Depois', 'Desgaste']
                             
                             # Conversão segura para cálculo
                             historico_display['KM Antes'] = historico_display['KM Antes'].apply(lambda x: safe_float(x, 0))
                             historico_display['KM Depois'] = historico_display['KM Depois'].apply(lambda x: safe_float(x, 0))
                             historico_display['KM Ganho'] = historico_display['KM Depois'] - historico_display['KM Antes']
+                            historico_display['Desgaste'] = pd.to_numeric(historico_display['Desgaste'], errors='coerce').fillna(0).round(1)
                             
                             st.dataframe(historico_display, use_container_width=True)
                             
-                            # Estatísticas do pneu selecionado
+                            # Estatísticas do pneu selecionado (resumo mantido nas escritas)
                             st.subheader(f"📊 Estatísticas do Pneu {pneu_selecionado}")
+                            resumo = ResumoUsoManager.resumo_pneu(pneu_selecionado)
                             
                             col1, col2, col3, col4 = st.columns(4)
-                            col1.metric("📈 Total de Usos", len(historico_df))
-                            col2.metric("🏁 Total de Voltas", safe_int(historico_df['voltas'].sum()))
+                            col1.metric("📈 Total de Usos", resumo.usos)
+                            col2.metric("🏁 Total de Voltas", safe_int(resumo.voltas))
                             col3.metric("📏 KM Acumulado", f"{km_atual:.1f}")
-                            
-                            # Calcular pistas mais utilizadas
-                            pistas_mais_usadas = historico_df['pista_nome'].mode()
-                            pista_favorita = pistas_mais_usadas.iloc[0] if len(pistas_mais_usadas) > 0 else "N/A"
-                            col4.metric("🏁 Pista Mais Usada", pista_favorita)
+                            col4.metric("🏁 Pista Mais Usada", resumo.pista_mais_usada)
                             
                             # Distribuição por posição
-                            if len(historico_df) > 0:
+                            if resumo.usos > 0:
                                 st.subheader("🎯 Uso por Posição no Carro")
-                                posicoes_count = historico_df['posicao'].value_counts()
+                                posicoes_count = dict(resumo.por_posicao)
                                 
                                 col_pos1, col_pos2, col_pos3, col_pos4 = st.columns(4)
                                 col_pos1.metric("🔵 DE", posicoes_count.get('DE', 0))
@@ -1617,6 +2751,23 @@ def mostrar_historico():
                 st.info("ℹ️ Nenhum pneu cadastrado ainda.")
         except Exception as e:
             st.error(f"Erro ao carregar pneus: {str(e)}")
+    
+    with tab3:
+        st.subheader("📊 Desgaste da Temporada por Pista e Posição")
+        
+        try:
+            desgaste_df = SnapshotManager.desgaste_por_pista()
+            
+            if not desgaste_df.empty:
+                desgaste_display = desgaste_df.round(1)
+                desgaste_display.columns = ['Pista', *DesgasteManager.POSICOES, 'Total', 'Voltas']
+                st.dataframe(desgaste_display, use_container_width=True, hide_index=True)
+                st.caption("Desgaste efetivo (km equivalentes) somado em todos os outings, "
+                           "lido do snapshot colunar só com as colunas usadas")
+            else:
+                st.info("ℹ️ Nenhum outing registrado ainda.")
+        except Exception as e:
+            st.error(f"Erro ao carregar a temporada: {str(e)}")
 
 def configuracoes():
     st.title("⚙️ Configurações do Sistema")
@@ -1668,45 +2819,54 @@ def configuracoes():
         
         for categoria, limite in categorias.items():
             st.info(f"**{categoria}**: {limite}km")
+        
+        # Multiplicadores do modelo de desgaste (km -> km equivalentes)
+        st.markdown("### 🛞 Modelo de Desgaste")
+        st.caption(
+            "Nível da pista: " + " • ".join(f"{k} ×{v}" for k, v in DesgasteManager.FATOR_NIVEL.items())
+            + " | Condição: " + " • ".join(f"{k} ×{v}" for k, v in DesgasteManager.FATOR_CONDICAO.items())
+            + f" | Lado externo ao sentido ×{DesgasteManager.FATOR_LADO_EXTERNO}, interno ×{DesgasteManager.FATOR_LADO_INTERNO}"
+        )
     
     # Estatísticas do sistema
     st.markdown("---")
     st.subheader("📊 Estatísticas do Sistema")
     
     try:
-        with get_database_connection() as conn:
-            # Estatísticas gerais
-            col1, col2, col3, col4 = st.columns(4)
-            
-            total_pneus = pd.read_sql_query("SELECT COUNT(*) as count FROM pneus", conn).iloc[0]['count']
-            total_sets = pd.read_sql_query("SELECT COUNT(*) as count FROM sets", conn).iloc[0]['count']
-            total_pistas = pd.read_sql_query("SELECT COUNT(*) as count FROM pistas", conn).iloc[0]['count']
-            total_outings = pd.read_sql_query("SELECT COUNT(*) as count FROM outings", conn).iloc[0]['count']
-            
-            col1.metric("🏎️ Pneus", total_pneus)
-            col2.metric("🔧 Sets", total_sets)
-            col3.metric("🏁 Pistas", total_pistas)
-            col4.metric("📝 Outings", total_outings)
+        metricas = MetricasManager.obter_metricas()
+        
+        # Estatísticas gerais
+        col1, col2, col3, col4 = st.columns(4)
+        
+        col1.metric("🏎️ Pneus", metricas.total_pneus)
+        col2.metric("🔧 Sets", metricas.total_sets)
+        col3.metric("🏁 Pistas", metricas.total_pistas)
+        col4.metric("📝 Outings", metricas.total_outings)
+        
+        # Estatísticas por tipo
+        if metricas.total_pneus > 0:
+            st.subheader("📈 Distribuição de Pneus")
             
-            # Estatísticas por tipo
-            if total_pneus > 0:
-                st.subheader("📈 Distribuição de Pneus")
-                
-                stats_tipo = pd.read_sql_query("""
-                    SELECT tipo, COUNT(*) as quantidade, AVG(km_atual) as km_medio
-                    FROM pneus 
-                    GROUP BY tipo
-                """, conn)
-                
-                if not stats_tipo.empty:
-                    for _, row in stats_tipo.iterrows():
-                        km_medio = safe_float(row['km_medio'], 0)
-                        st.metric(f"Pneus {str(row['tipo']).upper()}", 
-                                 f"{row['quantidade']} unidades", 
-                                 delta=f"Média: {km_medio:.0f}km")
+            for tipo, quantidade, km_medio in metricas.por_tipo:
+                st.metric(f"Pneus {tipo.upper()}", 
+                         f"{quantidade} unidades", 
+                         delta=f"Média: {km_medio:.0f}km")
     except Exception as e:
         st.error(f"Erro ao carregar estatísticas: {str(e)}")
     
+    # Cache de leituras dos managers
+    st.markdown("---")
+    st.subheader("🧠 Cache de Leituras")
+    
+    stats_cache = get_pool().cache.estatisticas()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("✅ Acertos", stats_cache['acertos'])
+    col2.metric("❌ Falhas", stats_cache['falhas'])
+    col3.metric("🎯 Taxa de Acerto", f"{stats_cache['taxa_acerto']:.0f}%")
+    col4.metric("📦 Entradas", stats_cache['entradas'])
+    if stats_cache['geracoes']:
+        st.caption("Gerações por tabela: " + " • ".join(f"{t}: {g}" for t, g in sorted(stats_cache['geracoes'].items())))
+    
     # Ações do sistema
     st.markdown("---")
     st.subheader("🔧 Ações do Sistema")
@@ -1721,6 +2881,8 @@ def configuracoes():
     with col2:
         # CORRIGIDO
         if st.button("🧹 Limpar Cache", use_container_width=True):
+            # O pool sai do cache_resource: fechar as conexões dele antes
+            get_pool().descartar()
             st.cache_data.clear()
             st.cache_resource.clear()
             st.success("✅ Cache limpo!")
@@ -1729,16 +2891,72 @@ def configuracoes():
         # CORRIGIDO
         if st.button("📋 Status do Banco", use_container_width=True):
             try:
-                with get_database_connection() as conn:
+                with conexao() as conn:
                     cursor = conn.cursor()
                     cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
                     tabelas = cursor.fetchall()
                 
-                st.success(f"✅ Banco OK - {len(tabelas)} tabelas")
+                st.success(f"✅ Banco OK - {len(tabelas)} tabelas • esquema v{versao_banco()}/{VERSAO_ESQUEMA}")
                 for tabela in tabelas:
                     st.text(f"• {tabela[0]}")
+                
+                # Bootstrap deste processo do servidor
+                status_sistema = bootstrap()
+                migracoes = ', '.join(f"v{v}" for v in status_sistema.migracoes_aplicadas) or "nenhuma"
+                st.caption(f"Inicializado em {status_sistema.iniciado_em:%d/%m/%Y %H:%M:%S} "
+                           f"({status_sistema.duracao_ms:.0f} ms) • migrações aplicadas: {migracoes} • "
+                           f"pistas semeadas: {status_sistema.pistas_semeadas}")
             except Exception as e:
                 st.error(f"❌ Erro no banco: {str(e)}")
+    
+    # Consistência do resumo de uso dos pneus
+    st.markdown("---")
+    st.subheader("🧮 Resumo de Uso dos Pneus")
+    
+    if st.button("🧮 Verificar e Reconstruir Resumo de Uso", use_container_width=True):
+        try:
+            divergencias = ResumoUsoManager.verificar_consistencia(corrigir=True)
+            
+            if divergencias.empty:
+                st.success("✅ Resumo de uso consistente com o histórico")
+            else:
+                st.warning(f"⚠️ {len(divergencias)} linha(s) divergente(s) - resumo reconstruído a partir do histórico")
+                st.dataframe(divergencias, use_container_width=True)
+        except Exception as e:
+            st.error(f"❌ Erro na verificação: {str(e)}")
+    
+    # Snapshot colunar para análises fora do SQLite
+    st.markdown("---")
+    st.subheader("📸 Snapshot Colunar (Arrow)")
+    
+    if st.button("📸 Atualizar Snapshot", use_container_width=True):
+        try:
+            manifesto = SnapshotManager.atualizar()
+            st.success(f"✅ Snapshot de {manifesto['gerado_em']} em '{SnapshotManager.PASTA}/'")
+            st.dataframe(pd.DataFrame([
+                {'tabela': nome, 'linhas': info['linhas'], 'colunas': len(info['colunas'])}
+                for nome, info in manifesto['tabelas'].items()
+            ]), use_container_width=True)
+        except Exception as e:
+            st.error(f"❌ Erro no snapshot: {str(e)}")
+    
+    # Auditoria do plano de execução das consultas
+    st.markdown("---")
+    st.subheader("🩺 Diagnóstico de Consultas")
+    
+    if st.button("🩺 Auditar Consultas (EXPLAIN QUERY PLAN)", use_container_width=True):
+        try:
+            planos_df = DiagnosticoManager.auditar_planos()
+            varreduras = planos_df[planos_df['varredura_completa']]
+            
+            if varreduras.empty:
+                st.success("✅ Nenhuma varredura completa nas consultas dos managers")
+            else:
+                st.warning(f"⚠️ {varreduras['consulta'].nunique()} consulta(s) com varredura completa de tabela")
+            
+            st.dataframe(planos_df, use_container_width=True)
+        except Exception as e:
+            st.error(f"❌ Erro na auditoria: {str(e)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Montagem ótima de sets de pneus
+
+Cada vaga é uma posição (DE/DD/TE/TD) de um set a montar e cada pneu
+disponível ocupa no máximo uma vaga: um problema de atribuição, resolvido
+pelo algoritmo húngaro (O(vagas² x pneus)) em vez de enumerar combinações.
+Usado pelo motorsport_tires_v2_2.py e pelo app1.py.
+"""
+
+import numpy as np
+
+POSICOES = ('DE', 'DD', 'TE', 'TD')
+
+# Custo de um par proibido (tipo ou carro diferente)
+CUSTO_PROIBIDO = 1e9
+# Custo de deixar uma vaga vazia: alto, mas preferível a um par proibido
+CUSTO_VAGA_VAZIA = 1e6
+
+
+def resolver_atribuicao(custos):
+    """Atribui cada linha a uma coluna distinta com o menor custo total.
+
+    `custos` é uma matriz linhas x colunas com linhas <= colunas. Retorna a
+    coluna escolhida para cada linha. Algoritmo húngaro com potenciais
+    (caminhos aumentantes mais curtos), vetorizado por linha.
+    """
+    custos = np.asarray(custos, dtype=float)
+    n, m = custos.shape
+    if n > m:
+        raise ValueError(f"Mais linhas ({n}) do que colunas ({m})")
+
+    # Índices a partir de 1; a coluna 0 é a sentinela do caminho aumentante
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    linha_da_coluna = np.zeros(m + 1, dtype=int)
+    anterior = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        linha_da_coluna[0] = i
+        j0 = 0
+        minimo = np.full(m + 1, np.inf)
+        usada = np.zeros(m + 1, dtype=bool)
+
+        while linha_da_coluna[j0] != 0:
+            usada[j0] = True
+            i0 = linha_da_coluna[j0]
+            livres = ~usada[1:]
+
+            # Custos reduzidos da linha i0 contra as colunas ainda livres
+            reduzido = custos[i0 - 1] - u[i0] - v[1:]
+            melhora = livres & (reduzido < minimo[1:])
+            minimo[1:][melhora] = reduzido[melhora]
+            anterior[1:][melhora] = j0
+
+            candidatos = np.where(livres, minimo[1:], np.inf)
+            j1 = int(np.argmin(candidatos)) + 1
+            delta = candidatos[j1 - 1]
+
+            usadas = np.flatnonzero(usada)
+            u[linha_da_coluna[usadas]] += delta
+            v[usadas] -= delta
+            minimo[1:][livres] -= delta
+            j0 = j1
+
+        # Inverte o caminho aumentante
+        while j0:
+            j1 = anterior[j0]
+            linha_da_coluna[j0] = linha_da_coluna[j1]
+            j0 = j1
+
+    atribuicao = np.full(n, -1, dtype=int)
+    colunas = np.flatnonzero(linha_da_coluna[1:])
+    atribuicao[linha_da_coluna[colunas + 1] - 1] = colunas
+    return atribuicao
+
+
+def montar_sets(desgaste_atual, limite, desgaste_vaga, compativel=None, prioridade=None):
+    """Escolhe o pneu de cada vaga minimizando a soma dos quadrados da vida usada ao fim do stint.
+
+    desgaste_atual, limite: por pneu (mesma unidade, ex.: km equivalentes).
+    desgaste_vaga: desgaste que cada vaga deve acumular no stint.
+    compativel: matriz booleana vagas x pneus; False proíbe o par.
+    prioridade: peso por vaga; vagas com peso maior recebem os pneus mais novos.
+
+    O quadrado leva os pneus mais gastos para as posições que menos
+    desgastam e equilibra os sets entre si. Retorna o índice do pneu de
+    cada vaga, ou -1 quando não sobrou pneu compatível.
+    """
+    desgaste_atual = np.asarray(desgaste_atual, dtype=float)
+    limite = np.asarray(limite, dtype=float)
+    desgaste_vaga = np.asarray(desgaste_vaga, dtype=float)
+    n_vagas, n_pneus = len(desgaste_vaga), len(desgaste_atual)
+    if n_vagas == 0:
+        return np.empty(0, dtype=int)
+
+    limite = np.where(limite > 0, limite, 1000.0)
+    vida_final = (desgaste_atual[None, :] + desgaste_vaga[:, None]) / limite[None, :]
+    pesos = np.ones(n_vagas) if prioridade is None else np.asarray(prioridade, dtype=float)
+    custos = vida_final ** 2 * pesos[:, None]
+    if compativel is not None:
+        custos = np.where(np.asarray(compativel, dtype=bool), custos, CUSTO_PROIBIDO)
+
+    # Uma coluna fictícia por vaga: sem pneus suficientes, ficam vazias as de menor prioridade
+    vazias = np.full((n_vagas, n_vagas), CUSTO_VAGA_VAZIA) * pesos[:, None]
+    custos = np.hstack([custos, vazias])
+
+    atribuicao = resolver_atribuicao(custos)
+    custo_escolhido = custos[np.arange(n_vagas), atribuicao]
+    return np.where((atribuicao < n_pneus) & (custo_escolhido < CUSTO_PROIBIDO), atribuicao, -1)
@@ -0,0 +1,164 @@
+"""
+Persistência em SQLite das tabelas de sessão do app1.py
+
+Cada TabelaPersistente é uma visão (repositorio.Visao) de uma tabela do
+esquema único, com os nomes de coluna do app1: mantém em memória só o
+conjunto de trabalho (as linhas do `filtro`, ex.: a etapa atual) e grava
+toda alteração no banco, na transação aberta por BancoSQLite.transacao().
+As telas que precisam da tabela inteira leem do banco com df_completo(),
+pelo cache de leituras do pool.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dados import PoolConexoes, aplicar_migracoes, identificador, valor_sql
+from repositorio import MIGRACOES, TABELAS
+from tabela_registros import TabelaRegistros
+
+
+class BancoSQLite(PoolConexoes):
+    """Banco do app1.py: o esquema único (repositorio) sobre o pool compartilhado (dados.PoolConexoes).
+
+    Abrir o banco aplica as migrações pendentes. Blocos de transação
+    aninhados viram SAVEPOINTs; se um bloco falha, o rollback também
+    recarrega do banco as tabelas em memória alteradas nele.
+    `versao` muda a cada commit (serve de chave de cache dos dados do banco).
+    """
+
+    def __init__(self, caminho):
+        super().__init__(caminho)
+        aplicar_migracoes(self, MIGRACOES, TABELAS)
+
+    def registrar_alteracao(self, tabela):
+        self.ao_desfazer(tabela.recarregar)
+
+    def escritas_desde(self, versao):
+        """Se houve commit no banco depois de `versao` (desta ou de outra sessão, ou do outro app)"""
+        self._verificar_escritas_externas()
+        return self.versao != versao
+
+    def ler_estado(self, chave, padrao=None):
+        valor = self.valor("SELECT valor FROM estado WHERE chave = ?", (chave,))
+        return padrao if valor is None else valor
+
+    def gravar_estado(self, chave, valor):
+        with self.transacao(('estado',)) as conn:
+            conn.execute("INSERT INTO estado (chave, valor) VALUES (?, ?) "
+                         "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor", (chave, valor_sql(valor)))
+
+
+class TabelaPersistente(TabelaRegistros):
+    """TabelaRegistros gravada no banco através de uma visão; em memória ficam só as linhas do `filtro`.
+
+    `filtro` é uma cláusula WHERE em SQL sobre as colunas do banco, com
+    `parametros`. Cada linha em memória guarda a chave primária da linha no
+    banco (visao.chave), usada nas atualizações e remoções: o banco é
+    compartilhado, e rowids liberados por outra sessão podem ser reusados.
+    Colunas fora da visão ficam só em memória.
+    """
+
+    def __init__(self, banco, visao, chave=None, indices=(), filtro=None, parametros=()):
+        super().__init__(visao.colunas, chave, indices)
+        self.banco = banco
+        self.visao = visao
+        self.nome = visao.tabela
+        self.filtro = filtro
+        self.parametros = tuple(parametros)
+        self._chaves = []
+        self.recarregar()
+
+    def _select(self, where=""):
+        return (f"SELECT {identificador(self.visao.chave)} AS _chave, {self.visao.select()} "
+                f"FROM {identificador(self.nome)}{where} ORDER BY rowid")
+
+    def _onde_chaves(self, chaves):
+        return f"WHERE {identificador(self.visao.chave)} IN ({', '.join('?' * len(chaves))})"
+
+    def recarregar(self, filtro=None, parametros=None):
+        """Relê do banco o conjunto de trabalho (opcionalmente com outro filtro)"""
+        if filtro is not None:
+            self.filtro = filtro
+        if parametros is not None:
+            self.parametros = tuple(parametros)
+        where = f" WHERE {self.filtro}" if self.filtro else ""
+        df = self.banco.ler(self._select(where), self.parametros)
+        self._chaves = df.pop('_chave').tolist()
+        TabelaRegistros.substituir(self, df)
+
+    def adicionar(self, registro):
+        with self.banco.transacao((self.nome,)) as conn:
+            self.banco.registrar_alteracao(self)
+            self._chaves.append(self.visao.inserir(conn, registro))
+            super().adicionar(registro)
+
+    def adicionar_varios(self, registros):
+        if isinstance(registros, pd.DataFrame):
+            registros = registros.to_dict('records')
+        registros = list(registros)
+        if not registros:
+            return
+        with self.banco.transacao((self.nome,)) as conn:
+            self.banco.registrar_alteracao(self)
+            self._chaves.extend(self.visao.inserir(conn, registro) for registro in registros)
+            super().adicionar_varios(registros)
+
+    def _atualizar_posicoes(self, posicoes, valores):
+        if not posicoes:
+            return 0
+        with self.banco.transacao((self.nome,)) as conn:
+            self.banco.registrar_alteracao(self)
+            valores_banco = self.visao.valores(valores)
+            if valores_banco:
+                atribuicoes = ', '.join(f"{identificador(coluna)} = ?" for coluna in valores_banco)
+                chaves = [self._chaves[posicao] for posicao in posicoes]
+                conn.execute(f"UPDATE {identificador(self.nome)} SET {atribuicoes} {self._onde_chaves(chaves)}",
+                             list(valores_banco.values()) + chaves)
+                # Chave alterada (ex.: pneu renomeado): as próximas escritas usam a nova
+                if self.visao.chave in valores_banco:
+                    for posicao in posicoes:
+                        self._chaves[posicao] = valores_banco[self.visao.chave]
+            return super()._atualizar_posicoes(posicoes, valores)
+
+    def remover_onde(self, mascara):
+        remover = np.asarray(mascara, dtype=bool)
+        if not remover.any():
+            return 0
+        with self.banco.transacao((self.nome,)) as conn:
+            self.banco.registrar_alteracao(self)
+            chaves = [chave for chave, sai in zip(self._chaves, remover) if sai]
+            conn.execute(f"DELETE FROM {identificador(self.nome)} {self._onde_chaves(chaves)}", chaves)
+            self._chaves = [chave for chave, sai in zip(self._chaves, remover) if not sai]
+            return super().remover_onde(remover)
+
+    def substituir(self, df):
+        """Troca o conteúdo da tabela inteira (no banco) pelo do DataFrame e relê o conjunto de trabalho"""
+        with self.banco.transacao((self.nome,)) as conn:
+            self.banco.registrar_alteracao(self)
+            conn.execute(f"DELETE FROM {identificador(self.nome)}")
+            for registro in df.to_dict('records'):
+                self.visao.inserir(conn, registro)
+            self.recarregar()
+
+    def existe(self, valor, coluna=None):
+        """Se há alguma linha com o valor, dentro ou fora do conjunto de trabalho"""
+        coluna = self.chave if coluna is None else coluna
+        if self.posicoes(valor, coluna):
+            return True
+        return self.banco.valor(f"SELECT 1 FROM {identificador(self.nome)} "
+                                f"WHERE {self.visao.expressao(coluna)} = ? LIMIT 1", (valor_sql(valor),)) is not None
+
+    def total(self):
+        """Número de linhas na tabela inteira (não só no conjunto de trabalho)"""
+        return self.banco.valor(f"SELECT COUNT(*) FROM {identificador(self.nome)}")
+
+    def maximo(self, coluna):
+        """Maior valor da coluna na tabela inteira (None se vazia), ex.: o próximo ID"""
+        return self.banco.valor(f"SELECT MAX({self.visao.expressao(coluna)}) FROM {identificador(self.nome)}")
+
+    def df_completo(self):
+        """Todas as linhas da tabela, lidas do banco (em cache até um commit que altere a tabela)"""
+        if not self.filtro:
+            return self.df
+        df = self.banco.ler_em_cache(('completo', self.nome), (self.nome,), self._select())
+        return df.drop(columns='_chave')
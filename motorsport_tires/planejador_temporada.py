@@ -0,0 +1,118 @@
+"""
+Planejamento de pneus da temporada
+
+Quantos pneus comprar, levar para a etapa seguinte e descartar em cada
+etapa restante, respeitando o regulamento de compra. Programação dinâmica
+sobre (orçamento restante, vida levada), vetorizada por etapa.
+Usado pelo app1.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+from otimizador_sets import POSICOES
+
+# Regulamento: 16 pneus novos na primeira etapa, 8 nas seguintes, 4 levados para a próxima
+LIMITE_COMPRA_PRIMEIRA = 16
+LIMITE_COMPRA_ETAPA = 8
+PNEUS_PROXIMA_ETAPA = 4
+
+# Penalidade por km de pneu que falta para cobrir a etapa
+PENALIDADE_FALTA = 1000.0
+
+
+def planejar_temporada(df_calendario, df_pistas, df_cadastro, etapa_atual, carros, voltas, pesos,
+                       limite_km=1000, orcamento=None, folga=0.5, resolucao_km=10):
+    """Plano por etapa de quantos pneus comprar, levar e descartar até o fim da temporada.
+
+    Cada etapa consome voltas x km por volta em cada um dos 4 pneus de cada
+    carro. A vida disponível é a soma do que resta (limite - km) dos pneus
+    da etapa; conta até demanda x (1 + folga), com peso maior nas etapas-chave,
+    e a falta é penalizada. Os 4 pneus levados ficam com a sobra da etapa
+    (os descartados são os gastos primeiro). Programação dinâmica sobre
+    (orçamento restante, vida levada), vetorizada por etapa; entre planos
+    equivalentes fica o que compra menos.
+    """
+    etapas = df_calendario[df_calendario['Etapa'] >= etapa_atual].sort_values('Etapa').reset_index(drop=True)
+    km_volta = etapas['Pista'].map(df_pistas.drop_duplicates('Nome').set_index('Nome')['KM por Volta'])
+    km_volta = km_volta.fillna(df_pistas['KM por Volta'].mean()).to_numpy(dtype=float)
+    voltas = np.asarray(voltas, dtype=float)
+    pesos = np.asarray(pesos, dtype=float)
+    demanda = len(carros) * len(POSICOES) * voltas * km_volta
+    alvo = demanda * (1 + folga)
+
+    # Pneus desta etapa: os já comprados contam no limite
+    pneus_etapa = df_cadastro[
+        (df_cadastro['Etapa Atual'] == etapa_atual) &
+        (df_cadastro['Status Etapa'].isin(['Disponível', 'Em uso']))
+    ]
+    ja_comprados = int((df_cadastro['Etapa Cadastro'] == etapa_atual).sum())
+    limites = np.where(etapas['Etapa'] == 1, LIMITE_COMPRA_PRIMEIRA, LIMITE_COMPRA_ETAPA)
+    limites[0] = max(limites[0] - ja_comprados, 0)
+    orcamento = int(limites.sum() if orcamento is None else min(orcamento, limites.sum()))
+
+    vida_pneus = (pd.to_numeric(pneus_etapa['Limite KM'], errors='coerce').fillna(limite_km) -
+                  pd.to_numeric(pneus_etapa['Quilometragem atual'], errors='coerce').fillna(0)).clip(lower=0)
+
+    # Vida levada entre etapas, discretizada em faixas de resolucao_km
+    vida_max_levada = PNEUS_PROXIMA_ETAPA * limite_km
+    faixas = int(np.ceil(vida_max_levada / resolucao_km)) + 1
+    vida_faixa = np.arange(faixas) * resolucao_km
+
+    def transicao(i, vida_inicial, compra):
+        vida = vida_inicial + compra * limite_km
+        pontos = (pesos[i] * np.minimum(vida, alvo[i])
+                  - PENALIDADE_FALTA * np.maximum(demanda[i] - vida, 0)
+                  - 1e-6 * compra)
+        levada = np.clip(vida - demanda[i], 0, vida_max_levada) if i < len(etapas) - 1 else np.zeros_like(vida)
+        return vida, pontos, levada
+
+    # Valor[r, f]: melhor pontuação das etapas seguintes com r pneus no orçamento e vida levada na faixa f
+    valor = np.zeros((orcamento + 1, faixas))
+    politicas = [None] * len(etapas)
+    for i in range(len(etapas) - 1, 0, -1):
+        melhor = np.full((orcamento + 1, faixas), -np.inf)
+        escolha = np.zeros((orcamento + 1, faixas), dtype=int)
+        for compra in range(min(limites[i], orcamento) + 1):
+            _, pontos, levada = transicao(i, vida_faixa, compra)
+            faixa_seguinte = (levada // resolucao_km).astype(int)
+            total = pontos[None, :] + valor[:orcamento + 1 - compra][:, faixa_seguinte]
+            melhora = total > melhor[compra:]
+            melhor[compra:][melhora] = total[melhora]
+            escolha[compra:][melhora] = compra
+        valor, politicas[i] = melhor, escolha
+
+    # Etapa atual: estado exato (pode ter mais de 4 pneus); demais seguem a política
+    melhor_total, compra_atual = -np.inf, 0
+    for compra in range(min(limites[0], orcamento) + 1):
+        _, pontos, levada = transicao(0, vida_pneus.sum(), compra)
+        total = pontos + valor[orcamento - compra, int(levada // resolucao_km)]
+        if total > melhor_total:
+            melhor_total, compra_atual = total, compra
+
+    plano = []
+    vida_inicial, qtd_pneus, restante = vida_pneus.sum(), len(pneus_etapa), orcamento
+    for i, etapa in etapas.iterrows():
+        if i == 0:
+            compra = compra_atual
+        else:
+            compra = int(politicas[i][restante, int(vida_inicial // resolucao_km)])
+        vida, _, levada = transicao(i, vida_inicial, compra)
+        levar = min(PNEUS_PROXIMA_ETAPA, qtd_pneus + compra) if i < len(etapas) - 1 else 0
+        por_carro = [compra // len(carros) + (j < compra % len(carros)) for j in range(len(carros))]
+        plano.append({
+            'Etapa': etapa['Etapa'],
+            'Pista': etapa['Pista'],
+            'Tipo': etapa['Tipo'],
+            'Comprar': compra,
+            'Compra por Carro': ', '.join(f"{c}: {q}" for c, q in zip(carros, por_carro) if q),
+            'Levar': levar,
+            'Descartar': qtd_pneus + compra - levar,
+            'Vida Disponível (km)': round(float(vida), 1),
+            'Necessário (km)': round(float(demanda[i]), 1),
+            'Folga (%)': round(float((vida / demanda[i] - 1) * 100), 1) if demanda[i] > 0 else None,
+            'Vida Levada (km)': round(float(levada), 1)
+        })
+        vida_inicial, qtd_pneus, restante = float(levada), levar, restante - compra
+
+    return pd.DataFrame(plano)
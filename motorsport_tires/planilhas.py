@@ -0,0 +1,126 @@
+"""
+Leitura e escrita das planilhas Excel do app1.py
+
+O arquivo é aberto uma única vez em modo somente leitura (streaming do
+openpyxl) e todas as abas conhecidas saem da mesma passada, já com os
+tipos de cada coluna ajustados pelo esquema: números como números,
+códigos e nomes como texto e datas no formato usado pelo app.
+A exportação usa o modo write-only, que grava as linhas em lotes sem
+montar as células de todas as abas na memória.
+"""
+
+import io
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+# Linhas convertidas de cada vez na exportação
+TAMANHO_LOTE = 5_000
+
+# Formato das colunas de data do app (os valores ficam como texto)
+FORMATOS_DATA = {
+    'data': '%d/%m/%Y',
+    'data_hora': '%d/%m/%Y %H:%M',
+}
+
+
+def _vazio(valor):
+    return valor is None or (isinstance(valor, float) and math.isnan(valor)) or valor == ''
+
+
+def _texto(valor, formato=None):
+    if _vazio(valor):
+        return None
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime(formato or FORMATOS_DATA['data_hora'])
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def aplicar_esquema(df, esquema):
+    """Ajusta os tipos das colunas do esquema ({coluna: 'int' | 'float' | 'str' | 'data' | 'data_hora'}).
+
+    Colunas do esquema ausentes no arquivo entram vazias; colunas extras são mantidas no fim.
+    """
+    colunas = list(esquema) + [coluna for coluna in df.columns if coluna not in esquema]
+    df = df.reindex(columns=colunas)
+    for coluna, tipo in esquema.items():
+        if tipo in ('int', 'float'):
+            valores = pd.to_numeric(df[coluna], errors='coerce')
+            # Inteiro só se não houver vazios (o app não usa os tipos anuláveis)
+            if tipo == 'int' and valores.notna().all():
+                valores = valores.astype('int64')
+            elif tipo == 'float':
+                valores = valores.astype('float64')
+            df[coluna] = valores
+        else:
+            formato = FORMATOS_DATA.get(tipo)
+            df[coluna] = pd.Series([_texto(valor, formato) for valor in df[coluna]], index=df.index, dtype=object)
+    return df
+
+
+def _ler_aba(planilha):
+    # Dimensões gravadas por alguns programas vêm erradas; lê até a última linha de fato
+    planilha.reset_dimensions()
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = next(linhas, None) or ()
+    usadas = [(i, str(nome).strip()) for i, nome in enumerate(cabecalho) if not _vazio(nome)]
+    largura = len(cabecalho)
+
+    registros = []
+    for linha in linhas:
+        if len(linha) < largura:
+            linha = linha + (None,) * (largura - len(linha))
+        valores = [linha[i] for i, _ in usadas]
+        if any(not _vazio(valor) for valor in valores):
+            registros.append(valores)
+
+    colunas = [nome for _, nome in usadas]
+    return pd.DataFrame(registros, columns=colunas) if registros else pd.DataFrame(columns=colunas)
+
+
+def ler_planilhas(conteudo, esquemas):
+    """Lê as abas de `esquemas` ({aba: esquema}) do arquivo (bytes) numa só abertura.
+
+    Retorna {aba: DataFrame} apenas com as abas existentes no arquivo.
+    """
+    livro = load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True)
+    try:
+        return {
+            aba: aplicar_esquema(_ler_aba(livro[aba]), esquema)
+            for aba, esquema in esquemas.items()
+            if aba in livro.sheetnames
+        }
+    finally:
+        livro.close()
+
+
+def _celula(valor):
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if valor is None or valor is pd.NaT or valor is pd.NA:
+        return None
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    return valor
+
+
+def gerar_planilha(abas):
+    """Arquivo .xlsx (bytes) com uma aba por DataFrame de `abas` ({aba: DataFrame}), em modo write-only"""
+    livro = Workbook(write_only=True)
+    for aba, df in abas.items():
+        planilha = livro.create_sheet(aba)
+        planilha.append([str(coluna) for coluna in df.columns])
+        for inicio in range(0, len(df), TAMANHO_LOTE):
+            for linha in df.iloc[inicio:inicio + TAMANHO_LOTE].to_numpy(dtype=object):
+                planilha.append([_celula(valor) for valor in linha])
+
+    saida = io.BytesIO()
+    livro.save(saida)
+    return saida.getvalue()
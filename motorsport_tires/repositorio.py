@@ -0,0 +1,728 @@
+"""
+Esquema único e repositório de dados do app1.py e do motorsport_tires_v2_2.py
+
+Os dois apps usam o mesmo banco SQLite (CAMINHO_BANCO), com pneus, pistas,
+carros, etapas, sets, medições, outings e histórico, criado e atualizado
+pelas migrações versionadas daqui (dados.aplicar_migracoes). O v2_2 consulta
+as tabelas diretamente; o app1 as enxerga por visões (Visao) com os nomes
+de coluna das suas telas e planilhas. importar_banco_legado copia para o
+esquema único o banco antigo do app1 (tire_management.db).
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from dados import identificador, valor_sql
+
+# Banco único dos dois apps (ao lado deste arquivo, salvo se a variável de ambiente indicar outro)
+CAMINHO_BANCO = os.environ.get(
+    'MOTORSPORT_TIRES_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'motorsport_tires.db'))
+
+
+# Modelo de desgaste: km de cada outing convertidos em km equivalentes por posição
+class DesgasteManager:
+    POSICOES = ('DE', 'DD', 'TE', 'TD')
+    COLUNAS_PISTA = ('desgaste_de', 'desgaste_dd', 'desgaste_te', 'desgaste_td')
+
+    # Multiplicadores (valores ausentes/desconhecidos contam como 1.0)
+    FATOR_NIVEL = {'baixo': 0.8, 'medio': 1.0, 'alto': 1.3}
+    FATOR_CONDICAO = {'seco': 1.0, 'misto': 0.85, 'molhado': 0.7}
+    # Sentido horário = mais curvas à direita = lado esquerdo por fora (e vice-versa)
+    LADO_EXTERNO = {'horario': 'E', 'anti_horario': 'D'}
+    FATOR_LADO_EXTERNO = 1.05
+    FATOR_LADO_INTERNO = 0.95
+
+    QUERY_USOS = '''
+        SELECT h.id, h.pneu_id, h.posicao, o.km_calculado, o.condicao,
+               p.sentido, p.desgaste_de, p.desgaste_dd, p.desgaste_te, p.desgaste_td
+        FROM historico_pneus h
+        JOIN outings o ON h.outing_id = o.id
+        JOIN pistas p ON o.pista_id = p.id
+    '''
+
+    @staticmethod
+    def calcular(usos):
+        """Desgaste efetivo de cada linha de `usos`, vetorizado.
+
+        Colunas esperadas: posicao, km_calculado, condicao, sentido e os
+        níveis desgaste_de/dd/te/td da pista.
+        """
+        posicao = usos['posicao'].astype(str).str.upper()
+        km = pd.to_numeric(usos['km_calculado'], errors='coerce').fillna(0)
+
+        # Nível de desgaste da pista na posição de cada linha
+        nivel = pd.Series('medio', index=usos.index, dtype=object)
+        for pos, coluna in zip(DesgasteManager.POSICOES, DesgasteManager.COLUNAS_PISTA):
+            nivel = nivel.mask(posicao == pos, usos[coluna])
+        fator_nivel = nivel.astype(str).str.lower().map(DesgasteManager.FATOR_NIVEL).fillna(1.0)
+
+        fator_condicao = usos['condicao'].astype(str).str.lower().map(DesgasteManager.FATOR_CONDICAO).fillna(1.0)
+
+        lado_externo = usos['sentido'].astype(str).str.lower().map(DesgasteManager.LADO_EXTERNO)
+        lado = posicao.str[1]
+        fator_sentido = pd.Series(1.0, index=usos.index)
+        fator_sentido = fator_sentido.mask(lado_externo.notna() & (lado == lado_externo), DesgasteManager.FATOR_LADO_EXTERNO)
+        fator_sentido = fator_sentido.mask(lado_externo.notna() & (lado != lado_externo), DesgasteManager.FATOR_LADO_INTERNO)
+
+        return km * fator_nivel * fator_condicao * fator_sentido
+
+    @staticmethod
+    def recalcular_historico(conn, filtro="", params=()):
+        """Regrava historico_pneus.desgaste (todo o histórico ou as linhas do `filtro` SQL).
+
+        Retorna os pneus afetados. Deve ser chamado dentro de uma transação.
+        """
+        query = DesgasteManager.QUERY_USOS + (f" WHERE {filtro}" if filtro else "")
+        usos = pd.read_sql_query(query, conn, params=params)
+        if usos.empty:
+            return []
+        usos['desgaste'] = DesgasteManager.calcular(usos)
+        conn.executemany("UPDATE historico_pneus SET desgaste = ? WHERE id = ?",
+                         zip(usos['desgaste'].tolist(), usos['id'].tolist()))
+        return usos['pneu_id'].unique().tolist()
+
+    @staticmethod
+    def sincronizar_pneus(conn, pneu_ids=None):
+        """Recalcula pneus.desgaste_atual a partir do histórico (todos, se `pneu_ids` for None).
+
+        km que não vieram de outings (base, ajuste manual) contam com fator 1.
+        Deve rodar depois de a cadeia de km estar atualizada.
+        """
+        query = '''
+            UPDATE pneus SET desgaste_atual = COALESCE(km_atual, 0) + COALESCE((
+                SELECT SUM(COALESCE(h.desgaste, 0) - COALESCE(o.km_calculado, 0))
+                FROM historico_pneus h
+                JOIN outings o ON h.outing_id = o.id
+                WHERE h.pneu_id = pneus.id
+            ), 0)
+        '''
+        if pneu_ids is None:
+            conn.execute(query)
+            return
+        pneu_ids = sorted({p for p in pneu_ids if p})
+        if pneu_ids:
+            conn.execute(f"{query} WHERE id IN ({','.join('?' * len(pneu_ids))})", pneu_ids)
+
+
+# Resumo de uso por pneu (total, posição, pista e tipo de sessão), recalculado do zero a partir do histórico
+QUERY_RESUMO_USO = '''
+    SELECT h.pneu_id, 'total', '', COUNT(*), COALESCE(SUM(o.voltas), 0), COALESCE(SUM(o.km_calculado), 0)
+    FROM historico_pneus h JOIN outings o ON h.outing_id = o.id
+    GROUP BY h.pneu_id
+    UNION ALL
+    SELECT h.pneu_id, 'posicao', h.posicao, COUNT(*), COALESCE(SUM(o.voltas), 0), COALESCE(SUM(o.km_calculado), 0)
+    FROM historico_pneus h JOIN outings o ON h.outing_id = o.id
+    GROUP BY h.pneu_id, h.posicao
+    UNION ALL
+    SELECT h.pneu_id, 'pista', o.pista_id, COUNT(*), COALESCE(SUM(o.voltas), 0), COALESCE(SUM(o.km_calculado), 0)
+    FROM historico_pneus h JOIN outings o ON h.outing_id = o.id
+    GROUP BY h.pneu_id, o.pista_id
+    UNION ALL
+    SELECT h.pneu_id, 'tipo_sessao', COALESCE(o.tipo_sessao, ''), COUNT(*), COALESCE(SUM(o.voltas), 0), COALESCE(SUM(o.km_calculado), 0)
+    FROM historico_pneus h JOIN outings o ON h.outing_id = o.id
+    GROUP BY h.pneu_id, COALESCE(o.tipo_sessao, '')
+'''
+
+
+# Migrações de esquema versionadas (PRAGMA user_version)
+def _migracao_esquema_base(conn):
+    """Tabelas principais, colunas adicionadas depois da v1 do sistema e índices"""
+    # Tabela de pneus individuais (SIMPLIFICADA)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pneus (
+            id TEXT PRIMARY KEY,
+            tipo TEXT NOT NULL,
+            data_cadastro DATE,
+            limite_km INTEGER,
+            km_atual REAL DEFAULT 0,
+            status TEXT DEFAULT 'disponivel',
+            observacoes TEXT
+        )
+    ''')
+
+    # Tabela de pistas
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pistas (
+            id TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            comprimento REAL NOT NULL,
+            tipo TEXT DEFAULT 'road',
+            sentido TEXT DEFAULT 'horario',
+            caracteristicas TEXT,
+            desgaste_de TEXT DEFAULT 'medio',
+            desgaste_dd TEXT DEFAULT 'medio',
+            desgaste_te TEXT DEFAULT 'medio',
+            desgaste_td TEXT DEFAULT 'medio'
+        )
+    ''')
+
+    # Tabela de sets
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sets (
+            id TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            data_montagem DATE,
+            status TEXT DEFAULT 'ativo',
+            pneu_de TEXT,
+            pneu_dd TEXT,
+            pneu_te TEXT,
+            pneu_td TEXT,
+            observacoes TEXT,
+            FOREIGN KEY (pneu_de) REFERENCES pneus (id),
+            FOREIGN KEY (pneu_dd) REFERENCES pneus (id),
+            FOREIGN KEY (pneu_te) REFERENCES pneus (id),
+            FOREIGN KEY (pneu_td) REFERENCES pneus (id)
+        )
+    ''')
+
+    # Tabela de outings
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS outings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data DATE NOT NULL,
+            pista_id TEXT NOT NULL,
+            set_id TEXT NOT NULL,
+            tipo_sessao TEXT,
+            condicao TEXT,
+            voltas INTEGER,
+            km_calculado REAL,
+            tempo_sessao INTEGER,
+            observacoes TEXT,
+            FOREIGN KEY (pista_id) REFERENCES pistas (id),
+            FOREIGN KEY (set_id) REFERENCES sets (id)
+        )
+    ''')
+
+    # Tabela de histórico
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS historico_pneus (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pneu_id TEXT NOT NULL,
+            outing_id INTEGER NOT NULL,
+            posicao TEXT NOT NULL,
+            km_antes REAL DEFAULT 0,
+            km_depois REAL DEFAULT 0,
+            FOREIGN KEY (pneu_id) REFERENCES pneus (id),
+            FOREIGN KEY (outing_id) REFERENCES outings (id)
+        )
+    ''')
+
+    # Bancos criados antes dessas colunas existirem
+    colunas_sets = [row[1] for row in conn.execute("PRAGMA table_info(sets)")]
+    if 'observacoes' not in colunas_sets:
+        conn.execute("ALTER TABLE sets ADD COLUMN observacoes TEXT")
+
+    colunas_outings = [row[1] for row in conn.execute("PRAGMA table_info(outings)")]
+    if 'tempo_sessao' not in colunas_outings:
+        conn.execute("ALTER TABLE outings ADD COLUMN tempo_sessao INTEGER")
+
+    # Índices secundários das consultas mais usadas
+    # Timeline por pneu (mostrar_historico) e recálculo de km
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_historico_pneu_outing ON historico_pneus (pneu_id, outing_id)")
+    # Exclusão/edição de outing e junção historico -> outings
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_historico_outing ON historico_pneus (outing_id)")
+    # listar_outings ORDER BY data DESC, id DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outings_data_id ON outings (data, id)")
+    # listar_pneus_disponiveis WHERE status = ? ORDER BY tipo, id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pneus_status_tipo_id ON pneus (status, tipo, id)")
+    # listar_sets_ativos WHERE status = ? ORDER BY id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sets_status_id ON sets (status, id)")
+
+
+def _migracao_indices_filtros_outings(conn):
+    """Índices dos filtros do histórico de outings (pista/set/tipo + ordem por data)"""
+    # consultar_outings: WHERE <filtro> = ? ORDER BY data DESC, id DESC LIMIT ?
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outings_pista_data ON outings (pista_id, data, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outings_set_data ON outings (set_id, data, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outings_tipo_data ON outings (tipo_sessao, data, id)")
+
+
+def _migracao_resumo_uso_pneus(conn):
+    """Resumo de uso por pneu (total, posição, pista, tipo de sessão) mantido nas escritas"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS resumo_uso_pneus (
+            pneu_id TEXT NOT NULL,
+            dimensao TEXT NOT NULL,
+            valor TEXT NOT NULL,
+            usos INTEGER NOT NULL DEFAULT 0,
+            voltas INTEGER NOT NULL DEFAULT 0,
+            km REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (pneu_id, dimensao, valor)
+        ) WITHOUT ROWID
+    ''')
+    # Carga inicial a partir do histórico existente
+    conn.execute("DELETE FROM resumo_uso_pneus")
+    conn.execute(f"INSERT INTO resumo_uso_pneus (pneu_id, dimensao, valor, usos, voltas, km) {QUERY_RESUMO_USO}")
+
+
+def _migracao_desgaste_efetivo(conn):
+    """Desgaste efetivo por posição no histórico e acumulado por pneu, com backfill"""
+    colunas_historico = [row[1] for row in conn.execute("PRAGMA table_info(historico_pneus)")]
+    if 'desgaste' not in colunas_historico:
+        conn.execute("ALTER TABLE historico_pneus ADD COLUMN desgaste REAL DEFAULT 0")
+
+    colunas_pneus = [row[1] for row in conn.execute("PRAGMA table_info(pneus)")]
+    if 'desgaste_atual' not in colunas_pneus:
+        conn.execute("ALTER TABLE pneus ADD COLUMN desgaste_atual REAL DEFAULT 0")
+
+    DesgasteManager.recalcular_historico(conn)
+    DesgasteManager.sincronizar_pneus(conn)
+
+
+def _migracao_esquema_unico(conn):
+    """Carros, etapas, medições e estado do app1 no mesmo banco; colunas do app1 em pneus, pistas e sets"""
+    novas_colunas = {
+        'pneus': ('codigo_barras INTEGER', 'carro TEXT', 'situacao TEXT', 'profundidade_inicial REAL',
+                  'etapa_cadastro INTEGER', 'etapa_atual INTEGER', 'status_etapa TEXT'),
+        'pistas': ('localizacao TEXT',),
+        'sets': ('carro TEXT', 'etapa INTEGER'),
+    }
+    for tabela, colunas in novas_colunas.items():
+        existentes = {row[1] for row in conn.execute(f"PRAGMA table_info({tabela})")}
+        for coluna in colunas:
+            if coluna.split()[0] not in existentes:
+                conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna}")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS carros (
+            id INTEGER PRIMARY KEY,
+            nome TEXT,
+            numero TEXT,
+            piloto TEXT,
+            categoria TEXT,
+            status TEXT DEFAULT 'Ativo',
+            data_cadastro DATE
+        )
+    ''')
+
+    # Calendário da temporada
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS etapas (
+            numero INTEGER PRIMARY KEY,
+            data DATE,
+            local TEXT,
+            pista TEXT,
+            tipo TEXT,
+            status TEXT DEFAULT 'Não Iniciada'
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS historico_etapas (
+            id INTEGER PRIMARY KEY,
+            etapa INTEGER,
+            data_inicio DATE,
+            data_fim DATE,
+            pneus_comprados INTEGER,
+            pneus_selecionados TEXT,
+            pneus_descartados INTEGER,
+            status TEXT
+        )
+    ''')
+
+    # Medições de profundidade da banda (mm) e km do pneu em cada uma
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS medicoes (
+            id INTEGER PRIMARY KEY,
+            pneu_id TEXT,
+            etapa INTEGER,
+            data DATE,
+            tipo_evento TEXT,
+            voltas INTEGER,
+            tempo_pista REAL,
+            pista TEXT,
+            km_antes REAL,
+            km_sessao REAL,
+            km_total REAL,
+            codigo_barras INTEGER,
+            carro TEXT,
+            interno REAL,
+            centro_interno REAL,
+            centro_externo REAL,
+            externo REAL,
+            profundidade_media REAL,
+            condicao_twi TEXT,
+            condicao_km TEXT,
+            acao TEXT,
+            FOREIGN KEY (pneu_id) REFERENCES pneus (id)
+        )
+    ''')
+
+    # Valores avulsos do app1 (etapa atual, carga inicial feita)
+    conn.execute("CREATE TABLE IF NOT EXISTS estado (chave TEXT PRIMARY KEY, valor)")
+
+    # Conjunto de trabalho do app1 (pneus e sets da etapa) e buscas por código de barras/pneu
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pneus_etapa_atual ON pneus (etapa_atual)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pneus_codigo_barras ON pneus (codigo_barras)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sets_etapa ON sets (etapa)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_medicoes_pneu_data ON medicoes (pneu_id, data)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_carros_nome ON carros (nome)")
+
+    # km lançado fora dos outings (medição do app1, pneu cadastrado já rodado) entra no desgaste
+    # com fator 1, como em PneuManager.atualizar_km_pneu; escritas que já ajustam o desgaste não disparam
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_pneus_km_ajuste AFTER UPDATE OF km_atual ON pneus
+        WHEN NEW.km_atual IS NOT OLD.km_atual AND NEW.desgaste_atual IS OLD.desgaste_atual
+        BEGIN
+            UPDATE pneus SET desgaste_atual = COALESCE(OLD.desgaste_atual, 0)
+                                              + COALESCE(NEW.km_atual, 0) - COALESCE(OLD.km_atual, 0)
+            WHERE rowid = NEW.rowid;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_pneus_km_inicial AFTER INSERT ON pneus
+        WHEN COALESCE(NEW.km_atual, 0) != 0 AND COALESCE(NEW.desgaste_atual, 0) = 0
+        BEGIN
+            UPDATE pneus SET desgaste_atual = NEW.km_atual WHERE rowid = NEW.rowid;
+        END
+    ''')
+
+
+# Situação do pneu na etapa (app1) -> pneus.status (v2_2): montado num set é 'em_uso' nos dois apps
+STATUS_PNEU = {
+    'Disponível': 'disponivel',
+    'Montado': 'em_uso',
+    'Em uso': 'rodado',       # rodou na etapa (tem medição), fora de set
+    'Descartado': 'descartado',
+}
+
+
+def _sql_status_pneu(coluna):
+    """Expressão SQL que converte pneus.status para o texto do app1"""
+    casos = ' '.join(f"WHEN '{banco}' THEN '{app}'" for app, banco in STATUS_PNEU.items())
+    return f"CASE {coluna} {casos} ELSE {coluna} END"
+
+
+def _migracao_status_unico(conn):
+    """Situação do pneu na etapa do app1 passa a ser pneus.status, a mesma coluna que o v2_2 usa"""
+    conn.execute(f'''
+        UPDATE pneus SET status = CASE status_etapa
+            {' '.join(f"WHEN '{app}' THEN '{banco}'" for app, banco in STATUS_PNEU.items())}
+            ELSE status_etapa END
+        WHERE status_etapa IS NOT NULL
+    ''')
+    # DROP COLUMN existe a partir do SQLite 3.35; antes disso a coluna fica, sem uso
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        conn.execute("ALTER TABLE pneus DROP COLUMN status_etapa")
+
+
+def _migracao_ids_sem_reuso(conn):
+    """id INTEGER PRIMARY KEY reaproveita o maior id apagado; com AUTOINCREMENT, um id nunca volta.
+
+    As sessões do app1 gravam pela chave primária das linhas em memória:
+    sem isso, outra sessão que apaga e regrava a tabela daria os mesmos ids a outras linhas.
+    """
+    for tabela in ('carros', 'historico_etapas', 'medicoes'):
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone()[0]
+        indices = [linha[0] for linha in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (tabela,))]
+        conn.execute(f"ALTER TABLE {tabela} RENAME TO {tabela}_antiga")
+        conn.execute(sql.replace('id INTEGER PRIMARY KEY', 'id INTEGER PRIMARY KEY AUTOINCREMENT', 1))
+        conn.execute(f"INSERT INTO {tabela} SELECT * FROM {tabela}_antiga")
+        conn.execute(f"DROP TABLE {tabela}_antiga")
+        for indice in indices:
+            conn.execute(indice)
+
+
+# Migrações em ordem: (versão, descrição, função que recebe a conexão)
+# Para alterar o esquema, acrescente uma nova entrada - nunca edite uma já publicada
+MIGRACOES = (
+    (1, "Esquema base, colunas observacoes/tempo_sessao e índices secundários", _migracao_esquema_base),
+    (2, "Índices dos filtros do histórico de outings", _migracao_indices_filtros_outings),
+    (3, "Tabela resumo_uso_pneus mantida a cada escrita de outing", _migracao_resumo_uso_pneus),
+    (4, "Desgaste efetivo por pista/posição em historico_pneus e pneus", _migracao_desgaste_efetivo),
+    (5, "Esquema único: carros, etapas, medições e colunas do app1", _migracao_esquema_unico),
+    (6, "Situação do pneu na etapa do app1 em pneus.status", _migracao_status_unico),
+    (7, "IDs de carros, medições e histórico de etapas sem reuso (AUTOINCREMENT)", _migracao_ids_sem_reuso),
+)
+VERSAO_ESQUEMA = MIGRACOES[-1][0]
+
+
+# Todas as tabelas do esquema (invalidadas no cache de leituras pelas migrações)
+TABELAS = ('pneus', 'pistas', 'sets', 'outings', 'historico_pneus', 'resumo_uso_pneus',
+           'carros', 'etapas', 'historico_etapas', 'medicoes', 'estado')
+
+
+# Datas: dd/mm/aaaa [hh:mm] no app1, aaaa-mm-dd [hh:mm] no banco (como as do v2_2)
+FORMATOS_DATA = (('%d/%m/%Y %H:%M', '%Y-%m-%d %H:%M'), ('%d/%m/%Y', '%Y-%m-%d'))
+
+
+def _data_iso(valor):
+    """Data no formato do app1 -> formato do banco; valores em outro formato passam como estão"""
+    if isinstance(valor, str):
+        for formato_app, formato_banco in FORMATOS_DATA:
+            try:
+                return datetime.strptime(valor.strip(), formato_app).strftime(formato_banco)
+            except ValueError:
+                pass
+    return valor
+
+
+def _minusculo(valor):
+    return valor.lower() if isinstance(valor, str) else valor
+
+
+def _status_pneu(valor):
+    return STATUS_PNEU.get(valor, valor)
+
+
+def _id_set(valor):
+    """ID numérico do app1 -> 'S001' (mesma numeração de gerar_proximo_id no v2_2)"""
+    try:
+        return f"S{int(valor):03d}"
+    except (TypeError, ValueError):
+        return valor
+
+
+# Conversões de coluna: (expressão SQL de leitura, em que {0} é a coluna; função de gravação)
+CONVERSOES = {
+    'data': ("COALESCE(strftime(CASE WHEN length({0}) > 10 THEN '%d/%m/%Y %H:%M' ELSE '%d/%m/%Y' END, {0}), {0})",
+             _data_iso),
+    # 'ativo' no banco, 'Ativo' no app1
+    'capitalizado': ("UPPER(SUBSTR({0}, 1, 1)) || SUBSTR({0}, 2)", _minusculo),
+    'status_pneu': (_sql_status_pneu('{0}'), _status_pneu),
+    'id_set': ("CASE WHEN {0} GLOB 'S[0-9]*' THEN CAST(SUBSTR({0}, 2) AS INTEGER) ELSE {0} END", _id_set),
+}
+
+
+class Visao:
+    """Tabela do esquema vista com os nomes de coluna do app1.
+
+    `colunas`: (coluna no app, coluna no banco[, conversão de CONVERSOES]).
+    `padroes`: colunas do banco que o app1 não preenche, completadas na
+    inserção com um valor fixo ou uma função dos valores já convertidos.
+    `chave`: coluna da chave primária no banco, que identifica a linha nas escritas.
+    Colunas do app fora da visão (ex.: extras de uma planilha) não são gravadas.
+    """
+
+    def __init__(self, tabela, colunas, padroes=None, chave='id'):
+        self.tabela = tabela
+        self.chave = chave
+        self.colunas = [coluna[0] for coluna in colunas]
+        self._banco = {coluna[0]: coluna[1] for coluna in colunas}
+        self._conversoes = {coluna[0]: CONVERSOES[coluna[2]] for coluna in colunas if len(coluna) > 2}
+        self.padroes = padroes or {}
+
+    def expressao(self, coluna):
+        """Expressão SQL que lê a coluna do app"""
+        sql = identificador(self._banco[coluna])
+        conversao = self._conversoes.get(coluna)
+        return conversao[0].format(sql) if conversao else sql
+
+    def select(self):
+        """Lista do SELECT com todas as colunas da visão, nomeadas como no app"""
+        return ', '.join(f"{self.expressao(coluna)} AS {identificador(coluna)}" for coluna in self.colunas)
+
+    def valores(self, registro):
+        """{coluna no banco: valor} das colunas do registro que fazem parte da visão"""
+        valores = {}
+        for coluna, valor in registro.items():
+            if coluna not in self._banco:
+                continue
+            valor = valor_sql(valor)
+            conversao = self._conversoes.get(coluna)
+            valores[self._banco[coluna]] = conversao[1](valor) if conversao and valor is not None else valor
+        return valores
+
+    def inserir(self, conn, registro):
+        """Insere um registro do app1; retorna a chave primária da linha"""
+        valores = self.valores(registro)
+        for coluna, padrao in self.padroes.items():
+            if valores.get(coluna) is None:
+                valores[coluna] = padrao(valores) if callable(padrao) else padrao
+        if not valores:
+            cursor = conn.execute(f"INSERT INTO {self.tabela} DEFAULT VALUES")
+        else:
+            colunas = ', '.join(map(identificador, valores))
+            cursor = conn.execute(f"INSERT INTO {self.tabela} ({colunas}) VALUES ({', '.join('?' * len(valores))})",
+                                  list(valores.values()))
+        # Chave gerada pelo banco (id INTEGER PRIMARY KEY) é o próprio rowid
+        chave = valores.get(self.chave)
+        return cursor.lastrowid if chave is None else chave
+
+
+VISAO_PNEUS = Visao('pneus', (
+    ('Nome do Pneu', 'id'),
+    ('Código de Barras', 'codigo_barras'),
+    ('Carro Vinculado', 'carro'),
+    ('Status', 'situacao'),
+    ('Quilometragem atual', 'km_atual'),
+    ('Profundidade Inicial (mm)', 'profundidade_inicial'),
+    ('Limite KM', 'limite_km'),
+    ('Data Cadastro', 'data_cadastro', 'data'),
+    ('Etapa Cadastro', 'etapa_cadastro'),
+    ('Etapa Atual', 'etapa_atual'),
+    ('Status Etapa', 'status', 'status_pneu'),
+), padroes={'tipo': 'normal'})
+
+VISAO_MEDICOES = Visao('medicoes', (
+    ('Código do Pneu', 'pneu_id'),
+    ('Quilometragem Atual', 'km_antes'),
+    ('Código de Barras', 'codigo_barras'),
+    ('Carro', 'carro'),
+    ('Data Medição', 'data', 'data'),
+    ('Tipo Evento', 'tipo_evento'),
+    ('Voltas', 'voltas'),
+    ('Tempo Pista (min)', 'tempo_pista'),
+    ('Pista', 'pista'),
+    ('Quilometragem', 'km_sessao'),
+    ('KM TOTAL', 'km_total'),
+    ('Interno (mm)', 'interno'),
+    ('Centro Interno (mm)', 'centro_interno'),
+    ('Centro Externo (mm)', 'centro_externo'),
+    ('Externo (mm)', 'externo'),
+    ('Profundidade Média (mm)', 'profundidade_media'),
+    ('Condição (twi)', 'condicao_twi'),
+    ('Condição (km)', 'condicao_km'),
+    ('AÇÃO', 'acao'),
+    ('Etapa', 'etapa'),
+))
+
+VISAO_SETS = Visao('sets', (
+    ('ID Set', 'id', 'id_set'),
+    ('Nome do Set', 'nome'),
+    ('Carro', 'carro'),
+    ('Data Montagem', 'data_montagem', 'data'),
+    ('Status', 'status', 'capitalizado'),
+    ('Etapa', 'etapa'),
+    ('Pneu Dianteiro Esquerdo', 'pneu_de'),
+    ('Pneu Dianteiro Direito', 'pneu_dd'),
+    ('Pneu Traseiro Esquerdo', 'pneu_te'),
+    ('Pneu Traseiro Direito', 'pneu_td'),
+), padroes={'tipo': 'normal', 'nome': lambda valores: valores.get('id')})
+
+VISAO_CARROS = Visao('carros', (
+    ('Nome', 'nome'),
+    ('Número', 'numero'),
+    ('Piloto', 'piloto'),
+    ('Categoria', 'categoria'),
+    ('Status', 'status'),
+    ('Data Cadastro', 'data_cadastro', 'data'),
+))
+
+
+# Pistas do app1 usam o nome como id; as do v2_2 têm id próprio (ex.: INTER7)
+VISAO_PISTAS = Visao('pistas', (
+    ('Nome', 'nome'),
+    ('KM por Volta', 'comprimento'),
+    ('Localização', 'localizacao'),
+), padroes={'id': lambda valores: valores.get('nome'), 'comprimento': 0.0})
+
+VISAO_HISTORICO_ETAPAS = Visao('historico_etapas', (
+    ('Etapa', 'etapa'),
+    ('Data Inicio', 'data_inicio', 'data'),
+    ('Data Fim', 'data_fim', 'data'),
+    ('Pneus Comprados', 'pneus_comprados'),
+    ('Pneus Selecionados Proxima', 'pneus_selecionados'),
+    ('Pneus Descartados', 'pneus_descartados'),
+    ('Status', 'status'),
+))
+
+VISAO_ETAPAS = Visao('etapas', (
+    ('Etapa', 'numero'),
+    ('Data', 'data', 'data'),
+    ('Local', 'local'),
+    ('Pista', 'pista'),
+    ('Tipo', 'tipo'),
+    ('Status', 'status'),
+), chave='numero')
+
+
+# Tabelas do banco antigo do app1 (colunas com os nomes das telas, mais _linha) e a visão de cada uma
+TABELAS_LEGADO = {
+    'carros': VISAO_CARROS,
+    'pistas': VISAO_PISTAS,
+    'cadastro': VISAO_PNEUS,
+    'medicoes': VISAO_MEDICOES,
+    'sets': VISAO_SETS,
+    'historico_etapas': VISAO_HISTORICO_ETAPAS,
+}
+
+
+def importar_banco_legado(pool, caminho):
+    """Copia para o esquema único, uma única vez, o banco antigo do app1 (tire_management.db).
+
+    Pneus que já existem (cadastrados no v2_2) só têm as colunas vazias
+    completadas, pistas de mesmo nome não se repetem e, se algum ID de set
+    já estiver em uso, os sets importados são renumerados depois do maior.
+    O calendário, guardado como JSON em `estado`, vira a tabela etapas.
+    O arquivo antigo não é alterado. Retorna o número de linhas copiadas.
+    """
+    origem = os.path.abspath(caminho)
+    if not os.path.exists(origem) or origem == os.path.abspath(pool.caminho):
+        return 0
+    if pool.valor("SELECT 1 FROM estado WHERE chave = 'banco_legado' AND valor = ?", (origem,)):
+        return 0
+
+    antigo = sqlite3.connect(f"file:{origem}?mode=ro", uri=True)
+    try:
+        existentes = {linha[0] for linha in antigo.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        tabelas = {}
+        for nome in TABELAS_LEGADO:
+            if nome in existentes:
+                cursor = antigo.execute(f"SELECT * FROM {identificador(nome)} ORDER BY _linha")
+                colunas = [descricao[0] for descricao in cursor.description]
+                tabelas[nome] = [
+                    {coluna: valor for coluna, valor in zip(colunas, linha) if coluna != '_linha'} for linha in cursor]
+        estado = dict(antigo.execute("SELECT chave, valor FROM estado")) if 'estado' in existentes else {}
+    finally:
+        antigo.close()
+
+    etapas = json.loads(estado.pop('calendario')) if estado.get('calendario') else []
+    copiadas = 0
+    with pool.transacao(TABELAS) as conn:
+        pistas = {linha[0] for linha in conn.execute("SELECT nome FROM pistas")}
+        tabelas['pistas'] = [registro for registro in tabelas.get('pistas', []) if registro.get('Nome') not in pistas]
+
+        sets = tabelas.get('sets', [])
+        ocupados = {linha[0] for linha in conn.execute("SELECT id FROM sets")}
+        if any(_id_set(registro.get('ID Set')) in ocupados for registro in sets):
+            maior = conn.execute("SELECT COALESCE(MAX(CAST(SUBSTR(id, 2) AS INTEGER)), 0) FROM sets").fetchone()[0]
+            tabelas['sets'] = [{**registro, 'ID Set': maior + numero} for numero, registro in enumerate(sets, start=1)]
+
+        for nome, registros in tabelas.items():
+            visao = TABELAS_LEGADO[nome]
+            for registro in registros:
+                valores = visao.valores(registro)
+                if nome == 'cadastro' and conn.execute("SELECT 1 FROM pneus WHERE id = ?", (valores.get('id'),)).fetchone():
+                    atribuicoes = ', '.join(f"{identificador(coluna)} = COALESCE({identificador(coluna)}, ?)"
+                                            for coluna in valores)
+                    conn.execute(f"UPDATE pneus SET {atribuicoes} WHERE id = ?", [*valores.values(), valores['id']])
+                else:
+                    visao.inserir(conn, registro)
+            copiadas += len(registros)
+
+        # O calendário do banco antigo prevalece sobre etapas de mesmo número já gravadas
+        for registro in etapas:
+            conn.execute("DELETE FROM etapas WHERE numero = ?", (registro.get('Etapa'),))
+            VISAO_ETAPAS.inserir(conn, registro)
+        copiadas += len(etapas)
+
+        conn.executemany("INSERT OR IGNORE INTO estado (chave, valor) VALUES (?, ?)", estado.items())
+        conn.execute("INSERT OR REPLACE INTO estado (chave, valor) VALUES ('banco_legado', ?)", (origem,))
+    return copiadas
+
+
+def apagar_dados_app1(pool):
+    """Apaga os pneus, sets, medições e histórico de etapas do app1 (o "Limpar Sistema").
+
+    São do app1 os pneus e sets com etapa; os criados só no v2_2 ficam.
+    Outings registrados no v2_2 com sets do app1 saem junto, com o histórico
+    e o resumo de uso dos pneus apagados.
+    """
+    pneus = "SELECT id FROM pneus WHERE etapa_atual IS NOT NULL"
+    outings = "SELECT id FROM outings WHERE set_id IN (SELECT id FROM sets WHERE etapa IS NOT NULL)"
+    with pool.transacao(('pneus', 'sets', 'outings', 'historico_pneus', 'resumo_uso_pneus',
+                         'medicoes', 'historico_etapas')) as conn:
+        conn.execute(f"DELETE FROM historico_pneus WHERE outing_id IN ({outings}) OR pneu_id IN ({pneus})")
+        conn.execute(f"DELETE FROM resumo_uso_pneus WHERE pneu_id IN ({pneus})")
+        conn.execute(f"DELETE FROM outings WHERE id IN ({outings})")
+        conn.execute("DELETE FROM sets WHERE etapa IS NOT NULL")
+        conn.execute("DELETE FROM pneus WHERE etapa_atual IS NOT NULL")
+        conn.execute("DELETE FROM medicoes")
+        conn.execute("DELETE FROM historico_etapas")
@@ -0,0 +1,120 @@
+"""
+Séries temporais de profundidade de banda por pneu
+
+As medições ficam em arrays numpy compactos (instante, km e as quatro
+profundidades), ordenados por pneu e depois por data/hora real, com as
+medições de cada pneu contíguas: a série de um pneu é uma fatia obtida
+em O(1) pelo dicionário de intervalos. As taxas de desgaste de todos os
+pneus saem de somas agrupadas (np.add.reduceat), sem laço por pneu.
+Usado pelo app1.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Posições medidas na banda, na ordem das colunas de `profundidades`
+POSICOES_BANDA = ('Interno', 'Centro Interno', 'Centro Externo', 'Externo')
+
+# Formatos de 'Data Medição' gravados pelo app (com e sem hora)
+FORMATOS_DATA = ('%d/%m/%Y %H:%M', '%d/%m/%Y')
+
+
+def converter_datas(valores):
+    """Texto dd/mm/aaaa [hh:mm] -> datetime64 (NaT se não reconhecido)"""
+    valores = pd.Series(valores, dtype=object).astype(str)
+    datas = pd.to_datetime(valores, format=FORMATOS_DATA[0], errors='coerce')
+    for formato in FORMATOS_DATA[1:]:
+        faltando = datas.isna()
+        if not faltando.any():
+            break
+        datas[faltando] = pd.to_datetime(valores[faltando], format=formato, errors='coerce')
+    return datas.to_numpy(dtype='datetime64[s]')
+
+
+class SeriesProfundidade:
+    """Medições de profundidade de todos os pneus, agrupadas por pneu em ordem cronológica"""
+
+    def __init__(self, pneus, instantes, km, profundidades):
+        pneus = np.asarray(pneus, dtype=object)
+        instantes = np.asarray(instantes, dtype='datetime64[s]')
+        km = np.asarray(km, dtype=np.float32)
+        profundidades = np.asarray(profundidades, dtype=np.float32).reshape(len(pneus), len(POSICOES_BANDA))
+
+        # Pneu, depois instante; empates (mesmo minuto) mantêm a ordem de registro
+        codigos, nomes = pd.factorize(pneus, sort=True)
+        ordem = np.lexsort((np.arange(len(pneus)), instantes, codigos))
+
+        self.pneus = list(nomes)
+        self.instantes = instantes[ordem]
+        self.km = km[ordem]
+        self.profundidades = profundidades[ordem]
+        codigos = codigos[ordem]
+        self.inicios = np.searchsorted(codigos, np.arange(len(self.pneus)))
+        self._intervalos = {
+            pneu: (inicio, fim)
+            for pneu, inicio, fim in zip(self.pneus, self.inicios, list(self.inicios[1:]) + [len(codigos)])
+        }
+
+    @classmethod
+    def de_medicoes(cls, df_medicoes):
+        """Monta as séries a partir das medições do app1 (colunas 'Código do Pneu', 'Data Medição', ...)"""
+        colunas_mm = [f'{posicao} (mm)' for posicao in POSICOES_BANDA]
+        if len(df_medicoes) == 0:
+            return cls([], [], [], np.empty((0, len(POSICOES_BANDA))))
+        return cls(
+            df_medicoes['Código do Pneu'].to_numpy(dtype=object),
+            converter_datas(df_medicoes['Data Medição']),
+            pd.to_numeric(df_medicoes['KM TOTAL'], errors='coerce').to_numpy(dtype=float),
+            df_medicoes[colunas_mm].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float),
+        )
+
+    def __len__(self):
+        return len(self.km)
+
+    def __contains__(self, pneu):
+        return pneu in self._intervalos
+
+    def serie(self, pneu):
+        """Medições do pneu em ordem cronológica: DataFrame com data, km, profundidades e média"""
+        inicio, fim = self._intervalos.get(pneu, (0, 0))
+        profundidades = self.profundidades[inicio:fim]
+        serie = pd.DataFrame(profundidades, columns=list(POSICOES_BANDA))
+        serie.insert(0, 'KM', self.km[inicio:fim])
+        serie.insert(0, 'Data', self.instantes[inicio:fim])
+        serie['Média'] = profundidades.mean(axis=1)
+        return serie
+
+    def taxas_desgaste(self):
+        """Taxa de desgaste (mm por 100 km) de cada pneu e posição, por mínimos quadrados de profundidade x km.
+
+        Vetorizado sobre todos os pneus; pneus com menos de duas medições em km diferentes ficam com NaN.
+        """
+        colunas = ['Pneu', 'Medições', 'KM', 'Profundidade Média'] + list(POSICOES_BANDA) + ['Média']
+        if len(self) == 0:
+            return pd.DataFrame(columns=colunas)
+
+        x = self.km.astype(float)
+        y = np.column_stack([self.profundidades, self.profundidades.mean(axis=1)]).astype(float)
+        validos = ~np.isnan(x)[:, None] & ~np.isnan(y)
+        x_valido = np.where(validos, x[:, None], 0.0)
+        y_valido = np.where(validos, y, 0.0)
+
+        # Somas por pneu (grupos contíguos a partir de self.inicios)
+        n = np.add.reduceat(validos.astype(float), self.inicios)
+        sx = np.add.reduceat(x_valido, self.inicios)
+        sy = np.add.reduceat(y_valido, self.inicios)
+        sxx = np.add.reduceat(x_valido ** 2, self.inicios)
+        sxy = np.add.reduceat(x_valido * y_valido, self.inicios)
+
+        variancia = n * sxx - sx ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inclinacao = np.where((n >= 2) & (variancia > 1e-9), (n * sxy - sx * sy) / variancia, np.nan)
+
+        # Última medição de cada pneu
+        ultimas = np.append(self.inicios[1:], len(self)) - 1
+        taxas = pd.DataFrame(-inclinacao * 100, columns=list(POSICOES_BANDA) + ['Média'])
+        taxas.insert(0, 'Profundidade Média', y[ultimas, -1])
+        taxas.insert(0, 'KM', x[ultimas])
+        taxas.insert(0, 'Medições', np.diff(np.append(self.inicios, len(self))))
+        taxas.insert(0, 'Pneu', self.pneus)
+        return taxas[colunas]
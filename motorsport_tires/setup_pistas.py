@@ -3,25 +3,30 @@
 
 import sqlite3
 
+from repositorio import CAMINHO_BANCO
+
+# Pistas principais do motorsport brasileiro (também usadas na carga inicial do sistema)
+PISTAS_BRASILEIRAS = [
+    # ID, Nome, Comprimento(km), Tipo, Sentido, Características, DE, DD, TE, TD
+    ('INTER7', 'Interlagos', 4.309, 'road', 'anti_horario', 'Abrasivo - Desgasta mais lado direito', 'medio', 'alto', 'medio', 'alto'),
+    ('GOIA8', 'Goiânia', 3.835, 'road', 'horario', 'Suave - Desgaste equilibrado', 'medio', 'medio', 'medio', 'medio'),
+    ('TARUM6', 'Tarumã', 3.012, 'oval', 'horario', 'Oval - Desgaste uniforme', 'medio', 'medio', 'medio', 'medio'),
+    ('VELOPA8', 'Velopark', 3.180, 'road', 'horario', 'Técnico - Abrasivo', 'alto', 'alto', 'medio', 'medio'),
+    ('CASCA8', 'Cascavel', 3.458, 'road', 'horario', 'Rápido - Suave', 'baixo', 'baixo', 'medio', 'medio'),
+    ('CURIT8', 'Curitiba', 2.432, 'road', 'horario', 'Urbano - Muito abrasivo', 'alto', 'alto', 'alto', 'alto'),
+    ('SANTA7', 'Santa Cruz do Sul', 3.567, 'road', 'horario', 'Misto - Desgaste médio', 'medio', 'medio', 'medio', 'medio'),
+    ('CAMPO6', 'Campo Grande', 3.433, 'road', 'anti_horario', 'Rápido - Desgasta lado esquerdo', 'alto', 'medio', 'alto', 'medio'),
+    ('LONDRI6', 'Londrina', 3.295, 'road', 'horario', 'Técnico - Abrasivo', 'alto', 'alto', 'medio', 'alto'),
+    ('CARUARU6', 'Caruaru', 3.048, 'road', 'horario', 'Nordeste - Muito abrasivo', 'alto', 'alto', 'alto', 'alto'),
+]
+
 def popular_pistas_brasileiras():
     """Popula o banco com as principais pistas do motorsport brasileiro"""
     
-    conn = sqlite3.connect('motorsport_tires.db')
+    conn = sqlite3.connect(CAMINHO_BANCO)
     cursor = conn.cursor()
     
-    pistas = [
-        # ID, Nome, Comprimento(km), Tipo, Sentido, Características, DE, DD, TE, TD
-        ('INTER7', 'Interlagos', 4.309, 'road', 'anti_horario', 'Abrasivo - Desgasta mais lado direito', 'medio', 'alto', 'medio', 'alto'),
-        ('GOIA8', 'Goiânia', 3.835, 'road', 'horario', 'Suave - Desgaste equilibrado', 'medio', 'medio', 'medio', 'medio'),
-        ('TARUM6', 'Tarumã', 3.012, 'oval', 'horario', 'Oval - Desgaste uniforme', 'medio', 'medio', 'medio', 'medio'),
-        ('VELOPA8', 'Velopark', 3.180, 'road', 'horario', 'Técnico - Abrasivo', 'alto', 'alto', 'medio', 'medio'),
-        ('CASCA8', 'Cascavel', 3.458, 'road', 'horario', 'Rápido - Suave', 'baixo', 'baixo', 'medio', 'medio'),
-        ('CURIT8', 'Curitiba', 2.432, 'road', 'horario', 'Urbano - Muito abrasivo', 'alto', 'alto', 'alto', 'alto'),
-        ('SANTA7', 'Santa Cruz do Sul', 3.567, 'road', 'horario', 'Misto - Desgaste médio', 'medio', 'medio', 'medio', 'medio'),
-        ('CAMPO6', 'Campo Grande', 3.433, 'road', 'anti_horario', 'Rápido - Desgasta lado esquerdo', 'alto', 'medio', 'alto', 'medio'),
-        ('LONDRI6', 'Londrina', 3.295, 'road', 'horario', 'Técnico - Abrasivo', 'alto', 'alto', 'medio', 'alto'),
-        ('CARUARU6', 'Caruaru', 3.048, 'road', 'horario', 'Nordeste - Muito abrasivo', 'alto', 'alto', 'alto', 'alto'),
-    ]
+    pistas = PISTAS_BRASILEIRAS
     
     for pista in pistas:
         cursor.execute('''
@@ -0,0 +1,103 @@
+"""
+Simulação Monte Carlo de fins de semana de corrida
+
+Cada cenário sorteia as voltas de cada sessão (a partir do histórico), a
+condição da pista em cada sessão e um fator de desgaste por pneu; o
+desgaste acumulado é comparado com o limiar vermelho de cada pneu. Tudo é
+vetorizado em numpy, em blocos de cenários para limitar a memória.
+Usado pelo motorsport_tires_v2_2.py.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Cenários por bloco: blocos x pneus x 8 bytes fica em poucos MB
+TAMANHO_BLOCO = 20_000
+
+
+@dataclass(frozen=True)
+class ResultadoSimulacao:
+    """Probabilidades por grupo (set) e por pneu, na ordem recebida"""
+    n_cenarios: int
+    prob_vermelho: np.ndarray
+    prob_vermelho_antes_corrida: np.ndarray
+    uso_mediano: np.ndarray
+    uso_p90: np.ndarray
+    prob_vermelho_pneu: np.ndarray
+
+
+def simular_fim_de_semana(desgaste_atual, limite_vermelho, desgaste_volta, grupo, voltas_sessoes,
+                          prob_condicao, cv_desgaste=0.10, n_cenarios=100_000, semente=None):
+    """Probabilidade de cada grupo de pneus passar do vermelho até o fim da última sessão.
+
+    desgaste_atual, limite_vermelho: por pneu (limite <= 0 nunca é atingido).
+    desgaste_volta: pneus x condições, desgaste de uma volta em cada condição.
+    grupo: índice do set de cada pneu (0..n_grupos-1).
+    voltas_sessoes: uma amostra de voltas por sessão, em ordem; a última é a corrida.
+    prob_condicao: probabilidade de cada condição (colunas de desgaste_volta) por sessão.
+    cv_desgaste: coeficiente de variação do ritmo de desgaste de cada pneu no fim de semana.
+
+    O uso é a fração do limiar vermelho consumida pelo pneu mais gasto do
+    grupo ao fim da corrida (mediana e percentil 90).
+    """
+    desgaste_atual = np.asarray(desgaste_atual, dtype=float)
+    limite = np.asarray(limite_vermelho, dtype=float)
+    limite = np.where(limite > 0, limite, np.inf)
+    por_volta = np.asarray(desgaste_volta, dtype=float).T  # condições x pneus
+    grupo = np.asarray(grupo, dtype=int)
+    amostras = [np.asarray(v, dtype=float) for v in voltas_sessoes]
+    prob = np.asarray(prob_condicao, dtype=float)
+    prob = prob / prob.sum()
+    n_grupos = int(grupo.max()) + 1 if len(grupo) else 0
+    if n_grupos == 0 or not amostras:
+        vazio = np.zeros(n_grupos)
+        return ResultadoSimulacao(0, vazio, vazio, vazio, vazio, np.zeros(len(grupo)))
+
+    rng = np.random.default_rng(semente)
+    sigma = np.sqrt(np.log1p(cv_desgaste ** 2))
+
+    # Pneus ordenados por grupo: o máximo de cada set sai de um reduceat sobre colunas contíguas
+    ordem = np.argsort(grupo, kind='stable')
+    inicio_grupo = np.searchsorted(grupo[ordem], np.arange(n_grupos))
+    desgaste_ordenado, limite_ordenado, por_volta_ordenado = desgaste_atual[ordem], limite[ordem], por_volta[:, ordem]
+
+    cruzou = np.zeros(n_grupos)
+    cruzou_antes = np.zeros(n_grupos)
+    cruzou_pneu = np.zeros(len(grupo))
+    usos = []
+    for inicio in range(0, n_cenarios, TAMANHO_BLOCO):
+        tamanho = min(TAMANHO_BLOCO, n_cenarios - inicio)
+
+        # Voltas de cada cenário em cada condição; a corrida fica separada
+        voltas_condicao = np.zeros((tamanho, len(prob)))
+        voltas_antes = voltas_condicao
+        linhas = np.arange(tamanho)
+        for s, amostra in enumerate(amostras):
+            if s == len(amostras) - 1:
+                voltas_antes = voltas_condicao.copy()
+            voltas = rng.choice(amostra, size=tamanho) if len(amostra) else np.zeros(tamanho)
+            condicao = rng.choice(len(prob), size=tamanho, p=prob)
+            voltas_condicao[linhas, condicao] += voltas
+
+        fator = np.exp(rng.standard_normal((tamanho, len(grupo)), dtype=np.float32) * np.float32(sigma)
+                       - np.float32(sigma ** 2 / 2))
+        uso_final = (desgaste_ordenado + fator * (voltas_condicao @ por_volta_ordenado)) / limite_ordenado
+        uso_antes = (desgaste_ordenado + fator * (voltas_antes @ por_volta_ordenado)) / limite_ordenado
+        uso_grupo = np.maximum.reduceat(uso_final, inicio_grupo, axis=1)
+
+        cruzou += (uso_grupo > 1).sum(axis=0)
+        cruzou_antes += (np.maximum.reduceat(uso_antes, inicio_grupo, axis=1) > 1).sum(axis=0)
+        cruzou_pneu[ordem] += (uso_final > 1).sum(axis=0)
+        usos.append(uso_grupo)
+
+    usos = np.concatenate(usos)
+    mediana, p90 = np.percentile(usos, [50, 90], axis=0)
+    return ResultadoSimulacao(
+        n_cenarios=n_cenarios,
+        prob_vermelho=cruzou / n_cenarios,
+        prob_vermelho_antes_corrida=cruzou_antes / n_cenarios,
+        uso_mediano=mediana,
+        uso_p90=p90,
+        prob_vermelho_pneu=cruzou_pneu / n_cenarios,
+    )
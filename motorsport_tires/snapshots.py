@@ -0,0 +1,130 @@
+"""
+Snapshots colunares (Arrow IPC) dos dados da temporada
+
+Cada tabela vira um arquivo .arrow sem compressão, com colunas tipadas,
+e um manifesto.json guarda a versão dos dados de origem. Os arquivos são
+abertos com memory-map: ler algumas colunas de uma temporada inteira não
+copia o resto do arquivo para a memória. Usado pelo app1.py (tabelas da
+sessão) e pelo motorsport_tires_v2_2.py (tabelas do banco compartilhado).
+"""
+
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+MANIFESTO = 'manifesto.json'
+EXTENSAO = '.arrow'
+
+
+def assinatura_banco(caminho):
+    """Versão de um arquivo SQLite: tamanho e mtime do banco e do WAL (mudam a cada commit)"""
+    partes = []
+    for arquivo in (caminho, caminho + '-wal'):
+        if os.path.exists(arquivo):
+            info = os.stat(arquivo)
+            partes.append(f"{info.st_size}:{info.st_mtime_ns}")
+    return '|'.join(partes)
+
+
+def tabela_arrow(df):
+    """DataFrame -> tabela Arrow; colunas de objetos com tipos misturados viram texto"""
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        try:
+            colunas[str(coluna)] = pa.array(serie, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            colunas[str(coluna)] = pa.array(serie.map(lambda v: None if pd.isna(v) else str(v)), type=pa.string())
+    return pa.table(colunas)
+
+
+def _gravar_atomico(caminho, escrever):
+    """Escreve num temporário único da mesma pasta e o troca pelo arquivo de uma vez:
+    duas gravações simultâneas (outra sessão, o outro app) não escrevem no mesmo arquivo"""
+    pasta, nome = os.path.split(caminho)
+    with tempfile.NamedTemporaryFile(dir=pasta, prefix=nome + '.', suffix='.tmp', delete=False) as arquivo:
+        temporario = arquivo.name
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporario)
+        raise
+
+
+def gravar_snapshot(pasta, tabelas, versao=None):
+    """Grava {nome: DataFrame} em `pasta` e o manifesto com a `versao` dos dados de origem"""
+    os.makedirs(pasta, exist_ok=True)
+    descricao = {}
+    for nome, df in tabelas.items():
+        tabela = tabela_arrow(df)
+
+        def escrever(caminho, tabela=tabela):
+            with pa.OSFile(caminho, 'wb') as arquivo, ipc.new_file(arquivo, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+
+        _gravar_atomico(os.path.join(pasta, nome + EXTENSAO), escrever)
+        descricao[nome] = {'linhas': tabela.num_rows,
+                           'colunas': {campo.name: str(campo.type) for campo in tabela.schema}}
+
+    # O manifesto por último: quem o lê encontra os arquivos da versão indicada (ou mais novos)
+    manifesto = {'versao': versao, 'gerado_em': datetime.now().isoformat(timespec='seconds'), 'tabelas': descricao}
+
+    def escrever_manifesto(caminho):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+
+    _gravar_atomico(os.path.join(pasta, MANIFESTO), escrever_manifesto)
+    return manifesto
+
+
+def ler_manifesto(pasta):
+    """Manifesto do snapshot (dict) ou None se ainda não houver snapshot na pasta"""
+    try:
+        with open(os.path.join(pasta, MANIFESTO), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def atualizar_snapshot(pasta, versao, gerar_tabelas):
+    """Regrava o snapshot só se a versão mudou; `gerar_tabelas()` monta {nome: DataFrame}"""
+    manifesto = ler_manifesto(pasta)
+    if manifesto is not None and manifesto.get('versao') == versao:
+        return manifesto
+    return gravar_snapshot(pasta, gerar_tabelas(), versao)
+
+
+def ler_snapshot(pasta, nome, colunas=None):
+    """Lê a tabela `nome` do snapshot (memory-map), só com as `colunas` pedidas"""
+    with pa.memory_map(os.path.join(pasta, nome + EXTENSAO), 'r') as origem:
+        tabela = ipc.open_file(origem).read_all()
+        if colunas is not None:
+            tabela = tabela.select([coluna for coluna in colunas if coluna in tabela.column_names])
+        # Só as colunas escolhidas saem do arquivo mapeado para o DataFrame
+        return tabela.to_pandas()
+
+
+def tabelas_sqlite(caminho, tabelas=None):
+    """Lê as tabelas (todas as de usuário, por padrão) de um banco SQLite como DataFrames"""
+    conn = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+    try:
+        if tabelas is None:
+            tabelas = [linha[0] for linha in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        return {nome: pd.read_sql_query(f'SELECT * FROM "{nome}"', conn) for nome in tabelas}
+    finally:
+        conn.close()
+
+
+def snapshot_sqlite(caminho, pasta, tabelas=None):
+    """Snapshot das tabelas de um banco SQLite, regravado só quando o arquivo do banco mudou"""
+    return atualizar_snapshot(pasta, assinatura_banco(caminho), lambda: tabelas_sqlite(caminho, tabelas))
@@ -0,0 +1,151 @@
+"""
+Tabelas de registros para o estado de sessão do app1.py
+
+Cada tabela guarda uma lista por coluna (inserção O(1) amortizada) e um
+índice da coluna-chave (e de outras colunas pedidas, como o código de
+barras) para localizar/atualizar linhas sem varrer a tabela.
+O DataFrame só é montado quando uma tela precisa dele, e fica guardado até
+a próxima escrita: N inserções seguidas custam O(N), e não O(N²) como
+`pd.concat([df, nova_linha])` a cada envio de formulário.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class TabelaRegistros:
+    """Tabela colunar com índice opcional pela coluna `chave` e pelas colunas de `indices`.
+
+    O DataFrame de `df` é somente leitura: alterações devem passar por
+    adicionar/atualizar/remover, senão se perdem na próxima montagem.
+    """
+
+    def __init__(self, colunas, chave=None, indices=(), registros=()):
+        self.chave = chave
+        self._colunas = {coluna: [] for coluna in colunas}
+        self._tamanho = 0
+        # coluna indexada -> valor -> posições das linhas
+        self._indices = {coluna: {} for coluna in ([chave] if chave is not None else []) + list(indices)}
+        self._df = None
+        self.versao = 0
+        self.adicionar_varios(registros)
+
+    @classmethod
+    def de_dataframe(cls, df, chave=None, indices=()):
+        tabela = cls(df.columns, chave, indices)
+        tabela.substituir(df)
+        return tabela
+
+    @property
+    def colunas(self):
+        return list(self._colunas)
+
+    def __len__(self):
+        return self._tamanho
+
+    def __contains__(self, valor_chave):
+        return bool(self.posicoes(valor_chave))
+
+    def _alterou(self):
+        self._df = None
+        self.versao += 1
+
+    def _reindexar(self):
+        for coluna in self._indices:
+            indice = self._indices[coluna] = {}
+            for posicao, valor in enumerate(self._colunas.get(coluna, [None] * self._tamanho)):
+                indice.setdefault(valor, []).append(posicao)
+
+    def _inserir(self, registro):
+        for coluna in registro:
+            if coluna not in self._colunas:
+                self._colunas[coluna] = [None] * self._tamanho
+        for coluna, valores in self._colunas.items():
+            valores.append(registro.get(coluna))
+        for coluna, indice in self._indices.items():
+            indice.setdefault(registro.get(coluna), []).append(self._tamanho)
+        self._tamanho += 1
+
+    def adicionar(self, registro):
+        """Acrescenta uma linha (dict coluna -> valor); colunas ausentes ficam vazias"""
+        self._inserir(registro)
+        self._alterou()
+
+    def adicionar_varios(self, registros):
+        """Acrescenta várias linhas (dicts ou um DataFrame) com uma só invalidação"""
+        if isinstance(registros, pd.DataFrame):
+            registros = registros.to_dict('records')
+        quantidade = self._tamanho
+        for registro in registros:
+            self._inserir(registro)
+        if self._tamanho != quantidade:
+            self._alterou()
+
+    def posicoes(self, valor, coluna=None):
+        """Posições das linhas com o valor na coluna indexada (padrão: a chave); vazio se não existir"""
+        return self._indices.get(self.chave if coluna is None else coluna, {}).get(valor, [])
+
+    def obter(self, valor, coluna=None):
+        """Primeira linha com o valor na coluna indexada (padrão: a chave), como dict; None se não existir"""
+        posicoes = self.posicoes(valor, coluna)
+        if not posicoes:
+            return None
+        return {coluna: valores[posicoes[0]] for coluna, valores in self._colunas.items()}
+
+    def _atualizar_posicoes(self, posicoes, valores):
+        if not posicoes:
+            return 0
+        for coluna, valor in valores.items():
+            if coluna not in self._colunas:
+                self._colunas[coluna] = [None] * self._tamanho
+            destino = self._colunas[coluna]
+            for posicao in posicoes:
+                destino[posicao] = valor
+        if any(coluna in self._indices for coluna in valores):
+            self._reindexar()
+        self._alterou()
+        return len(posicoes)
+
+    def atualizar(self, valor_chave, valores):
+        """Atualiza as colunas de `valores` nas linhas com a chave; retorna quantas mudaram"""
+        return self._atualizar_posicoes(list(self.posicoes(valor_chave)), valores)
+
+    def atualizar_varios(self, valores_chave, valores):
+        """Mesmo valor em todas as linhas das chaves informadas"""
+        posicoes = [p for valor_chave in dict.fromkeys(valores_chave) for p in self.posicoes(valor_chave)]
+        return self._atualizar_posicoes(posicoes, valores)
+
+    def atualizar_onde(self, mascara, valores):
+        """Atualiza as linhas em que a máscara booleana (alinhada com `df`) é verdadeira"""
+        return self._atualizar_posicoes(np.flatnonzero(np.asarray(mascara, dtype=bool)).tolist(), valores)
+
+    def remover_onde(self, mascara):
+        """Remove as linhas da máscara (O(N), para remoções raras)"""
+        manter = ~np.asarray(mascara, dtype=bool)
+        if manter.all():
+            return 0
+        for coluna, valores in self._colunas.items():
+            self._colunas[coluna] = [v for v, m in zip(valores, manter) if m]
+        removidas = self._tamanho - int(manter.sum())
+        self._tamanho -= removidas
+        self._reindexar()
+        self._alterou()
+        return removidas
+
+    def remover(self, valor_chave):
+        posicoes = set(self.posicoes(valor_chave))
+        return self.remover_onde([p in posicoes for p in range(self._tamanho)])
+
+    def substituir(self, df):
+        """Troca todo o conteúdo pelo de um DataFrame (ex.: arquivo importado)"""
+        self._colunas = {coluna: df[coluna].tolist() for coluna in df.columns}
+        self._tamanho = len(df)
+        self._reindexar()
+        self._alterou()
+
+    @property
+    def df(self):
+        """DataFrame com todas as linhas, montado de uma vez e guardado até a próxima escrita"""
+        if self._df is None:
+            self._df = pd.DataFrame(self._colunas, columns=list(self._colunas))
+        return self._df
@@ -0,0 +1,63 @@
+"""Fixtures compartilhadas: os módulos de motorsport_tires/ num banco SQLite temporário"""
+
+import os
+import sys
+
+import pytest
+from pytest import approx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'motorsport_tires'))
+
+from dados import PoolConexoes  # noqa: E402
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = PoolConexoes(str(tmp_path / 'teste.db'))
+    yield pool
+    pool.fechar_todas()
+
+
+@pytest.fixture
+def app(pool, monkeypatch):
+    """motorsport_tires_v2_2 sobre um banco novo, migrado e com as pistas padrão"""
+    import motorsport_tires_v2_2 as app
+
+    monkeypatch.setattr(app, 'get_pool', lambda: pool)
+    app.init_database()
+    app.semear_dados_referencia()
+    return app
+
+
+@pytest.fixture
+def frota(app):
+    """Pneus P001-P008 e os sets S001 (P001-P004) e S002 (P005-P008)"""
+    for numero in range(1, 9):
+        assert app.PneuManager.cadastrar_pneu(f"P{numero:03d}", 'normal', 1000)
+    assert app.SetManager.criar_set('S001', 'Set 1', 'normal', 'P001', 'P002', 'P003', 'P004')
+    assert app.SetManager.criar_set('S002', 'Set 2', 'normal', 'P005', 'P006', 'P007', 'P008')
+    return app
+
+
+def estado_km(app):
+    """km de todos os pneus e de todas as linhas de histórico"""
+    with app.conexao() as conn:
+        pneus = conn.execute("SELECT id, km_atual, desgaste_atual FROM pneus ORDER BY id").fetchall()
+        historico = conn.execute(
+            "SELECT id, pneu_id, km_antes, km_depois, desgaste FROM historico_pneus ORDER BY id").fetchall()
+    return pneus, historico
+
+
+@pytest.fixture
+def confere_cadeia(app):
+    """Verifica que o km mantido pelas escritas é o mesmo de uma reconstrução completa do histórico"""
+    def conferir():
+        antes = estado_km(app)
+        assert app.OutingManager.recalcular_km_todos_pneus()
+        depois = estado_km(app)
+        for linhas_antes, linhas_depois in zip(antes, depois):
+            assert len(linhas_antes) == len(linhas_depois)
+            for linha_antes, linha_depois in zip(linhas_antes, linhas_depois):
+                assert linha_antes[0] == linha_depois[0]
+                assert linha_antes[1:] == approx(linha_depois[1:])
+    return conferir
@@ -0,0 +1,194 @@
+"""Pool de conexões, transações com SAVEPOINTs, cache de leituras e migrações (dados.py)"""
+
+import threading
+
+import pytest
+
+from dados import PoolConexoes, aplicar_migracoes, versao_esquema
+
+
+@pytest.fixture
+def tabela(pool):
+    with pool.transacao(('t',)) as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, valor TEXT)")
+    return pool
+
+
+def contar(pool):
+    return pool.valor("SELECT COUNT(*) FROM t")
+
+
+class Falha(Exception):
+    pass
+
+
+def test_commit_grava_e_avanca_a_versao(tabela):
+    versao = tabela.versao
+    with tabela.transacao(('t',)) as conn:
+        conn.execute("INSERT INTO t (valor) VALUES ('a')")
+    assert contar(tabela) == 1
+    assert tabela.versao == versao + 1
+
+
+def test_rollback_desfaz_a_transacao_inteira(tabela):
+    versao = tabela.versao
+    with pytest.raises(Falha):
+        with tabela.transacao(('t',)) as conn:
+            conn.execute("INSERT INTO t (valor) VALUES ('a')")
+            with tabela.transacao(('t',)) as interna:
+                interna.execute("INSERT INTO t (valor) VALUES ('b')")
+            raise Falha
+    assert contar(tabela) == 0
+    assert tabela.versao == versao
+
+
+def test_falha_em_bloco_aninhado_desfaz_so_o_savepoint(tabela):
+    with tabela.transacao(('t',)) as conn:
+        conn.execute("INSERT INTO t (valor) VALUES ('externa')")
+        with pytest.raises(Falha):
+            with tabela.transacao(('t',)) as interna:
+                interna.execute("INSERT INTO t (valor) VALUES ('interna')")
+                raise Falha
+        conn.execute("INSERT INTO t (valor) VALUES ('depois')")
+    assert [linha[0] for linha in tabela.ler("SELECT valor FROM t ORDER BY id").itertuples(index=False)] == \
+        ['externa', 'depois']
+
+
+def test_ao_desfazer_roda_so_no_rollback_do_seu_bloco(tabela):
+    chamadas = []
+    with tabela.transacao(('t',)):
+        tabela.ao_desfazer(lambda: chamadas.append('externa'))
+        with pytest.raises(Falha):
+            with tabela.transacao(('t',)):
+                tabela.ao_desfazer(lambda: chamadas.append('savepoint'))
+                raise Falha
+    assert chamadas == ['savepoint']
+
+    with pytest.raises(Falha):
+        with tabela.transacao(('t',)):
+            tabela.ao_desfazer(lambda: chamadas.append('rollback'))
+            raise Falha
+    assert chamadas == ['savepoint', 'rollback']
+
+
+def test_conexao_reentrante_e_devolvida_ao_pool(tabela):
+    with tabela.conexao() as conn:
+        with tabela.conexao() as interna:
+            assert interna is conn
+    with tabela.conexao() as de_novo:
+        assert de_novo is conn
+    assert tabela.conexoes_abertas == 1
+
+
+def test_threads_usam_conexoes_separadas(tabela):
+    conexoes = []
+    barreira = threading.Barrier(2)
+
+    def emprestar():
+        with tabela.conexao() as conn:
+            conexoes.append(conn)
+            barreira.wait()
+
+    threads = [threading.Thread(target=emprestar) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert conexoes[0] is not conexoes[1]
+
+
+def test_cache_serve_leituras_ate_o_commit_da_tabela(tabela):
+    def ler():
+        return tabela.ler_em_cache('todos', ('t',), "SELECT * FROM t")
+
+    assert len(ler()) == 0
+    assert len(ler()) == 0
+    assert tabela.cache.acertos == 1
+
+    # Commit em outra tabela não invalida
+    with tabela.transacao(('outra',)) as conn:
+        conn.execute("INSERT INTO t (valor) VALUES ('fora do cache')")
+    assert len(ler()) == 0
+
+    with tabela.transacao(('t',)) as conn:
+        conn.execute("INSERT INTO t (valor) VALUES ('a')")
+    assert len(ler()) == 2
+
+
+def test_leitura_dentro_de_transacao_desfeita_nao_fica_no_cache(tabela):
+    def ler():
+        return tabela.ler_em_cache('todos', ('t',), "SELECT * FROM t")
+
+    assert len(ler()) == 0
+    with pytest.raises(Falha):
+        with tabela.transacao(('t',)) as conn:
+            conn.execute("INSERT INTO t (valor) VALUES ('a')")
+            # Dentro da transação enxerga a própria escrita...
+            assert len(ler()) == 1
+            raise Falha
+    # ...mas ela não sobrevive ao rollback
+    assert len(ler()) == 0
+    assert contar(tabela) == 0
+
+
+def test_copia_do_cache_pode_ser_alterada(tabela):
+    df = tabela.ler_em_cache('todos', ('t',), "SELECT * FROM t")
+    df['nova'] = 1
+    assert 'nova' not in tabela.ler_em_cache('todos', ('t',), "SELECT * FROM t").columns
+
+
+def test_escrita_de_outro_processo_invalida_o_cache(tabela):
+    # Outro pool no mesmo arquivo faz o papel do outro app
+    outro = PoolConexoes(tabela.caminho)
+    try:
+        assert len(tabela.ler_em_cache('todos', ('t',), "SELECT * FROM t")) == 0
+        versao = tabela.versao
+
+        with outro.transacao(('t',)) as conn:
+            conn.execute("INSERT INTO t (valor) VALUES ('do outro app')")
+
+        assert len(tabela.ler_em_cache('todos', ('t',), "SELECT * FROM t")) == 1
+        assert tabela.versao > versao
+        # Sem novas escritas externas o cache volta a servir
+        tabela.ler_em_cache('todos', ('t',), "SELECT * FROM t")
+        assert tabela.cache.acertos == 1
+    finally:
+        outro.fechar_todas()
+
+
+def test_migracoes_aplicadas_uma_vez_e_em_ordem(pool):
+    aplicadas_em = []
+
+    def criar(conn):
+        aplicadas_em.append(1)
+        conn.execute("CREATE TABLE a (x)")
+
+    def alterar(conn):
+        aplicadas_em.append(2)
+        conn.execute("ALTER TABLE a ADD COLUMN y")
+
+    migracoes = ((1, "cria", criar), (2, "altera", alterar))
+    assert aplicar_migracoes(pool, migracoes) == [1, 2]
+    assert aplicar_migracoes(pool, migracoes) == []
+    assert aplicadas_em == [1, 2]
+    assert versao_esquema(pool) == 2
+
+
+def test_migracao_com_erro_nao_fica_pela_metade(pool):
+    def quebrada(conn):
+        conn.execute("CREATE TABLE b (x)")
+        raise Falha
+
+    with pytest.raises(Falha):
+        aplicar_migracoes(pool, ((1, "cria a", lambda conn: conn.execute("CREATE TABLE a (x)")),
+                                 (2, "quebrada", quebrada)))
+    assert versao_esquema(pool) == 1
+    assert pool.valor("SELECT COUNT(*) FROM sqlite_master WHERE name = 'b'") == 0
+
+
+def test_pool_descartado_fecha_todas_as_conexoes(tabela):
+    with tabela.conexao():
+        tabela.descartar()
+        # Conexão emprestada durante o descarte: fecha quando voltar
+        assert tabela.conexoes_abertas == 1
+    assert tabela.conexoes_abertas == 0
@@ -0,0 +1,105 @@
+"""Importação em massa de outings (OutingManager.importar_outings)"""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import estado_km
+
+
+def arquivo_outings(quantidade, semente=0):
+    """Export do cronometrista: datas fora de ordem, pista e set por ID ou nome"""
+    gerador = np.random.default_rng(semente)
+    return pd.DataFrame({
+        'Data': [f"2026-03-{dia:02d}" for dia in gerador.integers(1, 29, quantidade)],
+        'Pista': gerador.choice(['INTER7', 'Goiânia', 'cascavel'], quantidade),
+        'Set': gerador.choice(['S001', 'S002', 'Set 2'], quantidade),
+        'Sessão': gerador.choice(['treino', 'corrida', ''], quantidade),
+        'Condição': gerador.choice(['seco', 'molhado'], quantidade),
+        'Voltas': gerador.integers(1, 30, quantidade).astype(str),
+        'Obs': '',
+    })
+
+
+MAPEAMENTO = {'data': 'Data', 'pista_id': 'Pista', 'set_id': 'Set', 'tipo_sessao': 'Sessão',
+              'condicao': 'Condição', 'voltas': 'Voltas', 'observacoes': 'Obs'}
+
+
+def test_importacao_em_lotes_grava_tudo_e_mantem_a_cadeia(frota, confere_cadeia):
+    df = arquivo_outings(60)
+    resultado = frota.OutingManager.importar_outings(df, MAPEAMENTO, tamanho_lote=7)
+
+    assert resultado.importados == 60
+    assert resultado.lotes == 9
+    assert resultado.erros.empty
+    with frota.conexao() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM outings").fetchone()[0] == 60
+        assert conn.execute("SELECT COUNT(*) FROM historico_pneus").fetchone()[0] == 240
+    confere_cadeia()
+
+
+def test_importacao_retroativa_reencadeia_o_historico(frota, confere_cadeia):
+    assert frota.OutingManager.registrar_outing('2026-03-20', 'INTER7', 'S001', 'treino', 'seco', 10)
+    resultado = frota.OutingManager.importar_outings(arquivo_outings(30, semente=1), MAPEAMENTO, tamanho_lote=4)
+
+    assert resultado.importados == 30
+    confere_cadeia()
+
+
+def test_importacao_equivale_a_registrar_um_a_um(app, tmp_path, monkeypatch):
+    from dados import PoolConexoes
+
+    df = arquivo_outings(25, semente=2)
+
+    def montar_frota():
+        for numero in range(1, 9):
+            app.PneuManager.cadastrar_pneu(f"P{numero:03d}", 'normal', 1000)
+        app.SetManager.criar_set('S001', 'Set 1', 'normal', 'P001', 'P002', 'P003', 'P004')
+        app.SetManager.criar_set('S002', 'Set 2', 'normal', 'P005', 'P006', 'P007', 'P008')
+
+    montar_frota()
+    assert app.OutingManager.importar_outings(df, MAPEAMENTO, tamanho_lote=6).importados == 25
+    importado = estado_km(app)
+
+    # Mesmas linhas, uma a uma pelo formulário, num segundo banco
+    outro = PoolConexoes(str(tmp_path / 'um_a_um.db'))
+    monkeypatch.setattr(app, 'get_pool', lambda: outro)
+    app.init_database()
+    app.semear_dados_referencia()
+    montar_frota()
+    validas, _, _ = app.OutingManager._validar_importacao(df, MAPEAMENTO)
+    for linha in validas.itertuples():
+        assert app.OutingManager.registrar_outing(linha.data, linha.pista_id, linha.set_id, linha.tipo_sessao,
+                                                  linha.condicao, int(linha.voltas))
+    um_a_um = estado_km(app)
+    outro.fechar_todas()
+
+    for linhas_importadas, linhas_registradas in zip(importado, um_a_um):
+        assert [linha[:2] for linha in linhas_importadas] == [linha[:2] for linha in linhas_registradas]
+        for linha_importada, linha_registrada in zip(linhas_importadas, linhas_registradas):
+            assert linha_importada[2:] == pytest.approx(linha_registrada[2:])
+
+
+def test_linhas_invalidas_sao_reportadas_sem_gravar(frota):
+    df = pd.DataFrame({
+        'data': ['2026-03-01', '31/02/2026', '05/03/2026', '2026-03-02', '2026-03-03'],
+        'pista_id': ['INTER7', 'INTER7', 'Pista X', 'INTER7', 'INTER7'],
+        'set_id': ['S001', 'S001', 'S001', 'S999', 'S002'],
+        'tipo_sessao': ['treino', 'treino', 'treino', 'treino', 'sprint'],
+        'condicao': ['seco'] * 5,
+        'voltas': ['10', '5', '2.5', '3', '0'],
+    })
+    resultado = frota.OutingManager.importar_outings(df)
+
+    assert resultado.importados == 1
+    erros = set(map(tuple, resultado.erros[['linha', 'campo']].to_numpy().tolist()))
+    assert erros == {(3, 'data'), (4, 'pista_id'), (4, 'voltas'), (5, 'set_id'), (6, 'tipo_sessao'), (6, 'voltas')}
+
+
+def test_leitura_de_csv_com_separador_detectado(app):
+    arquivo = io.StringIO("data;pista_id;set_id;voltas\n2026-03-01;INTER7;S001;10\n2026-03-02;INTER7;S001;12\n")
+    df = app.OutingManager.ler_arquivo_importacao(arquivo, 'sessoes.csv')
+    assert list(df.columns) == ['data', 'pista_id', 'set_id', 'voltas']
+    assert df['voltas'].tolist() == ['10', '12']
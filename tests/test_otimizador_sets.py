@@ -0,0 +1,72 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from otimizador_sets import CUSTO_PROIBIDO, montar_sets, resolver_atribuicao
+
+
+def custo_minimo_forca_bruta(custos):
+    n, m = custos.shape
+    return min(custos[np.arange(n), list(colunas)].sum() for colunas in itertools.permutations(range(m), n))
+
+
+@pytest.mark.parametrize('semente', range(40))
+def test_atribuicao_igual_forca_bruta(semente):
+    rng = np.random.default_rng(semente)
+    n = int(rng.integers(1, 6))
+    m = int(rng.integers(n, 7))
+    # Inteiros pequenos forçam empates entre atribuições
+    custos = rng.integers(0, 10, size=(n, m)).astype(float) if semente % 2 else rng.random((n, m))
+
+    atribuicao = resolver_atribuicao(custos)
+
+    assert len(set(atribuicao)) == n
+    assert ((atribuicao >= 0) & (atribuicao < m)).all()
+    assert custos[np.arange(n), atribuicao].sum() == pytest.approx(custo_minimo_forca_bruta(custos))
+
+
+def test_atribuicao_com_pares_proibidos():
+    custos = np.array([[CUSTO_PROIBIDO, 1.0, 5.0],
+                       [2.0, CUSTO_PROIBIDO, 1.0],
+                       [1.0, 3.0, CUSTO_PROIBIDO]])
+    assert list(resolver_atribuicao(custos)) == [1, 2, 0]
+
+
+def test_atribuicao_mais_linhas_que_colunas():
+    with pytest.raises(ValueError):
+        resolver_atribuicao(np.zeros((3, 2)))
+
+
+def test_montar_sets_igual_forca_bruta():
+    rng = np.random.default_rng(7)
+    desgaste = rng.uniform(0, 800, 6)
+    limite = np.full(6, 1000.0)
+    desgaste_vaga = np.array([120.0, 120.0, 90.0, 90.0])
+
+    escolha = montar_sets(desgaste, limite, desgaste_vaga)
+
+    custos = ((desgaste[None, :] + desgaste_vaga[:, None]) / limite[None, :]) ** 2
+    assert len(set(escolha)) == 4
+    assert custos[np.arange(4), escolha].sum() == pytest.approx(custo_minimo_forca_bruta(custos))
+
+
+def test_montar_sets_respeita_compatibilidade_e_deixa_vaga_vazia():
+    # Dois carros: o carro B só tem um pneu, então três vagas dele ficam vazias
+    carros_pneus = np.array(['A', 'A', 'A', 'A', 'B'])
+    carros_vagas = np.array(['A'] * 4 + ['B'] * 4)
+    compativel = carros_vagas[:, None] == carros_pneus[None, :]
+
+    escolha = montar_sets(np.zeros(5), np.full(5, 1000.0), np.full(8, 100.0), compativel)
+
+    assert sorted(escolha[:4]) == [0, 1, 2, 3]
+    assert sorted(escolha[4:]) == [-1, -1, -1, 4]
+
+
+def test_montar_sets_prioridade_recebe_pneus_mais_novos():
+    desgaste = np.array([900.0, 0.0, 10.0, 800.0, 20.0, 850.0, 30.0, 700.0])
+    prioridade = np.array([2] * 4 + [1] * 4)
+
+    escolha = montar_sets(desgaste, np.full(8, 1000.0), np.full(8, 50.0), prioridade=prioridade)
+
+    assert sorted(escolha[:4]) == [1, 2, 4, 6]
@@ -0,0 +1,135 @@
+"""Cadeia de km dos pneus (historico_pneus.km_antes/km_depois e pneus.km_atual) nas escritas de outings"""
+
+import pytest
+
+PISTA = 'INTER7'  # Interlagos, 4.309 km
+
+
+def km_atual(app, *pneu_ids):
+    with app.conexao() as conn:
+        km = dict(conn.execute("SELECT id, km_atual FROM pneus"))
+    return [km[pneu_id] for pneu_id in pneu_ids]
+
+
+def outing_id(app, data, set_id):
+    with app.conexao() as conn:
+        return conn.execute("SELECT MAX(id) FROM outings WHERE data = ? AND set_id = ?", (data, set_id)).fetchone()[0]
+
+
+def test_registrar_outing_soma_km_aos_pneus_do_set(frota):
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+    assert km_atual(frota, 'P001', 'P004', 'P005') == pytest.approx([43.09, 43.09, 0])
+
+
+def test_pneu_com_km_em_branco_entra_no_outing(frota):
+    # Pneu cadastrado sem km (ex.: importado do app1 com a célula vazia) conta como 0 km
+    with frota.transacao('pneus') as conn:
+        conn.execute("UPDATE pneus SET km_atual = NULL, desgaste_atual = NULL WHERE id = 'P002'")
+
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+
+    assert km_atual(frota, 'P001', 'P002') == pytest.approx([43.09, 43.09])
+    with frota.conexao() as conn:
+        assert conn.execute("SELECT km_antes, km_depois FROM historico_pneus WHERE pneu_id = 'P002'").fetchall() == \
+            pytest.approx([(0, 43.09)])
+    assert frota.ResumoUsoManager.resumo_pneu('P002').usos == 1
+    assert frota.ResumoUsoManager.verificar_consistencia().empty
+
+
+def test_edicao_reencadeia_outings_posteriores(frota, confere_cadeia):
+    for data, voltas in (('2026-03-01', 10), ('2026-03-02', 5), ('2026-03-03', 2)):
+        assert frota.OutingManager.registrar_outing(data, PISTA, 'S001', 'treino', 'seco', voltas)
+
+    primeiro = outing_id(frota, '2026-03-01', 'S001')
+    assert frota.OutingManager.atualizar_outing(primeiro, '2026-03-01', PISTA, 'S001', 'treino', 'seco', 20)
+
+    assert km_atual(frota, 'P001') == pytest.approx([27 * 4.309])
+    with frota.conexao() as conn:
+        cadeia = conn.execute('''
+            SELECT h.km_antes, h.km_depois FROM historico_pneus h JOIN outings o ON o.id = h.outing_id
+            WHERE h.pneu_id = 'P001' ORDER BY o.data, o.id
+        ''').fetchall()
+    assert cadeia == pytest.approx([(0, 20 * 4.309), (20 * 4.309, 25 * 4.309), (25 * 4.309, 27 * 4.309)])
+    confere_cadeia()
+
+
+def test_mudar_data_reordena_a_cadeia(frota, confere_cadeia):
+    for data, voltas in (('2026-03-01', 10), ('2026-03-05', 5)):
+        assert frota.OutingManager.registrar_outing(data, PISTA, 'S001', 'treino', 'seco', voltas)
+
+    # O segundo outing passa a ser o primeiro
+    segundo = outing_id(frota, '2026-03-05', 'S001')
+    assert frota.OutingManager.atualizar_outing(segundo, '2026-02-20', PISTA, 'S001', 'treino', 'seco', 5)
+
+    with frota.conexao() as conn:
+        km_antes = conn.execute("SELECT km_antes FROM historico_pneus WHERE outing_id = ? AND pneu_id = 'P001'",
+                                (segundo,)).fetchone()[0]
+    assert km_antes == pytest.approx(0)
+    assert km_atual(frota, 'P001') == pytest.approx([15 * 4.309])
+    confere_cadeia()
+
+
+def test_exclusao_reverte_km_e_reencadeia(frota, confere_cadeia):
+    for data, voltas in (('2026-03-01', 10), ('2026-03-02', 5), ('2026-03-03', 2)):
+        assert frota.OutingManager.registrar_outing(data, PISTA, 'S001', 'treino', 'seco', voltas)
+
+    assert frota.OutingManager.excluir_outing(outing_id(frota, '2026-03-02', 'S001'))
+    assert km_atual(frota, 'P001', 'P002', 'P003', 'P004') == pytest.approx([12 * 4.309] * 4)
+    confere_cadeia()
+
+    # Excluir tudo devolve os pneus ao km de antes do primeiro outing
+    for data in ('2026-03-01', '2026-03-03'):
+        assert frota.OutingManager.excluir_outing(outing_id(frota, data, 'S001'))
+    assert km_atual(frota, 'P001') == pytest.approx([0])
+
+
+def test_exclusao_preserva_base_de_km_manual(frota):
+    frota.PneuManager.atualizar_km_pneu('P001', 250)
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+    assert frota.OutingManager.excluir_outing(outing_id(frota, '2026-03-01', 'S001'))
+    assert km_atual(frota, 'P001') == pytest.approx([250])
+
+
+def test_troca_de_set_move_o_km_para_os_pneus_novos(frota, confere_cadeia):
+    for pneu_id in ('P005', 'P006', 'P007', 'P008'):
+        frota.PneuManager.atualizar_km_pneu(pneu_id, 300)
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 4)
+    km_outing = 4 * 4.309
+
+    outing = outing_id(frota, '2026-03-01', 'S001')
+    assert frota.OutingManager.atualizar_outing(outing, '2026-03-01', PISTA, 'S002', 'treino', 'seco', 4)
+
+    assert km_atual(frota, 'P001', 'P002', 'P003', 'P004') == pytest.approx([0] * 4)
+    assert km_atual(frota, 'P005', 'P006', 'P007', 'P008') == pytest.approx([300 + km_outing] * 4)
+    with frota.conexao() as conn:
+        linhas = conn.execute("SELECT pneu_id, km_antes, km_depois FROM historico_pneus WHERE outing_id = ?",
+                              (outing,)).fetchall()
+    assert sorted(linhas) == pytest.approx([(f"P00{n}", 300, 300 + km_outing) for n in range(5, 9)])
+    confere_cadeia()
+
+
+def test_troca_de_set_para_pneus_com_historico_posterior(frota, confere_cadeia):
+    # S002 já rodou depois da data do outing que vai ser movido para ele
+    for pneu_id in ('P005', 'P006', 'P007', 'P008'):
+        frota.PneuManager.atualizar_km_pneu(pneu_id, 100)
+    assert frota.OutingManager.registrar_outing('2026-03-10', PISTA, 'S002', 'treino', 'seco', 10)
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 4)
+
+    outing = outing_id(frota, '2026-03-01', 'S001')
+    assert frota.OutingManager.atualizar_outing(outing, '2026-03-01', PISTA, 'S002', 'treino', 'seco', 4)
+
+    assert km_atual(frota, 'P001') == pytest.approx([0])
+    assert km_atual(frota, 'P005') == pytest.approx([100 + 14 * 4.309])
+    confere_cadeia()
+
+
+def test_outing_retroativo_reencadeia_os_posteriores(frota, confere_cadeia):
+    assert frota.OutingManager.registrar_outing('2026-03-10', PISTA, 'S001', 'treino', 'seco', 10)
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 5)
+
+    with frota.conexao() as conn:
+        km_antes = conn.execute("SELECT km_antes FROM historico_pneus WHERE outing_id = ? AND pneu_id = 'P001'",
+                                (outing_id(frota, '2026-03-10', 'S001'),)).fetchone()[0]
+    assert km_antes == pytest.approx(5 * 4.309)
+    assert km_atual(frota, 'P001') == pytest.approx([15 * 4.309])
+    confere_cadeia()
@@ -0,0 +1,67 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from planejador_temporada import (LIMITE_COMPRA_ETAPA, LIMITE_COMPRA_PRIMEIRA, PENALIDADE_FALTA,
+                                  PNEUS_PROXIMA_ETAPA, planejar_temporada)
+
+LIMITE_KM = 100
+FOLGA = 0.5
+
+CALENDARIO = pd.DataFrame({'Etapa': [1, 2, 3], 'Pista': ['A', 'B', 'A'], 'Tipo': ['Regular'] * 3})
+PISTAS = pd.DataFrame({'Nome': ['A', 'B'], 'KM por Volta': [2.0, 3.0]})
+# Um pneu da etapa 1 com 30 km (70 km de vida)
+CADASTRO = pd.DataFrame({'Etapa Atual': [1], 'Etapa Cadastro': [1], 'Status Etapa': ['Disponível'],
+                         'Limite KM': [LIMITE_KM], 'Quilometragem atual': [30.0]})
+
+
+def pontos(vida, demanda, peso, compra):
+    return (peso * min(vida, demanda * (1 + FOLGA)) - PENALIDADE_FALTA * max(demanda - vida, 0)
+            - 1e-6 * compra)
+
+
+def melhor_forca_bruta(demandas, pesos, orcamento, limites):
+    melhor = -float('inf')
+    for compras in itertools.product(*(range(limite + 1) for limite in limites)):
+        if sum(compras) > orcamento:
+            continue
+        vida_levada, total = LIMITE_KM - 30.0, 0.0
+        for i, (compra, demanda, peso) in enumerate(zip(compras, demandas, pesos)):
+            vida = vida_levada + compra * LIMITE_KM
+            total += pontos(vida, demanda, peso, compra)
+            vida_levada = min(max(vida - demanda, 0), PNEUS_PROXIMA_ETAPA * LIMITE_KM)
+        melhor = max(melhor, total)
+    return melhor
+
+
+@pytest.mark.parametrize('voltas, pesos, orcamento', [
+    ([10, 15, 5], [1, 1, 1], 6),
+    ([10, 15, 5], [1, 3, 1], 4),
+    ([30, 5, 40], [1, 1, 3], 5),
+    ([5, 5, 5], [1, 1, 1], 2),
+])
+def test_plano_igual_forca_bruta(voltas, pesos, orcamento):
+    plano = planejar_temporada(CALENDARIO, PISTAS, CADASTRO, 1, ['Carro A'], voltas, pesos,
+                               limite_km=LIMITE_KM, orcamento=orcamento, folga=FOLGA, resolucao_km=1)
+
+    demandas = plano['Necessário (km)'].tolist()
+    total = sum(pontos(vida, demanda, peso, compra) for vida, demanda, peso, compra in
+                zip(plano['Vida Disponível (km)'], demandas, pesos, plano['Comprar']))
+    limites = [min(LIMITE_COMPRA_PRIMEIRA - 1, orcamento), min(LIMITE_COMPRA_ETAPA, orcamento),
+               min(LIMITE_COMPRA_ETAPA, orcamento)]
+
+    assert plano['Comprar'].sum() <= orcamento
+    assert total == pytest.approx(melhor_forca_bruta(demandas, pesos, orcamento, limites), abs=1e-3)
+
+
+def test_plano_respeita_o_regulamento():
+    plano = planejar_temporada(CALENDARIO, PISTAS, CADASTRO, 1, ['Carro A', 'Carro B'], [200, 200, 200],
+                               [1, 1, 1], limite_km=LIMITE_KM)
+
+    # O pneu já comprado na etapa 1 conta no limite dela
+    assert plano['Comprar'].tolist() == [LIMITE_COMPRA_PRIMEIRA - 1, LIMITE_COMPRA_ETAPA, LIMITE_COMPRA_ETAPA]
+    assert (plano['Levar'] <= PNEUS_PROXIMA_ETAPA).all()
+    assert plano['Levar'].iloc[-1] == 0
+    qtd_inicial = [1] + plano['Levar'].tolist()[:-1]
+    assert (plano['Descartar'] == pd.Series(qtd_inicial) + plano['Comprar'] - plano['Levar']).all()
@@ -0,0 +1,75 @@
+"""Previsão de vida útil com o fator individual das medições de profundidade do app1 (tabela medicoes)"""
+
+import functools
+
+import pandas as pd
+import pytest
+
+PISTA = 'INTER7'  # Interlagos, 4.309 km
+
+
+def medir(app, pneu_id, pontos, media=True):
+    """Grava medições (km, profundidade) como o app1: profundidade média ou só os quatro pontos da banda"""
+    with app.get_pool().transacao(('medicoes',)) as conn:
+        for km, profundidade in pontos:
+            if media:
+                conn.execute("INSERT INTO medicoes (pneu_id, km_total, profundidade_media) VALUES (?, ?, ?)",
+                             (pneu_id, km, profundidade))
+            else:
+                conn.execute("INSERT INTO medicoes (pneu_id, km_total, interno, centro_interno, centro_externo, "
+                             "externo) VALUES (?, ?, ?, ?, ?, ?)", (pneu_id, km, *[profundidade] * 4))
+
+
+def medir_frota(app, rapido='P001'):
+    """1 mm a cada 100 km em todos os pneus, 2 mm no `rapido`"""
+    for numero in range(1, 9):
+        pneu_id = f"P{numero:03d}"
+        perda = 2 if pneu_id == rapido else 1
+        medir(app, pneu_id, [(km, 8 - perda * km / 100) for km in (0, 100, 200)], media=numero % 2 == 1)
+
+
+def test_sem_medicoes_o_fator_e_1(frota):
+    previsao = frota.PrevisaoManager.prever_pneus(PISTA)
+
+    assert len(previsao) == 8
+    assert (previsao['fator_individual'] == 1.0).all()
+
+
+def test_fator_individual_vem_das_medicoes_do_app1(frota):
+    medir_frota(frota)
+
+    previsao = frota.PrevisaoManager.prever_pneus(PISTA).set_index('pneu_id')
+    assert previsao.loc['P001', 'fator_individual'] == pytest.approx(2.0)
+    assert previsao.loc['P002', 'fator_individual'] == pytest.approx(1.0)
+    assert previsao.loc['P001', 'voltas_ate_vermelho'] < previsao.loc['P002', 'voltas_ate_vermelho']
+
+    sets = frota.PrevisaoManager.prever_sets(PISTA).set_index('set_id')
+    assert sets.loc['S001', 'pneu_limitante'] == 'P001'
+    assert sets.loc['S001', 'voltas_ate_vermelho'] < sets.loc['S002', 'voltas_ate_vermelho']
+
+
+def test_nova_medicao_invalida_a_previsao_em_cache(frota):
+    assert (frota.PrevisaoManager.prever_pneus(PISTA)['fator_individual'] == 1.0).all()
+
+    medir_frota(frota, rapido='P006')
+
+    previsao = frota.PrevisaoManager.prever_pneus(PISTA).set_index('pneu_id')
+    assert previsao.loc['P006', 'fator_individual'] == pytest.approx(2.0)
+
+
+def test_variacao_do_desgaste_vem_das_medicoes(frota):
+    assert frota.SimulacaoManager.cv_desgaste_historico() == frota.SimulacaoManager.CV_DESGASTE_PADRAO
+
+    medir_frota(frota)
+
+    assert frota.SimulacaoManager.cv_desgaste_historico() == pytest.approx(pd.Series([1.0] * 7 + [2.0]).std())
+
+
+def test_simulacao_usa_a_variacao_das_medicoes_sem_ajuste_manual(frota):
+    medir_frota(frota)
+    simular = functools.partial(frota.SimulacaoManager.simular_sets, PISTA, n_cenarios=5_000, semente=3)
+
+    padrao = simular()
+    pd.testing.assert_frame_equal(padrao, simular(cv_desgaste=frota.SimulacaoManager.cv_desgaste_historico()))
+    assert not padrao.equals(simular(cv_desgaste=0.0))
+    assert padrao.set_index('set_id').loc['S001', 'pneu_limitante'] == 'P001'
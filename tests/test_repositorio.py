@@ -0,0 +1,320 @@
+"""Esquema único (repositorio.py): visões do app1, migração do banco antigo e dados vistos pelos dois apps"""
+
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from dados import aplicar_migracoes, versao_esquema
+from persistencia import BancoSQLite, TabelaPersistente
+from repositorio import (MIGRACOES, TABELAS, VERSAO_ESQUEMA, VISAO_CARROS, VISAO_ETAPAS, VISAO_MEDICOES, VISAO_PISTAS,
+                         VISAO_PNEUS, VISAO_SETS, apagar_dados_app1, importar_banco_legado)
+
+POSICOES_APP = {'Pneu Dianteiro Esquerdo': 'A1', 'Pneu Dianteiro Direito': 'A2',
+                'Pneu Traseiro Esquerdo': 'A3', 'Pneu Traseiro Direito': 'A4'}
+
+
+@pytest.fixture
+def banco(tmp_path):
+    banco = BancoSQLite(str(tmp_path / 'compartilhado.db'))
+    yield banco
+    banco.fechar_todas()
+
+
+@pytest.fixture
+def app_compartilhado(banco, monkeypatch):
+    """motorsport_tires_v2_2 sobre o mesmo banco do app1"""
+    import motorsport_tires_v2_2 as app
+
+    monkeypatch.setattr(app, 'get_pool', lambda: banco)
+    app.init_database()
+    app.semear_dados_referencia()
+    return app
+
+
+def pneu_app1(nome, etapa=1, km=0.0):
+    return {'Nome do Pneu': nome, 'Código de Barras': 1000 + int(nome[1:]), 'Carro Vinculado': 'Carro A',
+            'Status': 'Novo', 'Quilometragem atual': km, 'Profundidade Inicial (mm)': 8.0, 'Limite KM': 600,
+            'Data Cadastro': '01/03/2026', 'Etapa Cadastro': etapa, 'Etapa Atual': etapa,
+            'Status Etapa': 'Disponível'}
+
+
+def linha(banco, query, params=()):
+    with banco.conexao() as conn:
+        return conn.execute(query, params).fetchone()
+
+
+def test_banco_novo_na_ultima_versao(banco):
+    assert versao_esquema(banco) == VERSAO_ESQUEMA
+    tabelas = set(banco.ler("SELECT name FROM sqlite_master WHERE type = 'table'")['name'])
+    assert set(TABELAS) <= tabelas
+
+
+def test_visao_converte_nas_duas_direcoes(banco):
+    sets = TabelaPersistente(banco, VISAO_SETS, chave='ID Set')
+    sets.adicionar({'ID Set': 7, 'Carro': 'Carro A', 'Data Montagem': '05/03/2026', 'Status': 'Ativo',
+                    'Etapa': 1, 'Coluna da planilha': 'fica só em memória', **POSICOES_APP})
+
+    assert linha(banco, "SELECT id, nome, tipo, status, data_montagem, pneu_de FROM sets") == (
+        'S007', 'S007', 'normal', 'ativo', '2026-03-05', 'A1')
+
+    relido = TabelaPersistente(banco, VISAO_SETS, chave='ID Set').obter(7)
+    assert (relido['Status'], relido['Data Montagem'], relido['Etapa']) == ('Ativo', '05/03/2026', 1)
+    assert sets.maximo('ID Set') == 7
+    assert sets.existe(7)
+
+
+def test_data_com_hora_e_texto_livre(banco):
+    medicoes = TabelaPersistente(banco, VISAO_MEDICOES)
+    medicoes.adicionar_varios([{'Código do Pneu': 'A1', 'Data Medição': '05/03/2026 14:30'},
+                               {'Código do Pneu': 'A1', 'Data Medição': 'sem data'}])
+
+    assert list(banco.ler("SELECT data FROM medicoes ORDER BY id")['data']) == ['2026-03-05 14:30', 'sem data']
+    assert list(TabelaPersistente(banco, VISAO_MEDICOES).df['Data Medição']) == ['05/03/2026 14:30', 'sem data']
+
+
+def test_filtro_atualizacao_e_remocao_pela_chave(banco):
+    cadastro = TabelaPersistente(banco, VISAO_PNEUS, chave='Nome do Pneu', filtro='etapa_atual = ?', parametros=(1,))
+    cadastro.adicionar_varios([pneu_app1('A1'), pneu_app1('A2')])
+    TabelaPersistente(banco, VISAO_PNEUS).adicionar(pneu_app1('B1', etapa=2))
+    cadastro.recarregar()
+    assert list(cadastro.df['Nome do Pneu']) == ['A1', 'A2']
+
+    cadastro.atualizar('A2', {'Etapa Atual': 2, 'Status Etapa': 'Disponível'})
+    cadastro.remover('A1')
+
+    assert list(banco.ler("SELECT id FROM pneus ORDER BY id")['id']) == ['A2', 'B1']
+    cadastro.recarregar(parametros=(2,))
+    assert list(cadastro.df['Nome do Pneu']) == ['A2', 'B1']
+    assert len(cadastro.df_completo()) == 2
+
+
+def test_sessao_desatualizada_nao_grava_em_linhas_regravadas_por_outra(banco):
+    carros = TabelaPersistente(banco, VISAO_CARROS, chave='Nome')
+    carros.adicionar_varios([{'Nome': 'Carro A'}, {'Nome': 'Carro B'}])
+    desatualizada = TabelaPersistente(banco, VISAO_CARROS, chave='Nome')
+    versao = banco.versao
+
+    # Outra sessão apaga e regrava a tabela: os ids antigos não voltam
+    carros.substituir(pd.DataFrame({'Nome': ['Carro X', 'Carro Y']}))
+    assert banco.escritas_desde(versao)
+    desatualizada.atualizar('Carro A', {'Piloto': 'Fulano'})
+    desatualizada.remover('Carro B')
+
+    assert banco.ler("SELECT nome, piloto FROM carros ORDER BY nome").values.tolist() == [
+        ['Carro X', None], ['Carro Y', None]]
+
+
+def test_escritas_de_outro_processo(banco):
+    versao = banco.versao
+    assert not banco.escritas_desde(versao)
+
+    conn = sqlite3.connect(banco.caminho)
+    with conn:
+        conn.execute("INSERT INTO estado (chave, valor) VALUES ('etapa_atual', 3)")
+    conn.close()
+
+    assert banco.escritas_desde(versao)
+    assert banco.ler_estado('etapa_atual') == 3
+
+
+def test_rollback_recarrega_a_tabela(banco):
+    cadastro = TabelaPersistente(banco, VISAO_PNEUS, chave='Nome do Pneu')
+    cadastro.adicionar(pneu_app1('A1'))
+
+    with pytest.raises(RuntimeError):
+        with banco.transacao():
+            cadastro.atualizar('A1', {'Quilometragem atual': 50.0})
+            raise RuntimeError
+
+    assert cadastro.obter('A1')['Quilometragem atual'] == 0.0
+
+
+def test_km_do_app1_entra_no_desgaste(banco):
+    cadastro = TabelaPersistente(banco, VISAO_PNEUS, chave='Nome do Pneu')
+    cadastro.adicionar(pneu_app1('A1', km=40.0))
+    assert linha(banco, "SELECT km_atual, desgaste_atual FROM pneus") == (40.0, 40.0)
+
+    cadastro.atualizar('A1', {'Quilometragem atual': 95.0})
+    assert linha(banco, "SELECT km_atual, desgaste_atual FROM pneus") == (95.0, 95.0)
+
+
+def test_dados_do_app1_no_v2_2_e_vice_versa(banco, app_compartilhado):
+    app = app_compartilhado
+    cadastro = TabelaPersistente(banco, VISAO_PNEUS, chave='Nome do Pneu')
+    cadastro.adicionar_varios([pneu_app1(nome, km=10.0) for nome in POSICOES_APP.values()])
+    sets = TabelaPersistente(banco, VISAO_SETS, chave='ID Set')
+    assert set(app.PneuManager.listar_pneus_disponiveis()['id']) == set(POSICOES_APP.values())
+
+    # Montagem no app1: set ativo e pneus montados, que o v2_2 não oferece mais
+    sets.adicionar({'ID Set': 1, 'Status': 'Ativo', 'Etapa': 1, **POSICOES_APP})
+    cadastro.atualizar_varios(POSICOES_APP.values(), {'Status Etapa': 'Montado'})
+    assert app.PneuManager.listar_pneus_disponiveis().empty
+    assert list(app.SetManager.listar_sets_ativos()['id']) == ['S001']
+
+    # Outing no v2_2 (Interlagos, 4.309 km/volta): o km aparece no cadastro do app1
+    assert app.OutingManager.registrar_outing('2026-03-08', 'INTER7', 'S001', 'treino', 'seco', 10)
+    cadastro.recarregar()
+    assert cadastro.obter('A1')['Quilometragem atual'] == pytest.approx(10.0 + 43.09)
+    assert app.OutingManager.recalcular_km_todos_pneus()
+    assert linha(banco, "SELECT km_atual FROM pneus WHERE id = 'A1'")[0] == pytest.approx(53.09)
+    assert app.ResumoUsoManager.verificar_consistencia().empty
+
+    # Próximo ID de set no v2_2 continua a numeração do app1
+    assert app.gerar_proximo_id('sets') == 'S002'
+
+
+def test_recalculo_preserva_km_de_pneu_sem_outings(banco, app_compartilhado):
+    TabelaPersistente(banco, VISAO_PNEUS).adicionar(pneu_app1('A1', km=120.0))
+
+    assert app_compartilhado.OutingManager.recalcular_km_todos_pneus()
+    assert linha(banco, "SELECT km_atual, desgaste_atual FROM pneus") == (120.0, 120.0)
+
+
+def criar_banco_legado(caminho):
+    """Banco do app1 antes do esquema único: tabelas com os nomes das telas, `_linha` e o calendário em JSON"""
+    tabelas = {
+        'cadastro': [pneu_app1('P001', km=30.0), pneu_app1('L1', km=5.0)],
+        'sets': [{'ID Set': 1, 'Nome do Set': 'Set legado', 'Status': 'Ativo', 'Etapa': 1,
+                  'Pneu Dianteiro Esquerdo': 'L1'}],
+        'pistas': [{'Nome': 'Interlagos', 'KM por Volta': 4.309, 'Localização': 'São Paulo-SP'},
+                   {'Nome': 'Velocitta', 'KM por Volta': 3.493, 'Localização': 'Mogi Guaçu-SP'}],
+        'medicoes': [{'Código do Pneu': 'L1', 'Data Medição': '08/03/2026 10:00', 'KM TOTAL': 5.0,
+                      'Interno (mm)': 7.5}],
+    }
+    conn = sqlite3.connect(caminho)
+    for nome, registros in tabelas.items():
+        colunas = list(registros[0])
+        conn.execute(f"CREATE TABLE {nome} (_linha INTEGER PRIMARY KEY, "
+                     + ', '.join(f'"{coluna}"' for coluna in colunas) + ")")
+        conn.executemany(f"INSERT INTO {nome} VALUES (NULL, {', '.join('?' * len(colunas))})",
+                         [[registro.get(coluna) for coluna in colunas] for registro in registros])
+    calendario = [{'Etapa': 1, 'Data': '08/03/2026', 'Local': 'Curvelo', 'Pista': 'Circuito dos Cristais',
+                   'Tipo': 'Abertura', 'Status': 'Concluída'},
+                  {'Etapa': 2, 'Data': '29/03/2026', 'Local': 'Cascavel', 'Pista': 'Autódromo Zilmar Beux',
+                   'Tipo': 'Regular', 'Status': 'Não Iniciada'}]
+    conn.execute("CREATE TABLE estado (chave TEXT PRIMARY KEY, valor)")
+    conn.executemany("INSERT INTO estado VALUES (?, ?)",
+                     [('calendario', json.dumps(calendario)), ('etapa_atual', 2), ('semeado', 1)])
+    conn.commit()
+    conn.close()
+
+
+def test_importacao_do_banco_legado(tmp_path, banco, app_compartilhado):
+    assert app_compartilhado.PneuManager.cadastrar_pneu('P001', 'normal', 1000)
+    assert app_compartilhado.SetManager.criar_set('S001', 'Set 1', 'normal', 'P001')
+    legado = str(tmp_path / 'tire_management.db')
+    criar_banco_legado(legado)
+
+    assert importar_banco_legado(banco, legado) == 7
+
+    # Pneu já cadastrado no v2_2 só ganha as colunas do app1; o novo entra inteiro
+    assert linha(banco, "SELECT limite_km, codigo_barras, etapa_atual FROM pneus WHERE id = 'P001'") == (1000, 1001, 1)
+    assert linha(banco, "SELECT km_atual, status, etapa_atual FROM pneus WHERE id = 'L1'") == (5.0, 'disponivel', 1)
+    # S001 já existia: o set importado é renumerado
+    assert linha(banco, "SELECT id, nome, pneu_de FROM sets WHERE id != 'S001'") == ('S002', 'Set legado', 'L1')
+    # Interlagos já cadastrada pelo v2_2 (INTER7) não se repete
+    assert banco.valor("SELECT COUNT(*) FROM pistas WHERE nome = 'Interlagos'") == 1
+    assert linha(banco, "SELECT id, comprimento FROM pistas WHERE nome = 'Velocitta'") == ('Velocitta', 3.493)
+    assert linha(banco, "SELECT pneu_id, data, interno FROM medicoes") == ('L1', '2026-03-08 10:00', 7.5)
+
+    calendario = TabelaPersistente(banco, VISAO_ETAPAS, chave='Etapa')
+    assert list(calendario.df['Status']) == ['Concluída', 'Não Iniciada']
+    assert banco.ler_estado('etapa_atual') == 2
+
+    # Só uma vez
+    assert importar_banco_legado(banco, legado) == 0
+    assert banco.valor("SELECT COUNT(*) FROM pneus") == 2
+
+
+def test_importacao_sem_banco_legado(tmp_path, banco):
+    assert importar_banco_legado(banco, str(tmp_path / 'nao_existe.db')) == 0
+    assert importar_banco_legado(banco, banco.caminho) == 0
+
+
+def test_migracao_de_banco_do_v2_2_existente(pool):
+    # Banco do v2_2 na versão 4, com um pneu já rodado
+    aplicar_migracoes(pool, MIGRACOES[:4], TABELAS)
+    with pool.transacao(('pneus',)) as conn:
+        conn.execute("INSERT INTO pneus (id, tipo, limite_km, km_atual, desgaste_atual) "
+                     "VALUES ('P001', 'normal', 1000, 80, 92)")
+
+    assert aplicar_migracoes(pool, MIGRACOES, TABELAS) == [5, 6, 7]
+
+    assert linha(pool, "SELECT km_atual, desgaste_atual, etapa_atual FROM pneus") == (80, 92, None)
+    assert 'localizacao' in set(pool.ler("PRAGMA table_info(pistas)")['name'])
+
+
+def test_pistas_padrao_dos_dois_apps_sem_repetir(banco, monkeypatch):
+    import motorsport_tires_v2_2 as app
+
+    # app1 abriu o banco primeiro e semeou as pistas dele
+    TabelaPersistente(banco, VISAO_PISTAS, chave='Nome').adicionar_varios(
+        [{'Nome': 'Interlagos', 'KM por Volta': 4.309}, {'Nome': 'Velocitta', 'KM por Volta': 3.493}])
+    monkeypatch.setattr(app, 'get_pool', lambda: banco)
+
+    semeadas = app.semear_dados_referencia()
+
+    assert semeadas == len(app.PISTAS_BRASILEIRAS) - 1
+    assert banco.valor("SELECT COUNT(*) FROM pistas WHERE nome = 'Interlagos'") == 1
+    assert app.semear_dados_referencia() == 0
+
+
+def test_situacao_do_pneu_numa_coluna_so(banco, app_compartilhado):
+    app = app_compartilhado
+    cadastro = TabelaPersistente(banco, VISAO_PNEUS, chave='Nome do Pneu')
+    cadastro.adicionar_varios([pneu_app1(nome) for nome in ('A1', 'A2', 'A3', 'A4', 'A5', 'A6')])
+    cadastro.atualizar('A5', {'Status Etapa': 'Descartado'})
+    cadastro.atualizar('A6', {'Status Etapa': 'Em uso'})
+
+    assert dict(banco.ler("SELECT id, status FROM pneus WHERE id IN ('A5', 'A6')").values) == {
+        'A5': 'descartado', 'A6': 'rodado'}
+    # Descartado e rodado na etapa ficam fora das listas e das sugestões do v2_2
+    assert set(app.PneuManager.listar_pneus_disponiveis()['id']) == {'A1', 'A2', 'A3', 'A4'}
+    assert set(app.SetManager.sugerir_sets('INTER7', quantidade=2)['pneu_id'].dropna()) == {'A1', 'A2', 'A3', 'A4'}
+
+    # Set montado no v2_2: o app1 vê os pneus montados; desmontado, voltam a ficar disponíveis
+    assert app.SetManager.criar_set('S001', 'Set 1', 'normal', 'A1', 'A2', 'A3', 'A4')
+    cadastro.recarregar()
+    assert set(cadastro.df.loc[cadastro.df['Status Etapa'] == 'Montado', 'Nome do Pneu']) == {'A1', 'A2', 'A3', 'A4'}
+    app.SetManager.desmontar_set('S001')
+    cadastro.recarregar()
+    assert cadastro.obter('A1')['Status Etapa'] == 'Disponível'
+    assert cadastro.obter('A6')['Status Etapa'] == 'Em uso'
+
+
+def test_limpar_sistema_do_app1_mantem_dados_do_v2_2(banco, app_compartilhado):
+    app = app_compartilhado
+    cadastro = TabelaPersistente(banco, VISAO_PNEUS, chave='Nome do Pneu')
+    cadastro.adicionar_varios([pneu_app1(nome) for nome in POSICOES_APP.values()])
+    TabelaPersistente(banco, VISAO_SETS).adicionar({'ID Set': 1, 'Status': 'Ativo', 'Etapa': 1, **POSICOES_APP})
+    TabelaPersistente(banco, VISAO_MEDICOES).adicionar({'Nome do Pneu': 'A1', 'Profundidade (mm)': 7.5})
+    for pneu in ('V1', 'V2', 'V3', 'V4'):
+        assert app.PneuManager.cadastrar_pneu(pneu, 'normal', 600)
+    assert app.SetManager.criar_set('S002', 'Set v2_2', 'normal', 'V1', 'V2', 'V3', 'V4')
+    assert app.OutingManager.registrar_outing('2026-03-08', 'INTER7', 'S001', 'treino', 'seco', 10)
+    assert app.OutingManager.registrar_outing('2026-03-08', 'INTER7', 'S002', 'treino', 'seco', 5)
+
+    apagar_dados_app1(banco)
+
+    assert set(banco.ler("SELECT id FROM pneus")['id']) == {'V1', 'V2', 'V3', 'V4'}
+    assert list(banco.ler("SELECT id FROM sets")['id']) == ['S002']
+    assert list(banco.ler("SELECT set_id FROM outings")['set_id']) == ['S002']
+    assert set(banco.ler("SELECT pneu_id FROM historico_pneus")['pneu_id']) == {'V1', 'V2', 'V3', 'V4'}
+    assert set(banco.ler("SELECT pneu_id FROM resumo_uso_pneus")['pneu_id']) == {'V1', 'V2', 'V3', 'V4'}
+    assert linha(banco, "SELECT COUNT(*) FROM medicoes")[0] == 0
+    assert app.ResumoUsoManager.verificar_consistencia().empty
+
+
+def test_migracao_leva_a_situacao_do_app1_para_status(pool):
+    aplicar_migracoes(pool, MIGRACOES[:5], TABELAS)
+    with pool.transacao(('pneus',)) as conn:
+        conn.executemany("INSERT INTO pneus (id, tipo, status_etapa) VALUES (?, 'normal', ?)",
+                         [('A1', 'Montado'), ('A2', 'Descartado'), ('P1', None)])
+
+    assert aplicar_migracoes(pool, MIGRACOES, TABELAS) == [6, 7]
+
+    assert dict(pool.ler("SELECT id, status FROM pneus").values) == {
+        'A1': 'em_uso', 'A2': 'descartado', 'P1': 'disponivel'}
+    assert 'status_etapa' not in set(pool.ler("PRAGMA table_info(pneus)")['name'])
@@ -0,0 +1,76 @@
+"""Resumo de uso por pneu (resumo_uso_pneus) mantido pelas escritas de outings"""
+
+import pytest
+
+from test_importacao import MAPEAMENTO, arquivo_outings
+
+PISTA = 'INTER7'  # Interlagos, 4.309 km
+
+
+def outing_id(app, data, set_id):
+    with app.conexao() as conn:
+        return conn.execute("SELECT MAX(id) FROM outings WHERE data = ? AND set_id = ?", (data, set_id)).fetchone()[0]
+
+
+def sem_divergencias(app):
+    divergencias = app.ResumoUsoManager.verificar_consistencia()
+    assert divergencias.empty, divergencias.to_string()
+
+
+def test_registro_mantem_o_resumo(frota):
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+    assert frota.OutingManager.registrar_outing('2026-03-02', PISTA, 'S001', 'corrida', 'seco', 5)
+    sem_divergencias(frota)
+
+    resumo = frota.ResumoUsoManager.resumo_pneu('P001')
+    assert (resumo.usos, resumo.voltas) == (2, 15)
+    assert resumo.km == pytest.approx(15 * 4.309)
+    assert resumo.por_posicao == (('DE', 2),)
+    assert dict(resumo.por_tipo_sessao) == {'treino': 1, 'corrida': 1}
+
+
+def test_edicao_mantem_o_resumo(frota):
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+    assert frota.OutingManager.registrar_outing('2026-03-02', PISTA, 'S001', 'treino', 'seco', 5)
+
+    primeiro = outing_id(frota, '2026-03-01', 'S001')
+    assert frota.OutingManager.atualizar_outing(primeiro, '2026-03-03', 'GOIA8', 'S001', 'corrida', 'seco', 12)
+    sem_divergencias(frota)
+
+
+def test_troca_de_set_move_o_resumo(frota):
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+
+    outing = outing_id(frota, '2026-03-01', 'S001')
+    assert frota.OutingManager.atualizar_outing(outing, '2026-03-01', PISTA, 'S002', 'treino', 'seco', 10)
+    sem_divergencias(frota)
+    assert frota.ResumoUsoManager.resumo_pneu('P001').usos == 0
+    assert frota.ResumoUsoManager.resumo_pneu('P005').usos == 1
+
+
+def test_exclusao_mantem_o_resumo(frota):
+    for data, voltas in (('2026-03-01', 10), ('2026-03-02', 5)):
+        assert frota.OutingManager.registrar_outing(data, PISTA, 'S001', 'treino', 'seco', voltas)
+
+    assert frota.OutingManager.excluir_outing(outing_id(frota, '2026-03-01', 'S001'))
+    sem_divergencias(frota)
+    assert frota.ResumoUsoManager.resumo_pneu('P001').voltas == 5
+
+
+def test_importacao_mantem_o_resumo(frota):
+    resultado = frota.OutingManager.importar_outings(arquivo_outings(40, semente=2), MAPEAMENTO, tamanho_lote=6)
+
+    assert resultado.importados == 40
+    sem_divergencias(frota)
+
+
+def test_verificar_consistencia_corrige_o_resumo(frota):
+    assert frota.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+    with frota.transacao('resumo_uso_pneus') as conn:
+        conn.execute("UPDATE resumo_uso_pneus SET voltas = voltas + 1 WHERE pneu_id = 'P002'")
+        conn.execute("DELETE FROM resumo_uso_pneus WHERE pneu_id = 'P003'")
+
+    divergencias = frota.ResumoUsoManager.verificar_consistencia(corrigir=True)
+
+    assert set(divergencias['pneu_id']) == {'P002', 'P003'}
+    sem_divergencias(frota)
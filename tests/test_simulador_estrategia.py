@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from simulador_estrategia import TAMANHO_BLOCO, simular_fim_de_semana
+
+
+def test_cenario_deterministico():
+    # Sem variação: treino de 10 voltas e corrida de 20, sempre no seco (1 unidade/volta)
+    resultado = simular_fim_de_semana(
+        desgaste_atual=[0, 0, 55, 0],
+        limite_vermelho=[25, 100, 60, 0],
+        desgaste_volta=[[1, 3]] * 4,
+        grupo=[1, 0, 2, 0],
+        voltas_sessoes=[[10], [20]],
+        prob_condicao=[1, 0],
+        cv_desgaste=0.0,
+        n_cenarios=500,
+        semente=1,
+    )
+
+    assert resultado.prob_vermelho == pytest.approx([0, 1, 1])
+    assert resultado.prob_vermelho_antes_corrida == pytest.approx([0, 0, 1])
+    assert resultado.prob_vermelho_pneu == pytest.approx([1, 0, 1, 0])
+    assert resultado.uso_mediano == pytest.approx([0.3, 30 / 25, 85 / 60])
+
+
+def test_probabilidade_em_varios_blocos():
+    # Corrida de 10 ou 30 voltas com a mesma chance: o vermelho (20) é cruzado em metade dos cenários
+    n_cenarios = 2 * TAMANHO_BLOCO + 5_000
+    resultado = simular_fim_de_semana([0], [20], [[1]], [0], [[10, 30]], [1], cv_desgaste=0.0,
+                                      n_cenarios=n_cenarios, semente=3)
+
+    assert resultado.n_cenarios == n_cenarios
+    assert resultado.prob_vermelho[0] == pytest.approx(0.5, abs=0.02)
+    assert resultado.uso_p90[0] == pytest.approx(1.5)
+
+
+def test_chuva_aumenta_o_risco():
+    argumentos = dict(desgaste_atual=[0], limite_vermelho=[40], desgaste_volta=[[1, 2]], grupo=[0],
+                      voltas_sessoes=[[15, 20, 25]] * 2, cv_desgaste=0.1, n_cenarios=20_000, semente=5)
+
+    seco = simular_fim_de_semana(prob_condicao=[1, 0], **argumentos)
+    chuva = simular_fim_de_semana(prob_condicao=[0.5, 0.5], **argumentos)
+
+    assert chuva.prob_vermelho[0] > seco.prob_vermelho[0]
+
+
+def test_sem_pneus():
+    resultado = simular_fim_de_semana([], [], np.empty((0, 2)), [], [[10]], [1, 0])
+    assert resultado.n_cenarios == 0
+    assert len(resultado.prob_vermelho) == 0
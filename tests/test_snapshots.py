@@ -0,0 +1,65 @@
+"""Snapshots colunares (snapshots.py) e a análise da temporada lida deles no v2_2"""
+
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from snapshots import gravar_snapshot, ler_manifesto, ler_snapshot
+
+PISTA = 'INTER7'  # Interlagos, 4.309 km
+
+
+@pytest.fixture
+def snapshot_do_banco(frota, pool, tmp_path, monkeypatch):
+    """SnapshotManager sobre o banco do teste, com a pasta ao lado dele"""
+    monkeypatch.setattr(frota, 'DB_PATH', pool.caminho)
+    monkeypatch.setattr(frota.SnapshotManager, 'PASTA', str(tmp_path / 'snapshot_motorsport'))
+    return frota
+
+
+def test_gravacoes_simultaneas_nao_se_misturam(tmp_path):
+    pasta = str(tmp_path / 'snapshot')
+    erros = []
+
+    def gravar(numero):
+        try:
+            for _ in range(20):
+                gravar_snapshot(pasta, {'medicoes': pd.DataFrame({'linha': [numero] * 500})}, versao=numero)
+        except Exception as e:  # noqa: BLE001 - reportado no teste
+            erros.append(e)
+
+    threads = [threading.Thread(target=gravar, args=(numero,)) for numero in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not erros
+    assert sorted(os.listdir(pasta)) == ['manifesto.json', 'medicoes.arrow']
+    linhas = ler_snapshot(pasta, 'medicoes')['linha']
+    assert len(linhas) == 500 and linhas.nunique() == 1
+    assert ler_manifesto(pasta)['versao'] in range(4)
+
+
+def test_pasta_do_snapshot_fica_ao_lado_do_banco():
+    import motorsport_tires_v2_2 as app
+
+    assert os.path.dirname(app.SnapshotManager.PASTA) == os.path.dirname(os.path.abspath(app.DB_PATH))
+
+
+def test_desgaste_da_temporada_lido_do_snapshot(snapshot_do_banco):
+    app = snapshot_do_banco
+    assert app.SnapshotManager.desgaste_por_pista().empty
+
+    assert app.OutingManager.registrar_outing('2026-03-01', PISTA, 'S001', 'treino', 'seco', 10)
+    assert app.OutingManager.registrar_outing('2026-03-02', PISTA, 'S002', 'corrida', 'seco', 5)
+
+    desgaste = app.SnapshotManager.desgaste_por_pista().set_index('pista')
+    esperado = app.ler_em_cache('teste_desgaste', ('historico_pneus',),
+                                "SELECT posicao, SUM(desgaste) AS desgaste FROM historico_pneus GROUP BY posicao")
+    assert desgaste.loc['Interlagos', 'voltas'] == 15
+    for posicao, total in zip(esperado['posicao'], esperado['desgaste']):
+        assert desgaste.loc['Interlagos', posicao] == pytest.approx(total)
+    assert desgaste.loc['Interlagos', 'total'] == pytest.approx(esperado['desgaste'].sum())